@@ -0,0 +1,309 @@
+"""
+parsers
+=======
+
+``benchmarks/fixtures`` 의 페이지로 각 파서의 처리량과 메모리 할당을 측정합니다.
+crawler 의 파서와 함께 ``infocare-store`` 에서 사용하는
+``crawler.infocare_schema`` 의 파서도 측정합니다.
+
+결과에는 파서 출력의 해시가 함께 저장되므로, 파서를 최적화한 뒤
+``--compare`` 로 이전 결과와 비교하면 출력이 같은지와 얼마나 빨라졌는지를
+한 번에 확인할 수 있습니다. ``benchmarks/reference.json`` 은 현재 fixture 로
+만든 기준 결과입니다. 시간은 측정한 컴퓨터마다 다르지만 출력 해시는 같아야
+합니다.
+
+    $ python -m benchmarks.parsers --compare benchmarks/reference.json
+
+    $ python -m benchmarks.parsers --save before.json
+    $ git checkout <optimized>
+    $ python -m benchmarks.parsers --compare before.json
+
+fixture 의 출처, 지역, 읍/면/동 목록은 ``fixtures/fixtures.json`` 에 있으며
+``benchmarks.record_fixtures`` 로 인포케어에서 다시 받을 수 있습니다.
+
+"""
+import datetime
+import glob
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import typing
+
+import attr
+import click
+
+from crawler.infocare_schema import InfocareStatisticResponse, \
+    InfocareBidResponse
+from infocare_crawler.client.data import ENCODING, InfocareChkID, \
+    InfocareSearchResponse
+from infocare_crawler.client.parser import parse_sido_list, \
+    parse_sigungu_list, parse_dongli_list, parse_main_using_type_list, \
+    parse_sub_using_type_list, minify_page, split_bid_page
+
+FIXTURE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fixtures"
+)
+METADATA_FILE_NAME = "fixtures.json"
+
+
+@attr.s(frozen=True)
+class Fixture(object):
+    #: 파일 이름
+    name: str = attr.ib()
+    #: 받은 그대로의 페이지
+    data: bytes = attr.ib()
+    #: ``fixtures.json`` 에 기록된 출처, 지역, 읍/면/동 목록
+    metadata: typing.Dict[str, typing.Any] = attr.ib()
+
+
+@attr.s(frozen=True)
+class Parser(object):
+    #: 벤치마크 이름
+    name: str = attr.ib()
+    #: 사용할 fixture 종류 (index, statistics, bid)
+    fixture: str = attr.ib()
+    #: fixture 를 받아 파싱 결과를 돌려주는 함수
+    parse: typing.Callable[[Fixture], typing.Any] = attr.ib()
+
+
+def _raw(
+        fn: typing.Callable[[bytes], typing.Any]
+) -> typing.Callable[[Fixture], typing.Any]:
+    return lambda fixture: fn(fixture.data)
+
+
+def _decoded(
+        fn: typing.Callable[[str], typing.Any]
+) -> typing.Callable[[Fixture], typing.Any]:
+    # 문자열을 받는 파서에는 store 와 같이 한 번 디코딩해서 넘깁니다.
+    return lambda fixture: fn(fixture.data.decode(ENCODING))
+
+
+def load_parsers() -> typing.List[Parser]:
+    return [
+        Parser("chk_id", "index", _raw(InfocareChkID.from_html)),
+        Parser("sido_list", "statistics", _raw(parse_sido_list)),
+        Parser("sigungu_list", "statistics", _raw(parse_sigungu_list)),
+        Parser("dongli_list", "statistics", _raw(parse_dongli_list)),
+        Parser(
+            "main_using_type_list", "statistics",
+            _raw(parse_main_using_type_list),
+        ),
+        Parser(
+            "sub_using_type_list", "statistics",
+            _raw(parse_sub_using_type_list),
+        ),
+        Parser(
+            "search_response", "statistics",
+            _raw(InfocareSearchResponse.from_html),
+        ),
+        Parser(
+            "split_bid_page", "bid",
+            lambda fixture: split_bid_page(
+                fixture.data, dongs=fixture.metadata["dongs"]
+            ),
+        ),
+        Parser("minify_statistics", "statistics", _raw(minify_page)),
+        Parser("minify_bid", "bid", _raw(minify_page)),
+        Parser(
+            "store_statistic_response", "statistics",
+            _decoded(InfocareStatisticResponse.from_html),
+        ),
+        Parser(
+            "store_bid_response", "bid",
+            _decoded(InfocareBidResponse.from_html),
+        ),
+    ]
+
+
+def load_metadata() -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    with open(os.path.join(FIXTURE_DIR, METADATA_FILE_NAME),
+              encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_fixtures(kind: str) -> typing.List[Fixture]:
+    metadata = load_metadata()
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, f"{kind}_*.html"))):
+        name = os.path.basename(path)
+        with open(path, "rb") as f:
+            fixtures.append(Fixture(name, f.read(), metadata[name]))
+    return fixtures
+
+
+def normalize(value: typing.Any) -> typing.Any:
+    # 파서 출력을 비교할 수 있는 형태로 바꿉니다.
+    if attr.has(type(value)):
+        return normalize(attr.asdict(value, recurse=False))
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return hashlib.sha1(value).hexdigest()
+    if hasattr(value, "__dict__"):
+        return normalize(vars(value))
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def output_digest(value: typing.Any) -> str:
+    data = json.dumps(normalize(value), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def measure(
+        parser: Parser, fixture: Fixture, min_time: float
+) -> typing.Dict[str, typing.Any]:
+    try:
+        result = parser.parse(fixture)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    # 처리량
+    number = 0
+    start = time.perf_counter()
+    while True:
+        parser.parse(fixture)
+        number += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+
+    # 한 번 파싱할 때의 메모리 할당
+    tracemalloc.start()
+    parser.parse(fixture)
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sum(
+        stat.count for stat in tracemalloc.take_snapshot().statistics(
+            "filename"
+        )
+    )
+    tracemalloc.stop()
+
+    seconds = elapsed / number
+    return {
+        "bytes": len(fixture.data),
+        "number": number,
+        "seconds_per_page": seconds,
+        "pages_per_second": 1 / seconds,
+        "megabytes_per_second": len(fixture.data) / seconds / 1024 / 1024,
+        "peak_bytes": peak,
+        "retained_blocks": blocks,
+        "output_digest": output_digest(result),
+    }
+
+
+def compare(
+        results: typing.Dict[str, typing.Any],
+        baseline: typing.Dict[str, typing.Any],
+) -> bool:
+    matched = True
+    click.echo(
+        f"\n{'benchmark':<50} {'before':>10} {'after':>10} {'speedup':>8}"
+        f" {'peak':>8}  output"
+    )
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None or "error" in before or "error" in result:
+            click.echo(f"{key:<50} {'-':>10} {'-':>10} {'-':>8} {'-':>8}  -")
+            continue
+        same = before["output_digest"] == result["output_digest"]
+        matched = matched and same
+        speedup = before["seconds_per_page"] / result["seconds_per_page"]
+        peak = result["peak_bytes"] / max(before["peak_bytes"], 1)
+        click.echo(
+            f"{key:<50}"
+            f" {before['seconds_per_page'] * 1000:>8.2f}ms"
+            f" {result['seconds_per_page'] * 1000:>8.2f}ms"
+            f" {speedup:>7.2f}x"
+            f" {peak:>7.2f}x"
+            f"  {'same' if same else 'CHANGED'}"
+        )
+    return matched
+
+
+@click.command()
+@click.option("--min-time", default=1.0, show_default=True,
+              help="Seconds to spend on each parser and fixture.")
+@click.option("--only", default=None, help="Run parsers containing this.")
+@click.option("--exclude", multiple=True,
+              help="Skip parsers containing this. Can be repeated.")
+@click.option("--save", "save_path", default=None,
+              type=click.Path(dir_okay=False))
+@click.option("--compare", "compare_path", default=None,
+              type=click.Path(exists=True, dir_okay=False))
+def main(
+        min_time: float,
+        only: typing.Optional[str],
+        exclude: typing.Tuple[str, ...],
+        save_path: typing.Optional[str],
+        compare_path: typing.Optional[str],
+) -> None:
+    results: typing.Dict[str, typing.Any] = {}
+
+    synthetic = sorted(
+        name for name, fixture in load_metadata().items()
+        if fixture["source"] != "infocare"
+    )
+    if synthetic:
+        click.echo(f"Not recorded from infocare: {', '.join(synthetic)}\n")
+
+    click.echo(
+        f"{'benchmark':<50} {'pages/s':>10} {'MB/s':>8} {'peak':>10}"
+    )
+    for parser in load_parsers():
+        if only and only not in parser.name:
+            continue
+        if any(x in parser.name for x in exclude):
+            continue
+        for fixture in load_fixtures(parser.fixture):
+            key = f"{parser.name}:{fixture.name}"
+            result = measure(parser, fixture, min_time)
+            results[key] = result
+            if "error" in result:
+                click.echo(f"{key:<50} {result['error']}")
+                continue
+            click.echo(
+                f"{key:<50}"
+                f" {result['pages_per_second']:>10.1f}"
+                f" {result['megabytes_per_second']:>8.2f}"
+                f" {result['peak_bytes'] / 1024:>8.0f}KB"
+            )
+
+    if save_path:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "min_time": min_time,
+                "exclude": list(exclude),
+                "fixtures": {
+                    name: fixture["source"]
+                    for name, fixture in load_metadata().items()
+                },
+            },
+            "results": results,
+        }
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if not compare(results, baseline):
+            click.echo("\nFAIL: parser output changed")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+record_fixtures
+===============
+
+파서 벤치마크에서 사용하는 fixture 를 인포케어에서 받아 저장합니다.
+
+``CRAWLER_LOGIN_ID`` / ``CRAWLER_LOGIN_PW`` 계정으로 로그인해서 메인 페이지,
+통계 페이지, 낙찰사례 페이지(작은 표, 보통 표, 시군구 단위의 큰 표)를 받고
+사건번호, 지번, 동/호수, 로그인 정보를 같은 길이의 임의 값으로 가린 뒤
+받은 cp949 그대로 ``fixtures`` 에 저장합니다.
+
+    $ python -m benchmarks.record_fixtures
+
+fixture 마다 받은 지역, 읍/면/동 목록, 행 수는 ``fixtures/fixtures.json`` 에
+함께 기록하며 ``benchmarks.parsers`` 는 이 파일을 읽어 사용합니다.
+fixture 를 새로 받은 뒤에는 ``benchmarks/reference.json`` 도 다시 만듭니다.
+
+"""
+import datetime
+import json
+import os
+import random
+import re
+import typing
+
+import attr
+import click
+
+import infocare_crawler.config
+from infocare_crawler.client import InfocareClient
+from infocare_crawler.client.data import ENCODING
+
+FIXTURE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "fixtures"
+)
+METADATA_FILE_NAME = "fixtures.json"
+
+# 가릴 값: 사건번호, 지번, 동/호수, 로그인 세션 값, 로그인한 사용자 이름
+_CASE_NUMBER = re.compile(r"(\d{4}타경)(\d+)")
+_LOT_NUMBER = re.compile(r"([가-힣]+[동리가로길]\s+산?)(\d+(?:-\d+)?)")
+_UNIT_NUMBER = re.compile(r"(\d+)(동\s*)(\d+)(호)")
+_CHK_ID = re.compile(r"(chkID\s*=\s*')(\w+)(')")
+_USER_NAME = re.compile(r"([가-힣]{2,4})(\s*님)")
+
+
+@attr.s(frozen=True)
+class FixtureSpec(object):
+    #: 저장할 파일 이름
+    name: str = attr.ib()
+    #: index, statistics, bid
+    kind: str = attr.ib()
+    sido: str = attr.ib(default="")
+    sigungu: str = attr.ib(default="")
+    dong: str = attr.ib(default="")
+    #: 낙찰사례를 받을 단위 (dong, sigungu)
+    scale: str = attr.ib(default="dong")
+    main_using_type: str = attr.ib(default="집합건물")
+    sub_using_type: str = attr.ib(default="아파트")
+
+
+FIXTURES = (
+    FixtureSpec("index_typical.html", "index"),
+    FixtureSpec(
+        "statistics_typical.html", "statistics", "서울", "강남구", "대치동",
+    ),
+    FixtureSpec(
+        "statistics_no_bids.html", "statistics", "서울", "강남구", "율현동",
+    ),
+    FixtureSpec("bid_small.html", "bid", "서울", "강남구", "일원동"),
+    FixtureSpec("bid_typical.html", "bid", "서울", "강남구", "대치동"),
+    FixtureSpec(
+        "bid_large.html", "bid", "경기", "화성시", "", scale="sigungu",
+    ),
+)
+
+
+def scrub(data: bytes, rng: random.Random) -> bytes:
+    """
+    개인정보가 될 수 있는 숫자와 이름을 같은 길이의 임의 값으로 바꿉니다.
+    바꾼 값 외에는 받은 페이지와 같은 바이트를 유지합니다.
+
+    """
+    def digits(value: str) -> str:
+        return "".join(
+            str(rng.randint(0, 9)) if c.isdigit() else c for c in value
+        )
+
+    # 디코딩할 수 없는 바이트도 그대로 돌려놓습니다.
+    text = data.decode(ENCODING, "surrogateescape")
+    text = _CASE_NUMBER.sub(lambda m: m[1] + digits(m[2]), text)
+    text = _LOT_NUMBER.sub(lambda m: m[1] + digits(m[2]), text)
+    text = _UNIT_NUMBER.sub(
+        lambda m: digits(m[1]) + m[2] + digits(m[3]) + m[4], text
+    )
+    text = _CHK_ID.sub(lambda m: m[1] + digits(m[2]) + m[3], text)
+    text = _USER_NAME.sub(lambda m: "홍길동"[:len(m[1])] + m[2], text)
+    return text.encode(ENCODING, "surrogateescape")
+
+
+def fetch(
+        client: InfocareClient, spec: FixtureSpec
+) -> typing.Tuple[bytes, typing.Dict[str, typing.Any]]:
+    metadata: typing.Dict[str, typing.Any] = {
+        "kind": spec.kind,
+        "sido": spec.sido,
+        "sigungu": spec.sigungu,
+        "dong": spec.dong,
+        "main_using_type": spec.main_using_type,
+        "sub_using_type": spec.sub_using_type,
+    }
+    if spec.kind == "index":
+        return client.fetch_chk_id().raw_data, metadata
+
+    dongs = [
+        x.dongli_name
+        for x in client.fetch_dongli_list(spec.sido, spec.sigungu)
+    ]
+    metadata["dongs"] = dongs
+    search = client.fetch_statistics_page(
+        spec.sido, spec.sigungu, spec.dong or dongs[0],
+        spec.main_using_type, spec.sub_using_type,
+    )
+    metadata["bids_count"] = search.bids_count
+    if spec.kind == "statistics":
+        return search.raw_data, metadata
+
+    metadata["scale"] = spec.scale
+    return client._fetch_bid_html(
+        spec.sido, spec.sigungu, spec.dong, spec.main_using_type,
+        spec.sub_using_type, search.term1, search.term2, search.category,
+        spec.scale,
+    ), metadata
+
+
+@click.command()
+@click.option("--seed", default=20201001, show_default=True,
+              help="Seed of the values that replace personal data.")
+@click.option("--only", default=None, help="Record fixtures containing this.")
+def main(seed: int, only: typing.Optional[str]) -> None:
+    config = infocare_crawler.config.load()
+    rng = random.Random(seed)
+
+    metadata_path = os.path.join(FIXTURE_DIR, METADATA_FILE_NAME)
+    with open(metadata_path, encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    client = InfocareClient(config)
+    try:
+        chk_id = client.fetch_chk_id().chk_id
+        client.login(config["LOGIN_ID"], config["LOGIN_PW"], chk_id)
+        for spec in FIXTURES:
+            if only and only not in spec.name:
+                continue
+            data, fixture = fetch(client, spec)
+            data = scrub(data, rng)
+            fixture.update(
+                source="infocare",
+                recorded_at=datetime.date.today().isoformat(),
+                bytes=len(data),
+            )
+            with open(os.path.join(FIXTURE_DIR, spec.name), "wb") as f:
+                f.write(data)
+            metadata[spec.name] = fixture
+            click.echo(f"{len(data):>10}  {spec.name}")
+        client.logout()
+    finally:
+        client.close()
+
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
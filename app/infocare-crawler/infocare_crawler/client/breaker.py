@@ -0,0 +1,53 @@
+"""
+breaker
+=======
+
+인포케어가 응답하지 않을 때 요청마다 재시도를 반복하지 않도록,
+연속으로 실패한 요청 수를 세어 크롤링을 잠시 멈춥니다.
+
+:class:`CircuitBreaker` 는 실패 횟수만 기록하고, 멈춘 동안 가벼운 페이지로
+복구를 확인한 뒤 다시 로그인하는 일은 :class:`InfocareClient` 가 합니다.
+
+"""
+import time
+import typing
+
+
+class CircuitBreaker(object):
+    def __init__(self, threshold: int, probe_interval: float) -> None:
+        #: 이만큼 연속으로 실패하면 멈춥니다. (0: 사용하지 않음)
+        self.threshold = threshold
+        #: 멈춘 동안 복구를 확인하는 간격 (초)
+        self.probe_interval = probe_interval
+        self.failures = 0
+        #: 멈춘 시각 (time.monotonic)
+        self.tripped_at: typing.Optional[float] = None
+
+    @property
+    def tripped(self) -> bool:
+        return self.tripped_at is not None
+
+    def record(self, ok: bool) -> bool:
+        """
+        요청 결과를 기록하고, 멈춰야 하면 True 를 돌려줍니다.
+
+        """
+        if self.threshold <= 0:
+            return False
+        if ok:
+            self.failures = 0
+            return False
+
+        self.failures += 1
+        if not self.tripped and self.failures >= self.threshold:
+            self.tripped_at = time.monotonic()
+        return self.tripped
+
+    def reset(self) -> float:
+        # 복구되었으면 멈춰 있던 시간(초)을 돌려줍니다.
+        elapsed = 0.0
+        if self.tripped_at is not None:
+            elapsed = time.monotonic() - self.tripped_at
+        self.failures = 0
+        self.tripped_at = None
+        return elapsed
@@ -1,21 +1,35 @@
+import concurrent.futures
 import functools
 import json
 import typing
 import random
+import threading
 import time
-import bs4
 import requests
+import structlog
 from requests_toolbelt.sessions import BaseUrlSession
 from tanker.utils.requests import apply_proxy
 from tanker.utils.retryer import Retryer
 from tanker.utils.retryer.strategy import ExponentialModulusBackoffStrategy
 from crawler.utils.encrpytion import encrypt
-from infocare_crawler.client.exc import (
-    InfocareClientResponseError, InfocareClientParseError,
-)
+from crawler.profiling import Profiler
+from infocare_crawler.client.exc import InfocareClientResponseError, \
+    InfocareClientUnavailable
+from infocare_crawler.metrics import CrawlerProgress
 from .data import InfocareChkID, InfocareSiDo, \
     InfocareSiGunGu, InfocareDongLi, InfocareBidsResponse, \
-    InfocareMainUsingType, InfocareSearchResponse, InfocareSubUsingType
+    InfocareMainUsingType, InfocareSearchResponse, InfocareSubUsingType, \
+    InfocareBidSplit
+from .parser import create_parser_executor, timed, parse_sido_list, \
+    parse_sigungu_list, parse_dongli_list, parse_main_using_type_list, \
+    parse_sub_using_type_list, split_bid_page, parse_search_response, \
+    parse_bids_response
+from .breaker import CircuitBreaker
+from .proxy import ProxyPool
+
+logger = structlog.get_logger(__name__)
+
+T = typing.TypeVar("T")
 
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
@@ -25,17 +39,41 @@ USER_AGENT = (
 
 
 class InfocareClient(object):
-    def __init__(self, config: typing.Dict[str, typing.Any]) -> None:
+    def __init__(
+            self, config: typing.Dict[str, typing.Any],
+            profiler: typing.Optional[Profiler] = None,
+            progress: typing.Optional[CrawlerProgress] = None,
+            stop_event: typing.Optional[threading.Event] = None,
+    ) -> None:
         super().__init__()
 
-        proxy = config.get("PROXY_HOST") or None
         self.config = config
-        # Header Settings
-        self.session = BaseUrlSession("http://www.infocare.co.kr/")
-        self.session.headers.update({"User-Agent": USER_AGENT})
-
-        if proxy:
-            apply_proxy(self.session, proxy)
+        self.profiler = profiler or Profiler()
+        self.progress = progress or CrawlerProgress()
+        self.stop_event = stop_event or threading.Event()
+
+        # PROXY_HOSTS 가 있으면 상태가 좋은 프록시를 골라 사용합니다.
+        proxy_hosts = [
+            host.strip()
+            for host in (config.get("PROXY_HOSTS") or "").split(",")
+            if host.strip()
+        ]
+        self.proxy_pool: typing.Optional[ProxyPool] = None
+        if proxy_hosts:
+            self.proxy_pool = ProxyPool(
+                proxy_hosts,
+                cooldown=float(config.get("PROXY_COOLDOWN") or 300),
+                max_latency=(
+                    float(config["PROXY_MAX_LATENCY"])
+                    if config.get("PROXY_MAX_LATENCY") else None
+                ),
+            )
+            self.proxy: typing.Optional[str] = self.proxy_pool.choose()
+        else:
+            self.proxy = config.get("PROXY_HOST") or None
+        self.session = self._create_session(self.proxy)
+        self.credentials: typing.Optional[typing.Tuple[str, str]] = None
+        self._rotating = False
 
         self.retryer = Retryer(
             strategy_factory=(
@@ -46,6 +84,167 @@ class InfocareClient(object):
             ),
             default_max_trials=3,
         )
+        # 연속으로 실패하면 재시도하지 않고 복구될 때까지 기다립니다.
+        self.breaker = CircuitBreaker(
+            int(config.get("BREAKER_THRESHOLD") or 0),
+            float(config.get("BREAKER_PROBE_INTERVAL") or 60),
+        )
+
+        # 파싱은 별도 프로세스에서 진행하여 다음 요청을 막지 않도록 합니다.
+        self.parser = create_parser_executor(
+            int(config.get("PARSER_WORKERS") or 0)
+        )
+        # 저장할 페이지에서 스크립트, 스타일 같은 데이터가 아닌 부분을 지웁니다.
+        self.minify = bool(config.get("MINIFY_HTML"))
+
+    def close(self) -> None:
+        self.parser.shutdown()
+
+    @staticmethod
+    def _create_session(proxy: typing.Optional[str]) -> BaseUrlSession:
+        # Header Settings
+        session = BaseUrlSession("http://www.infocare.co.kr/")
+        session.headers.update({"User-Agent": USER_AGENT})
+
+        if proxy:
+            apply_proxy(session, proxy)
+
+        return session
+
+    def _rotate_proxy(self) -> None:
+        """
+        현재 프록시가 제외되었으면 다른 프록시로 세션을 새로 만들고
+        다시 로그인합니다. 로그인한 세션은 한 프록시에서만 사용합니다.
+
+        """
+        if (
+            self.proxy_pool is None
+            or self.proxy is None
+            or self._rotating
+            or self.proxy_pool.is_admitted(self.proxy)
+        ):
+            return
+
+        proxy = self.proxy_pool.choose()
+        logger.info("Rotating proxy", ejected=self.proxy, proxy=proxy)
+        self.session.close()
+        self.session = self._create_session(proxy)
+        self.proxy = proxy
+
+        if self.credentials is None:
+            return
+        self._rotating = True
+        try:
+            login_id, login_pw = self.credentials
+            self.login(login_id, login_pw, self.fetch_chk_id().chk_id)
+        finally:
+            self._rotating = False
+
+    def _request(
+            self, method: str, url: str, **kwargs: typing.Any
+    ) -> requests.Response:
+        def attempt() -> requests.Response:
+            if self.breaker.tripped:
+                raise InfocareClientUnavailable()
+            self._rotate_proxy()
+            self.progress.attempts += 1
+            proxy = self.proxy
+            start = time.perf_counter()
+            try:
+                response: requests.Response = getattr(self.session, method)(
+                    url, **kwargs
+                )
+            except requests.exceptions.ConnectionError as e:
+                self._record_proxy(proxy, start, False)
+                if self.breaker.record(False):
+                    raise InfocareClientUnavailable() from e
+                raise
+            finally:
+                self.progress.request_seconds += time.perf_counter() - start
+            ok = response.status_code < 500
+            self._record_proxy(proxy, start, ok)
+            if self.breaker.record(ok):
+                raise InfocareClientUnavailable()
+            return response
+
+        while True:
+            self._wait_for_recovery()
+            try:
+                with self.profiler.stage("fetch"):
+                    response = self.retryer.run(attempt)
+            except InfocareClientUnavailable:
+                # 복구된 뒤 같은 요청을 다시 보냅니다.
+                continue
+            break
+        self.progress.pages += 1
+        self.progress.bytes += len(response.content)
+        return response
+
+    def _wait_for_recovery(self) -> None:
+        """
+        차단기가 열려 있으면 ``/index.asp`` 가 응답할 때까지 기다린 뒤
+        다시 로그인합니다. 기다리는 동안 크롤링을 멈추면
+        :class:`InfocareClientUnavailable` 를 발생시킵니다.
+
+        """
+        if not self.breaker.tripped:
+            return
+
+        logger.warning(
+            "Infocare unavailable, pausing crawl",
+            failures=self.breaker.failures,
+            probe_interval=self.breaker.probe_interval,
+        )
+        self.progress.paused = True
+        try:
+            with self.profiler.stage("outage"):
+                while not self._probe():
+                    if self.stop_event.wait(self.breaker.probe_interval):
+                        raise InfocareClientUnavailable()
+        finally:
+            self.progress.paused = False
+
+        paused_seconds = self.breaker.reset()
+        logger.info("Infocare recovered, resuming crawl",
+                    paused_seconds=paused_seconds)
+
+        # 멈춘 동안 세션이 끝났을 수 있으므로 다시 로그인합니다.
+        if self.credentials is not None:
+            login_id, login_pw = self.credentials
+            self.login(login_id, login_pw, self.fetch_chk_id().chk_id)
+
+    def _probe(self) -> bool:
+        try:
+            response = self.session.get(
+                '/index.asp', params={'PC_Use': ''}, timeout=30
+            )
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code < 500
+
+    def _record_proxy(
+            self, proxy: typing.Optional[str], start: float, ok: bool
+    ) -> None:
+        if self.proxy_pool is not None and proxy is not None:
+            self.proxy_pool.record(proxy, time.perf_counter() - start, ok)
+
+    def _parse(
+            self, fn: typing.Callable[[bytes], T], data: bytes
+    ) -> "concurrent.futures.Future[T]":
+        # 큐에서 기다린 시간은 빼고 작업자가 파싱한 시간만 더합니다.
+        future: "concurrent.futures.Future[T]" = concurrent.futures.Future()
+
+        def done(parsed: "concurrent.futures.Future[typing.Any]") -> None:
+            try:
+                result, elapsed = parsed.result()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                self.profiler.add_stage("parse", elapsed)
+                future.set_result(result)
+
+        self.parser.submit(timed, fn, data).add_done_callback(done)
+        return future
 
     def _handle_json_response(
             self, r: requests.Response
@@ -59,14 +258,17 @@ class InfocareClient(object):
             raise InfocareClientResponseError(
                 r.status_code, r.text)
 
-    def _handle_text_response(self, r: requests.Response) -> str:
+    def _handle_text_response(self, r: requests.Response) -> bytes:
         r.raise_for_status()
         time.sleep(float(self.config['CLIENT_DELAY']))
+        # 받은 페이지는 디코딩하지 않고 그대로 돌려줍니다.
+        # JSON 에러 응답인지는 첫 글자로 먼저 확인합니다.
+        if r.content.lstrip()[:1] not in (b"{", b"["):
+            return r.content
         try:
             r.json()
         except (json.JSONDecodeError, ValueError):
-            r.encoding = "cp949"
-            return r.text
+            return r.content
         else:
             raise InfocareClientResponseError(
                 r.status_code, r.text)
@@ -77,9 +279,10 @@ class InfocareClient(object):
         }
 
         response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(self.session.get,
-                                  '/index.asp', params=params)
+            self._request(
+                'get',
+                '/index.asp',
+                params=params,
             )
         )
 
@@ -102,22 +305,23 @@ class InfocareClient(object):
         self.session.cookies.update({
             'chkCookie': chk_id
         })
+        # 프록시를 바꿀 때 다시 로그인하기 위해 보관합니다.
+        self.credentials = (login_id, login_pw)
 
         self._handle_text_response(
-            self.retryer.run(
-                functools.partial(self.session.post,
-                                  '/login/loginok.asps', data=data)
+            self._request(
+                'post',
+                '/login/loginok.asps',
+                data=data,
             )
         )
 
     def logout(self) -> None:
 
         self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/login/logoutok.asp"
-                )
+            self._request(
+                'get',
+                "/login/logoutok.asp",
             )
         )
 
@@ -128,27 +332,14 @@ class InfocareClient(object):
         }
 
         response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/bubwon/kyung_statistics/statistics_detail.asp",
-                    params=params
-                )
+            self._request(
+                'get',
+                "/bubwon/kyung_statistics/statistics_detail.asp",
+                params=params,
             )
         )
 
-        soup = bs4.BeautifulSoup(response, 'lxml')
-
-        do_list = soup.find(
-            'select', attrs={'name': 'addr_do'}).find_all('option')
-
-        if do_list[0]['value'] == '':
-            do_list = do_list[1:]
-
-        if not do_list:
-            raise InfocareClientParseError("cannot find a sido list")
-
-        return [InfocareSiDo.from_html(x) for x in do_list]
+        return self._parse(parse_sido_list, response).result()
 
     def fetch_sigungu_list(
             self, sido: str) -> typing.List[InfocareSiGunGu]:  # 시/군/구를 가져옴
@@ -160,27 +351,14 @@ class InfocareClient(object):
         }
 
         response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/bubwon/kyung_statistics/statistics_detail.asp",
-                    params=params
-                )
+            self._request(
+                'get',
+                "/bubwon/kyung_statistics/statistics_detail.asp",
+                params=params,
             )
         )
 
-        soup = bs4.BeautifulSoup(response, 'lxml')
-
-        sigungu_list = soup.find(
-            'select', attrs={'name': 'addr_si'}).find_all('option')
-
-        if sigungu_list[0]['value'] == '':
-            sigungu_list = sigungu_list[1:]
-
-        if not sigungu_list:
-            raise InfocareClientParseError("cannot find a sigungu list")
-
-        return [InfocareSiGunGu.from_html(x) for x in sigungu_list]
+        return self._parse(parse_sigungu_list, response).result()
 
     def fetch_dongli_list(
             self, sido: str, sigungu: str
@@ -195,27 +373,14 @@ class InfocareClient(object):
         }
 
         response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/bubwon/kyung_statistics/statistics_detail.asp",
-                    params=params
-                )
+            self._request(
+                'get',
+                "/bubwon/kyung_statistics/statistics_detail.asp",
+                params=params,
             )
         )
 
-        soup = bs4.BeautifulSoup(response, 'lxml')
-
-        dongli_list = soup.find(
-            'select', attrs={'name': 'addr_dong'}).find_all('option')
-
-        if dongli_list[0]['value'] == '':
-            dongli_list = dongli_list[1:]
-
-        if not dongli_list:
-            raise InfocareClientParseError("cannot find a dongli list")
-
-        return [InfocareDongLi.from_html(x) for x in dongli_list]
+        return self._parse(parse_dongli_list, response).result()
 
     def fetch_main_using_type(
             self) -> typing.List[InfocareMainUsingType]:  # 용도 대분류를 가져옴
@@ -225,29 +390,15 @@ class InfocareClient(object):
         }
 
         response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/bubwon/kyung_statistics/statistics_detail.asp",
-                    params=params
-                )
+            self._request(
+                'get',
+                "/bubwon/kyung_statistics/statistics_detail.asp",
+                params=params,
             )
         )
 
-        soup = bs4.BeautifulSoup(response, 'lxml')
-
-        main_using_type_list = soup.find(
-            'select', attrs={'name': 'yong_set'}).find_all('option')
-
-        if main_using_type_list[0]['value'] == '':
-            main_using_type_list = main_using_type_list[1:]
-
-        if not main_using_type_list:
-            raise InfocareClientParseError(
-                "cannot find a main using type list")
-
-        return [InfocareMainUsingType.from_html(x) for x in
-                main_using_type_list]
+        return self._parse(
+            parse_main_using_type_list, response).result()
 
     def fetch_sub_using_type(
             self, main_using_type: str) -> typing.List[InfocareSubUsingType]:
@@ -263,32 +414,28 @@ class InfocareClient(object):
         }
 
         response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/bubwon/kyung_statistics/statistics_detail.asp",
-                    params=params
-                )
+            self._request(
+                'get',
+                "/bubwon/kyung_statistics/statistics_detail.asp",
+                params=params,
             )
         )
 
-        soup = bs4.BeautifulSoup(response, 'lxml')
-
-        sub_using_type_list = soup.find(
-            'select', attrs={'name': 'yong_desc'}).find_all('option')
-
-        if sub_using_type_list[0]['value'] == '':
-            sub_using_type_list = sub_using_type_list[1:]
-
-        if not sub_using_type_list:
-            raise InfocareClientParseError("cannot find a sub using type list")
-
-        return [InfocareSubUsingType.from_html(x) for x in sub_using_type_list]
+        return self._parse(parse_sub_using_type_list, response).result()
 
     def fetch_statistics_page(
             self, sido: str, sigungu: str, dong: str,
             main_using_type: str, sub_using_type: str
     ) -> InfocareSearchResponse:
+        return self.submit_statistics_page(
+            sido, sigungu, dong, main_using_type, sub_using_type
+        ).result()
+
+    def submit_statistics_page(
+            self, sido: str, sigungu: str, dong: str,
+            main_using_type: str, sub_using_type: str
+    ) -> "concurrent.futures.Future[InfocareSearchResponse]":
+        # 페이지를 받아온 뒤 파싱은 기다리지 않고 Future 로 돌려줍니다.
         params = {
             'SearchYN': 'Y',
             'url_from': 'bubwon',
@@ -302,22 +449,38 @@ class InfocareClient(object):
         }
 
         response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/bubwon/kyung_statistics/statistics_detail.asp",
-                    params=params
-                )
+            self._request(
+                'get',
+                "/bubwon/kyung_statistics/statistics_detail.asp",
+                params=params,
             )
         )
 
-        return InfocareSearchResponse.from_html(response)
+        return self._parse(
+            functools.partial(parse_search_response, minify=self.minify),
+            response,
+        )
 
     def fetch_bid_page(
             self, sido: str, sigungu: str, dong: str, main_using_type: str,
-            sub_using_type: str, term1: str, term2: str, category: str
+            sub_using_type: str, term1: str, term2: str, category: str,
     ) -> "InfocareBidsResponse":
+        response = self._fetch_bid_html(
+            sido, sigungu, dong, main_using_type, sub_using_type,
+            term1, term2, category, 'dong',
+        )
+
+        if not self.minify:
+            return InfocareBidsResponse.from_html(response)
+        return self._parse(
+            functools.partial(parse_bids_response, minify=True), response
+        ).result()
 
+    def _fetch_bid_html(
+            self, sido: str, sigungu: str, dong: str, main_using_type: str,
+            sub_using_type: str, term1: str, term2: str, category: str,
+            scale: str,
+    ) -> bytes:
         params = {
             'url_from': 'bubwon',
             'mode': 'pop',
@@ -332,17 +495,30 @@ class InfocareClient(object):
             'term1': term1,
             'term2': term2,
             'Category': category,
-            'scale': 'dong',
+            'scale': scale,
         }
 
-        response = self._handle_text_response(
-            self.retryer.run(
-                functools.partial(
-                    self.session.get,
-                    "/bubwon/kyung_statistics/stat_example.asp",
-                    params=params
-                )
+        return self._handle_text_response(
+            self._request(
+                'get',
+                "/bubwon/kyung_statistics/stat_example.asp",
+                params=params,
             )
         )
 
-        return InfocareBidsResponse.from_html(response)
+    def fetch_sigungu_bid_page(
+            self, sido: str, sigungu: str, dongs: typing.Sequence[str],
+            main_using_type: str, sub_using_type: str,
+            term1: str, term2: str, category: str,
+    ) -> typing.Tuple[InfocareBidsResponse, InfocareBidSplit]:
+        # 시군구 단위로 한 번 요청하고, 받은 페이지는 그대로 둔 채
+        # 행만 읍/면/동으로 나눕니다.
+        response = self._fetch_bid_html(
+            sido, sigungu, '', main_using_type, sub_using_type,
+            term1, term2, category, 'sigungu',
+        )
+
+        split = self._parse(
+            functools.partial(split_bid_page, dongs=list(dongs)), response,
+        ).result()
+        return InfocareBidsResponse.from_html(response), split
@@ -6,10 +6,13 @@ import re
 
 from infocare_crawler.client.exc import InfocareDataParseError
 
+#: 인포케어 페이지 인코딩
+ENCODING = "cp949"
+
 
 class InfocareData(metaclass=ABCMeta):
     @abstractmethod
-    def to_html(self) -> str:
+    def to_html(self) -> typing.Union[str, bytes]:
         pass
 
 
@@ -25,13 +28,16 @@ class InfocareChkID(InfocareData):
     # descripition: 로그인 쿠키 체크
     chk_id: str = attr.ib()
     # Raw 페이지 네이션
-    raw_data: str = attr.ib()
+    raw_data: bytes = attr.ib()
 
     @classmethod
-    def from_html(cls, data: str) -> "InfocareChkID":
+    def from_html(
+            cls, data: bytes, encoding: str = ENCODING
+    ) -> "InfocareChkID":
         varlist = {}
         value: typing.Optional[str]
-        var_values = data.split("var ")[1:]  # get each var entry
+        text = data.decode(encoding)
+        var_values = text.split("var ")[1:]  # get each var entry
 
         for v in var_values:
             name = v.split("=")[0].strip()  # first part is the var [name = "]
@@ -51,7 +57,7 @@ class InfocareChkID(InfocareData):
             raw_data=data
         )
 
-    def to_html(self) -> str:
+    def to_html(self) -> bytes:
         return self.raw_data
 
 
@@ -174,13 +180,16 @@ class InfocareSearchResponse(InfocareData):
     # data: 2
     # description: ?
     category: str = attr.ib()
-    # RAW DATA: 페이지 네이션
-    raw_data: str = attr.ib()
+    # RAW DATA: 받은 그대로의 페이지
+    raw_data: bytes = attr.ib()
+    # data: cp949
+    # description: raw_data 의 인코딩
+    encoding: str = attr.ib(default=ENCODING)
 
     @classmethod
-    def from_html(cls, data: str
+    def from_html(cls, data: bytes, encoding: str = ENCODING
                   ) -> "InfocareSearchResponse":
-        soup = bs4.BeautifulSoup(data, 'lxml')
+        soup = bs4.BeautifulSoup(data, 'lxml', from_encoding=encoding)
 
         table = soup.find(
             'table', attrs={'class': 'nakRateRep ml20'})
@@ -205,35 +214,51 @@ class InfocareSearchResponse(InfocareData):
         term1 = hrefs[-3].replace('\'', '')
         term2 = hrefs[-2].replace('\'', '')
         category = hrefs[-1].replace('\'', '').replace(')', '')
-        raw_data = str(soup)
-        raw_data = raw_data.replace(
-            "top.location.href = \'/main.asp\';", '')
         return cls(
             bids_count=bids_count,
-            raw_data=raw_data,
+            raw_data=data,
+            encoding=encoding,
             term1=term1,
             term2=term2,
             category=category,
         )
 
-    def to_html(self) -> str:
+    def to_html(self) -> bytes:
         return self.raw_data
 
 
 @attr.s(frozen=True)
 class InfocareBidsResponse(InfocareData):
-    # RAW DATA: 페이지 네이션
-    raw_data: str = attr.ib()
+    # RAW DATA: 받은 그대로의 페이지
+    raw_data: bytes = attr.ib()
+    # data: cp949
+    # description: raw_data 의 인코딩
+    encoding: str = attr.ib(default=ENCODING)
 
     @classmethod
-    def from_html(cls, data: str
+    def from_html(cls, data: bytes, encoding: str = ENCODING
                   ) -> "InfocareBidsResponse":
-
-        soup = bs4.BeautifulSoup(data, 'lxml')
-
+        # 낙찰사례 페이지는 store 에서 파싱하므로 그대로 보관합니다.
         return cls(
-            raw_data=str(soup)
+            raw_data=data,
+            encoding=encoding,
         )
 
-    def to_html(self) -> str:
+    def to_html(self) -> bytes:
         return self.raw_data
+
+
+@attr.s(frozen=True)
+class InfocareBidRow(object):
+    # data: 2020타경12345
+    case_number: str = attr.ib()
+    # data: 서울 강남구 대치동 123-45 101동 1001호
+    address: str = attr.ib()
+
+
+@attr.s(frozen=True)
+class InfocareBidSplit(object):
+    # description: 읍/면/동별 낙찰사례 행
+    rows: typing.Dict[str, typing.List[InfocareBidRow]] = attr.ib()
+    # description: 읍/면/동이 하나로 정해지지 않은 행
+    unassigned: typing.List[InfocareBidRow] = attr.ib(factory=list)
@@ -7,6 +7,10 @@ class InfocareClientResponseError(InfocareClientError):
         super().__init__(status_code, message)
 
 
+class InfocareClientUnavailable(InfocareClientError):
+    pass
+
+
 class InfocareClientParseError(InfocareClientError):
     pass
 
@@ -0,0 +1,282 @@
+"""
+parser
+======
+
+인포케어 페이지 파싱 함수 모음.
+프로세스 풀에서 실행될 수 있도록 모든 함수는 모듈 최상위에 정의합니다.
+
+"""
+import concurrent.futures
+import re
+import time
+import typing
+
+import attr
+import bs4
+import lxml.etree
+import lxml.html
+import structlog
+
+from infocare_crawler.client.exc import InfocareClientParseError
+from .data import ENCODING, InfocareSiDo, InfocareSiGunGu, InfocareDongLi, \
+    InfocareMainUsingType, InfocareSubUsingType, InfocareBidsResponse, \
+    InfocareSearchResponse, InfocareBidRow, InfocareBidSplit
+
+logger = structlog.get_logger(__name__)
+
+#: 표에 바로 속한 데이터 행 (안쪽 표의 행은 제외)
+_DATA_ROWS = "./tr[td] | ./tbody/tr[td]"
+
+#: 압축 방식이 바뀌면 올립니다. 업로드한 페이지의 Content-Type 에 남깁니다.
+MINIFY_VERSION = 1
+
+#: 데이터가 없는 태그 (store 의 파서가 읽는 select, table, a 는 남깁니다)
+_MINIFY_STRIP_TAGS = ("script", "style", "link", "noscript", "iframe")
+
+_WHITESPACE = re.compile(r"[ \t\r\n]+")
+
+#: 낙찰사례 표 (store 의 낙찰사례 파서가 읽는 표)
+_BID_TABLE = "//table[contains(concat(' ', @class, ' '), ' tbl_list ')]"
+#: 낙찰사례 표에서 주소가 있는 열의 제목
+_ADDRESS_HEADER = "소재지"
+#: 낙찰사례 표에서 사건번호가 있는 열의 제목
+_CASE_NUMBER_HEADER = "사건번호"
+_HEADER_CELLS = "(./tr[th] | ./thead/tr[th] | ./tbody/tr[th])[1]/th"
+#: 주소에서 지역 이름 사이에 들어가는 문장 부호
+_ADDRESS_PUNCTUATION = re.compile(r"[()\[\],·]")
+#: 지번(산 포함)이나 건물 동/호수처럼 숫자로 시작하는 주소 부분
+_ADDRESS_NUMBER = re.compile(r"^산?\d")
+
+T = typing.TypeVar("T")
+
+
+class InlineExecutor(concurrent.futures.Executor):
+    """
+    Run submitted callables right away in the calling thread.
+
+    """
+
+    def submit(
+            self, fn: typing.Callable[..., typing.Any],
+            *args: typing.Any, **kwargs: typing.Any
+    ) -> "concurrent.futures.Future[typing.Any]":
+        future: "concurrent.futures.Future[typing.Any]" = (
+            concurrent.futures.Future()
+        )
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        return future
+
+
+def timed(
+        fn: typing.Callable[[bytes], T], data: bytes
+) -> typing.Tuple[T, float]:
+    # 작업자 프로세스에서 파싱에 걸린 시간을 함께 돌려줍니다.
+    start = time.perf_counter()
+    result = fn(data)
+    return result, time.perf_counter() - start
+
+
+def create_parser_executor(workers: int) -> concurrent.futures.Executor:
+    # workers 가 0 이면 요청을 보내는 스레드에서 바로 파싱합니다.
+    if workers > 0:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    return InlineExecutor()
+
+
+def _parse_option_list(
+        data: bytes, encoding: str, select_name: str, kind: str
+) -> typing.List[bs4.element.Tag]:
+    soup = bs4.BeautifulSoup(data, 'lxml', from_encoding=encoding)
+
+    option_list = soup.find(
+        'select', attrs={'name': select_name}).find_all('option')
+
+    if option_list[0]['value'] == '':
+        option_list = option_list[1:]
+
+    if not option_list:
+        raise InfocareClientParseError(f"cannot find a {kind} list")
+
+    return option_list
+
+
+def minify_document(document: typing.Any) -> None:
+    """
+    스크립트, 스타일, 주석과 style 속성을 지우고 연속된 공백을 하나로 줄입니다.
+
+    """
+    lxml.etree.strip_elements(
+        document, lxml.etree.Comment, *_MINIFY_STRIP_TAGS, with_tail=False
+    )
+    for element in document.iter():
+        if element.tag in ("pre", "textarea"):
+            continue
+        element.attrib.pop("style", None)
+        if element.text:
+            element.text = _WHITESPACE.sub(" ", element.text)
+        if element.tail:
+            element.tail = _WHITESPACE.sub(" ", element.tail)
+
+
+def _to_bytes(document: typing.Any, encoding: str) -> bytes:
+    html = lxml.html.tostring(document, encoding="unicode")
+    return typing.cast(str, html).encode(encoding, "xmlcharrefreplace")
+
+
+def minify_page(data: bytes, encoding: str = ENCODING) -> bytes:
+    document = lxml.html.document_fromstring(
+        data, parser=lxml.html.HTMLParser(encoding=encoding)
+    )
+    minify_document(document)
+    return _to_bytes(document, encoding)
+
+
+def parse_search_response(
+        data: bytes, encoding: str = ENCODING, minify: bool = False
+) -> InfocareSearchResponse:
+    response = InfocareSearchResponse.from_html(data, encoding)
+    if minify:
+        response = attr.evolve(
+            response, raw_data=minify_page(data, encoding)
+        )
+    return response
+
+
+def parse_bids_response(
+        data: bytes, encoding: str = ENCODING, minify: bool = False
+) -> InfocareBidsResponse:
+    response = InfocareBidsResponse.from_html(data, encoding)
+    if minify:
+        response = attr.evolve(
+            response, raw_data=minify_page(data, encoding)
+        )
+    return response
+
+
+def parse_sido_list(
+        data: bytes, encoding: str = ENCODING
+) -> typing.List[InfocareSiDo]:
+    return [
+        InfocareSiDo.from_html(x)
+        for x in _parse_option_list(data, encoding, 'addr_do', 'sido')
+    ]
+
+
+def parse_sigungu_list(
+        data: bytes, encoding: str = ENCODING
+) -> typing.List[InfocareSiGunGu]:
+    return [
+        InfocareSiGunGu.from_html(x)
+        for x in _parse_option_list(data, encoding, 'addr_si', 'sigungu')
+    ]
+
+
+def parse_dongli_list(
+        data: bytes, encoding: str = ENCODING
+) -> typing.List[InfocareDongLi]:
+    return [
+        InfocareDongLi.from_html(x)
+        for x in _parse_option_list(data, encoding, 'addr_dong', 'dongli')
+    ]
+
+
+def parse_main_using_type_list(
+        data: bytes, encoding: str = ENCODING
+) -> typing.List[InfocareMainUsingType]:
+    return [
+        InfocareMainUsingType.from_html(x)
+        for x in _parse_option_list(
+            data, encoding, 'yong_set', 'main using type'
+        )
+    ]
+
+
+def parse_sub_using_type_list(
+        data: bytes, encoding: str = ENCODING
+) -> typing.List[InfocareSubUsingType]:
+    return [
+        InfocareSubUsingType.from_html(x)
+        for x in _parse_option_list(
+            data, encoding, 'yong_desc', 'sub using type'
+        )
+    ]
+
+
+def normalize_dong_name(name: str) -> str:
+    # "개포동(개포1동)" 처럼 괄호로 덧붙인 이름은 뺍니다.
+    return re.sub(r"\(.*?\)", "", name).strip()
+
+
+def address_regions(address: str) -> typing.List[str]:
+    """
+    주소에서 지번 앞까지의 지역 이름을 돌려줍니다.
+    ``"서울 강남구 신사동 663-65 15동 120호"`` 는 ``["서울", "강남구", "신사동"]``
+    이므로 건물의 ``15동`` 은 읍/면/동으로 보지 않습니다.
+
+    """
+    regions = []
+    for token in _ADDRESS_PUNCTUATION.sub(" ", address).split():
+        if _ADDRESS_NUMBER.match(token):
+            break
+        regions.append(token)
+    return regions
+
+
+def split_bid_page(
+        data: bytes, dongs: typing.Sequence[str], encoding: str = ENCODING,
+) -> InfocareBidSplit:
+    """
+    시군구 단위 낙찰사례 페이지의 행을 소재지의 읍/면/동으로 나눕니다.
+    페이지는 고치지 않고 행마다 사건번호와 소재지만 돌려주며,
+    읍/면/동이 하나로 정해지지 않는 행은 ``unassigned`` 에 남깁니다.
+
+    """
+    document = lxml.html.document_fromstring(
+        data, parser=lxml.html.HTMLParser(encoding=encoding)
+    )
+    tables = document.xpath(_BID_TABLE)
+    if not tables:
+        raise InfocareClientParseError("cannot find a bid table")
+    table = tables[0]
+    headers = [
+        _WHITESPACE.sub("", x.text_content())
+        for x in table.xpath(_HEADER_CELLS)
+    ]
+    if _ADDRESS_HEADER not in headers or _CASE_NUMBER_HEADER not in headers:
+        raise InfocareClientParseError("cannot find bid address columns")
+    address_column = headers.index(_ADDRESS_HEADER)
+    case_number_column = headers.index(_CASE_NUMBER_HEADER)
+
+    dong_names = {dong: normalize_dong_name(dong) for dong in dongs}
+    split = InfocareBidSplit(rows={x: [] for x in dongs})
+    for row in table.xpath(_DATA_ROWS):
+        cells = row.xpath("./td")
+        if len(cells) <= max(address_column, case_number_column):
+            text = _WHITESPACE.sub(" ", row.text_content()).strip()
+            logger.warning("Bid row without address", row=text)
+            split.unassigned.append(InfocareBidRow("", text))
+            continue
+        bid_row = InfocareBidRow(
+            case_number=cells[case_number_column].text_content().strip(),
+            address=cells[address_column].text_content().strip(),
+        )
+        regions = address_regions(bid_row.address)
+        matched = [
+            dong for dong, name in dong_names.items() if name in regions
+        ]
+        if len(matched) != 1:
+            logger.warning(
+                "Cannot match bid address to one dong",
+                address=bid_row.address,
+                matched=matched,
+            )
+            split.unassigned.append(bid_row)
+            continue
+        split.rows[matched[0]].append(bid_row)
+
+    return split
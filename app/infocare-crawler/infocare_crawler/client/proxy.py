@@ -0,0 +1,120 @@
+"""
+proxy
+=====
+
+여러 프록시의 응답 시간과 에러 비율을 지수 이동 평균으로 기록하고,
+상태가 나쁜 프록시는 일정 시간 동안 제외했다가 다시 사용합니다.
+
+로그인한 세션은 한 프록시에 고정되어야 하므로 :class:`ProxyPool` 은
+현재 프록시가 제외되었을 때만 다른 프록시를 고릅니다.
+
+"""
+import time
+import typing
+
+import attr
+
+
+@attr.s
+class ProxyHealth(object):
+    host: str = attr.ib()
+    #: 응답 시간의 지수 이동 평균 (초)
+    latency: typing.Optional[float] = attr.ib(default=None)
+    #: 실패한 요청 비율의 지수 이동 평균
+    error_rate: float = attr.ib(default=0.0)
+    #: 마지막으로 다시 사용하기 시작한 뒤의 요청 수
+    requests: int = attr.ib(default=0)
+    #: 이 시간(time.monotonic)까지 사용하지 않습니다.
+    ejected_until: float = attr.ib(default=0.0)
+
+    def admitted(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    @property
+    def score(self) -> float:
+        # 낮을수록 좋은 프록시입니다. 아직 써보지 않은 프록시를 먼저 씁니다.
+        return (self.latency or 0.0) * (1 + 4 * self.error_rate)
+
+
+class ProxyPool(object):
+    def __init__(
+        self,
+        hosts: typing.Sequence[str],
+        *,
+        cooldown: float = 300.0,
+        alpha: float = 0.2,
+        min_requests: int = 5,
+        max_error_rate: float = 0.5,
+        max_latency_ratio: float = 3.0,
+        max_latency: typing.Optional[float] = None,
+    ) -> None:
+        if not hosts:
+            raise ValueError("at least one proxy host is required")
+        self.proxies = [ProxyHealth(host) for host in hosts]
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.min_requests = min_requests
+        self.max_error_rate = max_error_rate
+        self.max_latency_ratio = max_latency_ratio
+        self.max_latency = max_latency
+
+    def _get(self, host: str) -> ProxyHealth:
+        for proxy in self.proxies:
+            if proxy.host == host:
+                return proxy
+        raise KeyError(host)
+
+    def choose(self) -> str:
+        now = time.monotonic()
+        admitted = [proxy for proxy in self.proxies if proxy.admitted(now)]
+        if not admitted:
+            # 모두 제외된 경우엔 가장 먼저 풀리는 프록시를 씁니다.
+            admitted = [min(self.proxies, key=lambda x: x.ejected_until)]
+        return min(admitted, key=lambda x: x.score).host
+
+    def is_admitted(self, host: str) -> bool:
+        return self._get(host).admitted(time.monotonic())
+
+    def record(self, host: str, elapsed: float, ok: bool) -> None:
+        proxy = self._get(host)
+        now = time.monotonic()
+        if proxy.ejected_until:
+            if not proxy.admitted(now):
+                return
+            # 제외 기간이 끝난 프록시는 기록을 새로 시작합니다.
+            proxy.ejected_until = 0.0
+            proxy.latency = None
+            proxy.error_rate = 0.0
+            proxy.requests = 0
+
+        proxy.requests += 1
+        error = 0.0 if ok else 1.0
+        proxy.error_rate += self.alpha * (error - proxy.error_rate)
+        if ok:
+            proxy.latency = (
+                elapsed if proxy.latency is None
+                else proxy.latency + self.alpha * (elapsed - proxy.latency)
+            )
+
+        if proxy.requests >= self.min_requests and self._degraded(proxy, now):
+            proxy.ejected_until = now + self.cooldown
+
+    def _degraded(self, proxy: ProxyHealth, now: float) -> bool:
+        others = [
+            x for x in self.proxies if x is not proxy and x.admitted(now)
+        ]
+        # 마지막 남은 프록시는 제외하지 않습니다.
+        if not others:
+            return False
+        if proxy.error_rate > self.max_error_rate:
+            return True
+        if proxy.latency is None:
+            return False
+        if self.max_latency is not None and proxy.latency > self.max_latency:
+            return True
+
+        # 다른 프록시보다 눈에 띄게 느린 경우
+        latencies = [x.latency for x in others if x.latency is not None]
+        return bool(latencies) and (
+            proxy.latency > self.max_latency_ratio * min(latencies)
+        )
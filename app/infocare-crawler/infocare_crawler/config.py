@@ -28,10 +28,37 @@ SCHEMA = {
     "SUB_USING_TYPE": fields.StringField(optional=True, default="아파트"),
     #: Client Delay
     "CLIENT_DELAY": fields.StringField(optional=True),
+    #: Fetch bid pages per dong, or once per sigungu and split them by dong
+    "BID_FETCH_SCALE": fields.OneOfField(
+        {"dong", "sigungu"}, default="dong",
+    ),
+    #: Strip scripts, styles and whitespace from archived pages
+    "MINIFY_HTML": fields.BooleanField(optional=True, default=False),
+    #: Upload parsed statistics and bid records next to the pages
+    "EMIT_RECORDS": fields.BooleanField(optional=True, default=False),
+    #: Parser process count (0: parse in the fetching thread)
+    "PARSER_WORKERS": fields.StringField(optional=True, default="0"),
+    #: Seconds to keep region / using type lists before fetching them again
+    "TAXONOMY_TTL": fields.StringField(optional=True, default="3600"),
+    #: Seconds between crawl cycles of ``manage.py daemon``
+    "DAEMON_INTERVAL": fields.StringField(optional=True, default="21600"),
+    #: Every Nth daemon cycle crawls all regions, the others only the
+    #: regions that had bids in the last crawl (1: always all regions)
+    "DAEMON_FULL_EVERY": fields.StringField(optional=True, default="4"),
+    #: Consecutive failed requests that pause the crawl (0: never pause)
+    "BREAKER_THRESHOLD": fields.StringField(optional=True, default="10"),
+    #: Seconds between /index.asp probes while the crawl is paused
+    "BREAKER_PROBE_INTERVAL": fields.StringField(optional=True, default="60"),
     #: Debug
     "DEBUG": fields.BooleanField(optional=True),
     #: Running environment
     "PROXY_HOST": fields.StringField(optional=True),
+    #: Comma separated proxy pool (used instead of PROXY_HOST)
+    "PROXY_HOSTS": fields.StringField(optional=True),
+    #: Seconds an unhealthy proxy is left out of the pool
+    "PROXY_COOLDOWN": fields.StringField(optional=True, default="300"),
+    #: Seconds of average latency above which a proxy is left out
+    "PROXY_MAX_LATENCY": fields.StringField(optional=True),
     #: AWS sepecific access key id value
     "AWS_ACCESS_KEY_ID": fields.StringField(optional=True),
     #: AWS sepecific secret access key value
@@ -47,6 +74,8 @@ SCHEMA = {
     "SLACK_CHANNEL": fields.StringField(optional=True),
     #: Sentry DSN
     'SENTRY_DSN': fields.StringField(optional=True),
+    #: Share of runs sent to Sentry performance tracing (0 ~ 1)
+    'TRACES_SAMPLE_RATE': fields.StringField(optional=True, default='0'),
 }
 
 
@@ -1,36 +1,83 @@
+import collections
+import concurrent.futures
+import os
 import typing
 import tempfile
 import pytz
 import datetime
+import json
 import re
+import threading
+import time
 import attr
 import structlog
 from tanker.slack import SlackClient
 from tanker.utils.datetime import tznow, timestamp
 from crawler.aws_client import S3Client
-from crawler.utils.download import write_file
+from crawler.profiling import Profiler, stage
 from infocare_crawler.client import InfocareClient
+from infocare_crawler.metrics import CrawlerProgress
 from .data import CrawlerStatistics, slack_failure_percentage_statistics
-from infocare_crawler.client.data import InfocareSearchResponse
+from .records import RECORDS_FILE_NAME, RecordWriter
+from .runs import RUN_FOLDER_NAME
+from .plan import HISTORY_FILE_NAME, NAME_ATTRIBUTES, CrawlHistory, \
+    CrawlPlan, make_plan, taxonomy_key
+from infocare_crawler.client.data import ENCODING, InfocareSearchResponse, \
+    InfocareBidRow
+from infocare_crawler.client.parser import MINIFY_VERSION
 
 logger = structlog.get_logger(__name__)
 
 SeoulTZ = pytz.timezone("Asia/Seoul")
 
+T = typing.TypeVar("T")
+
+#: 시군구 단위로 받은 낙찰사례 페이지를 받은 그대로 올리는 실행 폴더 아래 폴더
+SIGUNGU_BID_FOLDER_NAME = "sigungu-bids"
+
 
 class InfoCareCrawler(object):
     def __init__(
         self,
         config: typing.Dict[str, typing.Any],
+        profiler: typing.Optional[Profiler] = None,
+        progress: typing.Optional[CrawlerProgress] = None,
     ):
         super().__init__()
         self.config = config
+        self.profiler = profiler or Profiler()
+        self.progress = progress or CrawlerProgress()
 
         self.slack_client = SlackClient(
             config.get("SLACK_CHANNEL"), config.get("SLACK_API_TOKEN")
         )
-        self.info_care_client = InfocareClient(config)
+        self.stop_event = threading.Event()
+        self.info_care_client = InfocareClient(
+            config, self.profiler, self.progress, self.stop_event
+        )
         self.s3_client = S3Client(config)
+        # 시도, 시군구, 읍면동, 용도 목록은 자주 바뀌지 않으므로
+        # TAXONOMY_TTL 초 동안 다시 요청하지 않습니다.
+        self.taxonomy_ttl = float(config.get("TAXONOMY_TTL") or 0)
+        self.taxonomy_cache: typing.Dict[
+            typing.Tuple[str, ...], typing.Tuple[float, typing.Any]
+        ] = {}
+        # sigungu 면 낙찰사례를 시군구 단위로 한 번 받아 읍/면/동별로 나눕니다.
+        self.bid_fetch_scale = config.get("BID_FETCH_SCALE") or "dong"
+        self.records: typing.Optional[RecordWriter] = None
+        # 데몬의 부분 주기에 크롤링할 지역 (None: 전체)
+        self.cycle_scope: typing.Optional[
+            typing.Set[typing.Tuple[str, ...]]
+        ] = None
+        self.pending_bids: typing.DefaultDict[
+            typing.Tuple[str, str],
+            typing.List[typing.Tuple[str, InfocareSearchResponse]],
+        ] = collections.defaultdict(list)
+        self.start_run()
+
+    def start_run(self) -> None:
+        self.progress.start_run()
+        self.history = CrawlHistory()
         self.total_statistics = CrawlerStatistics()
         self.failure_statistics = CrawlerStatistics()
         self.crawling_date: datetime.datetime = tznow(
@@ -38,19 +85,103 @@ class InfoCareCrawler(object):
         )
         self.crawling_start_time: str = str(timestamp(self.crawling_date))
 
+        # store 가 HTML 을 다시 파싱하지 않도록 파싱 결과를 함께 남깁니다.
+        if self.records is not None:
+            self.records.close()
+            self.records = None
+        if self.config.get("EMIT_RECORDS"):
+            self.records = RecordWriter(
+                self.info_care_client.parser, self.crawling_start_time
+            )
+
+    def stop(self) -> None:
+        # 진행 중인 읍/면/동까지 저장한 뒤 멈춥니다.
+        self.stop_event.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self.stop_event.is_set()
+
     def run(self, run_by: str) -> None:
+        with self.profiler.transaction("infocare-crawler"):
+            self.tag_run(run_by)
+            self.send_start_slack(run_by)
+            self.crawl()
+            self.finish_run(run_by)
+
+    def tag_run(self, run_by: str) -> None:
+        # store 의 트레이스와 같은 키로 이어볼 수 있도록 실행 시각을 남깁니다.
+        self.profiler.tag("crawling_start_time", self.crawling_start_time)
+        self.profiler.tag("run_by", run_by)
+
+    def run_daemon(self, run_by: str, interval: float) -> None:
+        """
+        한 번 로그인한 세션과 목록 캐시를 유지하면서 ``interval`` 초마다
+        크롤링을 반복합니다. :meth:`stop` 이 호출되면 진행 중인 읍/면/동과
+        크롤러 로그를 저장하고 로그아웃합니다.
+
+        ``DAEMON_FULL_EVERY`` 번째 주기마다 전체 지역을 크롤링하고, 그 사이의
+        주기에는 지난 크롤링에서 낙찰 사례가 있던 읍/면/동만 크롤링합니다.
+
+        """
+        full_every = max(int(self.config.get("DAEMON_FULL_EVERY") or 1), 1)
+        self.login()
+        try:
+            cycle = 0
+            while not self.stopped:
+                cycle_start = time.monotonic()
+                self.start_run()
+                self.cycle_scope = None
+                if cycle % full_every:
+                    # 기록이 없으면 전체를 크롤링합니다.
+                    hot_regions = self.load_history().hot_regions()
+                    self.cycle_scope = hot_regions or None
+                cycle += 1
+                logger.info(
+                    "Crawling cycle",
+                    time_stamp=self.crawling_start_time,
+                    scope="all" if self.cycle_scope is None else "hot",
+                )
+                with self.profiler.transaction("infocare-crawler"):
+                    self.tag_run(run_by)
+                    self.send_start_slack(run_by)
+                    try:
+                        self.crawl_sido_region()
+                    except Exception as e:
+                        logger.error(
+                            "Exception while crawling cycle",
+                            time_stamp=self.crawling_start_time,
+                            exc_info=e,
+                        )
+                        self.relogin()
+                    else:
+                        self.finish_run(run_by)
+
+                elapsed = time.monotonic() - cycle_start
+                self.stop_event.wait(max(interval - elapsed, 0))
+        finally:
+            # 로그아웃에 실패해도 세션과 파서 풀은 닫습니다.
+            try:
+                self.info_care_client.logout()
+            finally:
+                self.info_care_client.close()
+
+    def send_start_slack(self, run_by: str) -> None:
         self.slack_client.send_info_slack(
             f"TIME_STAMP: {self.crawling_start_time}\n"
             f"크롤링 시작합니다 "
             f"({self.config['ENVIRONMENT']}, {run_by})"
         )
-        self.crawl()
+
+    def finish_run(self, run_by: str) -> None:
+        self.upload_records()
         self.update_crawler_log(run_by)
+        self.update_crawl_history()
 
         statistics = slack_failure_percentage_statistics(
             self.total_statistics, self.failure_statistics
         )
-        
+
         self.slack_client.send_info_slack(
             f"크롤링 완료\n"
             f"TIME_STAMP: {self.crawling_start_time}\n\n"
@@ -60,12 +191,24 @@ class InfoCareCrawler(object):
             f"bids_count\n{statistics['bids_count']}"
         )
 
-    def crawl(self) -> None:
+    def login(self) -> None:
         login_id = self.config["LOGIN_ID"]
         login_pw = self.config["LOGIN_PW"]
 
-        chk_id = self.info_care_client.fetch_chk_id().chk_id
-        self.info_care_client.login(login_id, login_pw, chk_id)
+        with self.profiler.stage("login"):
+            chk_id = self.info_care_client.fetch_chk_id().chk_id
+            self.info_care_client.login(login_id, login_pw, chk_id)
+
+    def relogin(self) -> None:
+        # 세션이 끊겼을 수 있으므로 다음 주기 전에 다시 로그인합니다.
+        try:
+            self.info_care_client.logout()
+            self.login()
+        except Exception as e:
+            logger.error("Exception while logging in again", exc_info=e)
+
+    def crawl(self) -> None:
+        self.login()
 
         # 도, 시군구, 읍면동 리스트를 받아와 검색
         try:
@@ -74,47 +217,122 @@ class InfoCareCrawler(object):
             raise e
         finally:
             self.info_care_client.logout()
+            self.info_care_client.close()
+
+    def fetch_cached(
+        self, key: typing.Tuple[str, ...], fetch: typing.Callable[[], T]
+    ) -> T:
+        now = time.monotonic()
+        cached = self.taxonomy_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return typing.cast(T, cached[1])
+
+        value = fetch()
+        self.taxonomy_cache[key] = (now + self.taxonomy_ttl, value)
+        # 다음 실행의 계획(plan)에 쓸 수 있도록 이름 목록을 남깁니다.
+        attribute = NAME_ATTRIBUTES[key[0]]
+        self.history.taxonomy[taxonomy_key(key)] = [
+            getattr(x, attribute)
+            for x in typing.cast(typing.List[typing.Any], value)
+        ]
+        return value
+
+    def fetch_names(self, key: typing.Tuple[str, ...]) -> typing.List[str]:
+        client = self.info_care_client
+        fetchers: typing.Dict[str, typing.Callable[..., typing.Any]] = {
+            "sido": client.fetch_sido_list,
+            "sigungu": client.fetch_sigungu_list,
+            "dongli": client.fetch_dongli_list,
+            "main_using_type": client.fetch_main_using_type,
+            "sub_using_type": client.fetch_sub_using_type,
+        }
+        self.fetch_cached(key, lambda: fetchers[key[0]](*key[1:]))
+        return self.history.taxonomy[taxonomy_key(key)]
 
+    def in_cycle_scope(self, *region: str) -> bool:
+        return self.cycle_scope is None or region in self.cycle_scope
+
+    @stage("crawl_sido_region")
     def crawl_sido_region(self) -> None:
         try:
-            do_list = self.info_care_client.fetch_sido_list()
+            do_list = self.fetch_cached(
+                ("sido",), self.info_care_client.fetch_sido_list
+            )
         except Exception as e:
             self.failure_statistics.region_count += 1
             raise e
 
         for do in do_list:
+            if self.stopped:
+                break
+            if not self.in_cycle_scope(do.sido_name):
+                continue
             if re.search(self.config["SIDO"], do.sido_name):
                 self.crawl_sigungu_region(do.sido_name)
 
+    @stage("crawl_sigungu_region")
     def crawl_sigungu_region(self, sido: str) -> None:
         try:
-            si_list = self.info_care_client.fetch_sigungu_list(sido)
+            si_list = self.fetch_cached(
+                ("sigungu", sido),
+                lambda: self.info_care_client.fetch_sigungu_list(sido),
+            )
         except Exception as e:
             self.failure_statistics.region_count += 1
             raise e
 
         for si in si_list:
+            if self.stopped:
+                break
+            if not self.in_cycle_scope(sido, si.sigungu_name):
+                continue
             if re.search(self.config["SIGUNGU"], si.sigungu_name):
                 self.crawl_dongli_region(sido, si.sigungu_name)
 
+    @stage("crawl_dongli_region")
     def crawl_dongli_region(self, sido: str, sigungu: str) -> None:
         try:
-            dongli_list = self.info_care_client.fetch_dongli_list(
-                sido, sigungu
+            dongli_list = self.fetch_cached(
+                ("dongli", sido, sigungu),
+                lambda: self.info_care_client.fetch_dongli_list(
+                    sido, sigungu
+                ),
             )
         except Exception as e:
             self.failure_statistics.region_count += 1
             raise e
 
+        # 시군구 단위 낙찰사례 페이지에는 크롤링하지 않는 읍/면/동의 행도
+        # 있으므로 행은 시군구의 모든 읍/면/동으로 나눕니다.
+        sigungu_dongs = [dong.dongli_name for dong in dongli_list]
+        dongli_list = [
+            dong for dong in dongli_list
+            if re.search(self.config["DONGLI"], dong.dongli_name)
+            and self.in_cycle_scope(sido, sigungu, dong.dongli_name)
+        ]
+        self.progress.tasks_queued += len(dongli_list)
+
+        self.pending_bids.clear()
         for dong in dongli_list:
-            if re.search(self.config["DONGLI"], dong.dongli_name):
+            if self.stopped:
+                break
+            # 읍/면/동 하나를 프로파일링 작업 단위로 봅니다.
+            with self.profiler.task():
                 self.crawl_main_using_type(sido, sigungu, dong.dongli_name)
+            self.progress.tasks_completed += 1
+
+        # 멈춘 경우에도 이미 받은 통계의 낙찰사례까지는 저장합니다.
+        self.crawl_sigungu_bids(sido, sigungu, sigungu_dongs)
 
+    @stage("crawl_main_using_type")
     def crawl_main_using_type(
         self, sido: str, sigungu: str, dongli: str
     ) -> None:
         try:
-            main_using_list = self.info_care_client.fetch_main_using_type()
+            main_using_list = self.fetch_cached(
+                ("main_using_type",),
+                self.info_care_client.fetch_main_using_type,
+            )
         except Exception as e:
             self.failure_statistics.region_count += 1
             raise e
@@ -127,17 +345,27 @@ class InfoCareCrawler(object):
                     sido, sigungu, dongli, main_using_type
                 )
 
+    @stage("crawl_sub_using_type")
     def crawl_sub_using_type(
         self, sido: str, sigungu: str, dongli: str, main_using_type: str
     ) -> None:
         try:
-            sub_using_list = self.info_care_client.fetch_sub_using_type(
-                main_using_type
+            sub_using_list = self.fetch_cached(
+                ("sub_using_type", main_using_type),
+                lambda: self.info_care_client.fetch_sub_using_type(
+                    main_using_type
+                ),
             )
         except Exception as e:
             self.failure_statistics.region_count += 1
             raise e
 
+        # 통계 페이지를 먼저 모두 요청하고, 파싱이 끝나면 요청한 순서대로 저장합니다.
+        pending: typing.List[
+            typing.Tuple[
+                str, "concurrent.futures.Future[InfocareSearchResponse]"
+            ]
+        ] = []
         for sub_using in sub_using_list:
             sub_using_type = sub_using.sub_using_type
 
@@ -151,17 +379,20 @@ class InfoCareCrawler(object):
                     main_using_type=main_using_type,
                     sub_using_type=sub_using_type,
                 )
-                data = self.info_care_client.fetch_statistics_page(
+                future = self.info_care_client.submit_statistics_page(
                     sido, sigungu, dongli, main_using_type, sub_using_type
                 )
-                self.crawl_html_data(
-                    data,
-                    sido,
-                    sigungu,
-                    dongli,
-                    main_using_type,
-                    sub_using_type,
-                )
+                pending.append((sub_using_type, future))
+
+        for sub_using_type, future in pending:
+            self.crawl_html_data(
+                future.result(),
+                sido,
+                sigungu,
+                dongli,
+                main_using_type,
+                sub_using_type,
+            )
 
         self.total_statistics.region_count += 1
 
@@ -175,8 +406,9 @@ class InfoCareCrawler(object):
         sub_using_type: str,
     ) -> None:
 
-        start_date = search_data.term1
-        end_date = search_data.term2
+        self.history.bids_count[taxonomy_key((
+            sido, sigungu, dongli, main_using_type, sub_using_type
+        ))] = search_data.bids_count
         try:
             self.download_html_data(
                 search_data.raw_data,
@@ -186,6 +418,7 @@ class InfoCareCrawler(object):
                 main_using_type,
                 sub_using_type,
                 "statistics",
+                search_data.encoding,
             )
         except Exception as e:
             self.failure_statistics.statistics_count += 1
@@ -195,25 +428,181 @@ class InfoCareCrawler(object):
 
         # 낙찰사례가 1개 이상인경우 more 버튼의 페이지 다운로드
         if search_data.bids_count > 0:
-            try:
-                big_page = self.info_care_client.fetch_bid_page(
+            if self.bid_fetch_scale == "sigungu":
+                # 시군구의 읍/면/동을 모두 받은 뒤 한 번에 요청합니다.
+                self.pending_bids[(main_using_type, sub_using_type)].append(
+                    (dongli, search_data)
+                )
+                return
+            self.crawl_bid_page(
+                search_data,
+                sido,
+                sigungu,
+                dongli,
+                main_using_type,
+                sub_using_type,
+            )
+
+    def crawl_bid_page(
+        self,
+        search_data: InfocareSearchResponse,
+        sido: str,
+        sigungu: str,
+        dongli: str,
+        main_using_type: str,
+        sub_using_type: str,
+    ) -> None:
+        try:
+            big_page = self.info_care_client.fetch_bid_page(
+                sido,
+                sigungu,
+                dongli,
+                main_using_type,
+                sub_using_type,
+                search_data.term1,
+                search_data.term2,
+                search_data.category,
+            )
+            self.download_html_data(
+                big_page.raw_data,
+                sido,
+                sigungu,
+                dongli,
+                main_using_type,
+                sub_using_type,
+                "bid",
+                big_page.encoding,
+            )
+        except Exception as e:
+            self.failure_statistics.bids_count += 1
+            raise e
+
+        self.total_statistics.bids_count += 1
+
+    @stage("crawl_sigungu_bids")
+    def crawl_sigungu_bids(
+        self, sido: str, sigungu: str, sigungu_dongs: typing.List[str]
+    ) -> None:
+        # 검색 기간과 분류가 같은 읍/면/동끼리 시군구 단위로 한 번 요청합니다.
+        groups: typing.DefaultDict[
+            typing.Tuple[str, str, str, str, str],
+            typing.List[typing.Tuple[str, InfocareSearchResponse]],
+        ] = collections.defaultdict(list)
+        for (main_using_type, sub_using_type), pages in (
+            self.pending_bids.items()
+        ):
+            for dongli, search_data in pages:
+                groups[(
+                    main_using_type,
+                    sub_using_type,
+                    search_data.term1,
+                    search_data.term2,
+                    search_data.category,
+                )].append((dongli, search_data))
+
+        for (main_using_type, sub_using_type, *_), pages in (
+            groups.items()
+        ):
+            self.crawl_sigungu_bid_page(
+                sido,
+                sigungu,
+                sigungu_dongs,
+                main_using_type,
+                sub_using_type,
+                pages,
+            )
+
+        self.pending_bids.clear()
+
+    def crawl_sigungu_bid_page(
+        self,
+        sido: str,
+        sigungu: str,
+        sigungu_dongs: typing.List[str],
+        main_using_type: str,
+        sub_using_type: str,
+        pages: typing.List[typing.Tuple[str, InfocareSearchResponse]],
+    ) -> None:
+        search_data = pages[0][1]
+        try:
+            bid_page, split = self.info_care_client.fetch_sigungu_bid_page(
+                sido,
+                sigungu,
+                sigungu_dongs,
+                main_using_type,
+                sub_using_type,
+                search_data.term1,
+                search_data.term2,
+                search_data.category,
+            )
+        except Exception as e:
+            self.failure_statistics.bids_count += len(pages)
+            raise e
+
+        # 읍/면/동을 정하지 못한 행이 있으면 그 행이 어느 읍/면/동의 것인지
+        # 알 수 없으므로 모두 읍/면/동 단위로 받습니다.
+        if split.unassigned:
+            logger.info(
+                "Fetching bids by dong",
+                sido=sido,
+                sigungu=sigungu,
+                main_using_type=main_using_type,
+                sub_using_type=sub_using_type,
+                unassigned=len(split.unassigned),
+            )
+            for dongli, search_data in pages:
+                self.crawl_bid_page(
+                    search_data,
                     sido,
                     sigungu,
                     dongli,
                     main_using_type,
                     sub_using_type,
-                    start_date,
-                    end_date,
-                    search_data.category,
                 )
-                self.download_html_data(
-                    big_page.raw_data,
+            return
+
+        source: typing.Optional[str] = None
+        for dongli, search_data in pages:
+            rows = split.rows[dongli]
+            # 일부만 나뉜 경우 읍/면/동 단위로 받습니다.
+            if len(rows) < search_data.bids_count:
+                logger.info(
+                    "Fetching bids by dong",
+                    sido=sido,
+                    sigungu=sigungu,
+                    dong=dongli,
+                    rows=len(rows),
+                    bids_count=search_data.bids_count,
+                )
+                self.crawl_bid_page(
+                    search_data,
+                    sido,
+                    sigungu,
+                    dongli,
+                    main_using_type,
+                    sub_using_type,
+                )
+                continue
+
+            try:
+                if source is None:
+                    source = self.archive_sigungu_bid_page(
+                        bid_page.raw_data,
+                        sido,
+                        sigungu,
+                        main_using_type,
+                        sub_using_type,
+                        search_data,
+                        bid_page.encoding,
+                    )
+                self.store_bid_split(
+                    source,
+                    rows,
                     sido,
                     sigungu,
                     dongli,
                     main_using_type,
                     sub_using_type,
-                    "bid",
                 )
             except Exception as e:
                 self.failure_statistics.bids_count += 1
@@ -221,15 +610,96 @@ class InfoCareCrawler(object):
 
             self.total_statistics.bids_count += 1
 
+    def archive_sigungu_bid_page(
+        self,
+        data: bytes,
+        sido: str,
+        sigungu: str,
+        main_using_type: str,
+        sub_using_type: str,
+        search_data: InfocareSearchResponse,
+        encoding: str,
+    ) -> str:
+        """
+        시군구 단위 낙찰사례 페이지를 받은 그대로 올리고 실행 폴더 아래의
+        경로를 돌려줍니다. 읍/면/동의 낙찰사례는 이 페이지의 행을
+        :meth:`store_bid_split` 으로 기록합니다.
+
+        """
+        folder_name = (
+            f"{SIGUNGU_BID_FOLDER_NAME}/"
+            f"{sido}/"
+            f"{sigungu}/"
+            f"{main_using_type}/"
+            f"{sub_using_type}"
+        )
+        file_name = (
+            f"{sido}_"
+            f"{sigungu}_"
+            f"{main_using_type}_"
+            f"{sub_using_type}_"
+            f"{search_data.term1}_"
+            f"{search_data.term2}_"
+            f"{search_data.category}_"
+            f"bid.html"
+        )
+        # 나누거나 압축하지 않은 페이지이므로 minified 를 남기지 않습니다.
+        self.upload_data(
+            folder_name, file_name, data, f"text/html; charset={encoding}"
+        )
+
+        key = f"{folder_name}/{file_name}"
+        if self.records is not None:
+            self.records.submit("bid", key, data, encoding)
+        return key
+
+    def store_bid_split(
+        self,
+        source: str,
+        rows: typing.List[InfocareBidRow],
+        sido: str,
+        sigungu: str,
+        dongli: str,
+        main_using_type: str,
+        sub_using_type: str,
+    ) -> None:
+        # 읍/면/동의 낙찰사례 폴더에 시군구 페이지에서 이 읍/면/동의 행을
+        # 사건번호와 소재지로 남깁니다. store 는 .json 을 이 기록으로 읽습니다.
+        split = {
+            "source": source,
+            "rows": [
+                {"case_number": x.case_number, "address": x.address}
+                for x in rows
+            ],
+        }
+        file_name = (
+            f"{sido}_"
+            f"{sigungu}_"
+            f"{dongli}_"
+            f"{main_using_type}_"
+            f"{sub_using_type}_"
+            f"bid.json"
+        )
+        self.upload_data(
+            self.data_folder_name(
+                sido, sigungu, dongli, main_using_type, sub_using_type, "bid"
+            ),
+            file_name,
+            # 어느 인코딩으로 읽어도 같도록 ASCII 로 씁니다.
+            json.dumps(split).encode("ascii"),
+            "application/json",
+        )
+
     def download_html_data(
         self,
-        data: str,
+        data: bytes,
         sido: str,
         sigungu: str,
         dongli: str,
         main_using_type: str,
         sub_using_type: str,
         data_type: str,
+        encoding: str,
     ) -> None:
 
         file_name = (
@@ -241,41 +711,49 @@ class InfoCareCrawler(object):
             f"{data_type}"
         )
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = str(temp_dir) + "\\"
-            file_name = f"{file_name}.html"
-            file_path = temp_path + file_name
-            write_file(file_path, data)
+        # 받은 페이지를 다시 인코딩하지 않고 그대로 저장합니다.
+        file_name = f"{file_name}.html"
+        folder_name = self.data_folder_name(
+            sido, sigungu, dongli, main_using_type, sub_using_type, data_type
+        )
+        # 받은 그대로의 인코딩을 Content-Type 에도 남깁니다.
+        self.upload_data(
+            folder_name, file_name, data, self.html_mime_type(encoding)
+        )
 
-            self.store_detail(
-                sido,
-                sigungu,
-                dongli,
-                main_using_type,
-                sub_using_type,
-                file_path,
-                file_name,
-                data_type,
+        if self.records is not None:
+            self.records.submit(
+                data_type, f"{folder_name}/{file_name}", data, encoding
             )
 
-    def store_detail(
-        self,
+    @stage("upload")
+    def upload_data(
+        self, folder_name: str, file_name: str, data: bytes, mime_type: str
+    ) -> None:
+        # 실행 폴더 아래 folder_name 에 data 를 그대로 올립니다.
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, file_name)
+            with open(file_path, "wb") as f:
+                f.write(data)
+            self.s3_client.upload_any_file(
+                folder_name=f"{self.run_folder_name}/{folder_name}",
+                file_name=file_name,
+                file_path=file_path,
+                mime_type=mime_type,
+                mode="rb",
+            )
+
+    @staticmethod
+    def data_folder_name(
         sido: str,
         sigungu: str,
         dongli: str,
         main_using_type: str,
         sub_using_type: str,
-        file_path: str,
-        file_name: str,
         data_type: str,
-    ) -> None:
-
+    ) -> str:
+        # 실행 폴더 아래의 경로
         folder_name = (
-            f"{self.config['ENVIRONMENT']}/"
-            f"{self.crawling_date.year}/"
-            f"{self.crawling_date.month:02}/"
-            f"{self.crawling_date.day:02}/"
-            f"{str(self.crawling_start_time)}/"
             f"data/"
             f"{sido}/"
             f"{sigungu}/"
@@ -287,14 +765,25 @@ class InfoCareCrawler(object):
         if data_type == "bid":
             folder_name += f"/{data_type}"
 
-        self.s3_client.upload_any_file(
-            folder_name=folder_name,
-            file_name=file_name,
-            file_path=file_path,
-            mime_type="text/html",
-            mode="rb",
+        return folder_name
+
+    def html_mime_type(self, encoding: str) -> str:
+        mime_type = f"text/html; charset={encoding}"
+        if self.info_care_client.minify:
+            mime_type += f"; minified={MINIFY_VERSION}"
+        return mime_type
+
+    @property
+    def run_folder_name(self) -> str:
+        return (
+            f"{self.config['ENVIRONMENT']}/"
+            f"{self.crawling_date.year}/"
+            f"{self.crawling_date.month:02}/"
+            f"{self.crawling_date.day:02}/"
+            f"{str(self.crawling_start_time)}"
         )
 
+    @stage("upload")
     def update_crawler_log(self, run_by: str) -> None:
         total_statistics = attr.asdict(self.total_statistics)
 
@@ -303,19 +792,113 @@ class InfoCareCrawler(object):
             "run_by": run_by,
             "finish_time_stamp": str(timestamp(tznow())),
             "total_statistics": total_statistics,
+            # 중간에 멈춘 경우 일부 지역만 저장되어 있습니다.
+            "interrupted": self.stopped,
+            # store 는 이 인코딩으로 페이지를 디코딩합니다.
+            "page_encoding": ENCODING,
         }
 
-        folder_name = (
-            f"{self.config['ENVIRONMENT']}/"
-            f"{self.crawling_date.year}/"
-            f"{self.crawling_date.month:02}/"
-            f"{self.crawling_date.day:02}/"
-            f"{str(self.crawling_start_time)}/"
-            f"crawler-log"
-        )
+        folder_name = f"{self.run_folder_name}/crawler-log"
 
         file_name = f"{self.crawling_start_time}.json"
 
         self.s3_client.upload_json(
             folder_name=folder_name, file_name=file_name, data=data
         )
+
+        # 중간에 멈춘 실행은 store 가 최신 실행으로 고르지 않도록 뺍니다.
+        if not self.stopped:
+            self.s3_client.upload_json(
+                folder_name=f"{self.config['ENVIRONMENT']}/{RUN_FOLDER_NAME}",
+                file_name=file_name,
+                data=dict(data, prefix=f"{self.run_folder_name}/"),
+            )
+
+    @stage("upload")
+    def upload_records(self) -> None:
+        if self.records is None:
+            return
+
+        try:
+            self.s3_client.upload_any_file(
+                folder_name=f"{self.run_folder_name}/records",
+                file_name=RECORDS_FILE_NAME,
+                file_path=self.records.finish(),
+                mime_type="application/x-ndjson; charset=utf-8",
+                mode="rb",
+            )
+        finally:
+            self.records.close()
+            self.records = None
+
+    def load_history(self) -> CrawlHistory:
+        key = f"{self.config['ENVIRONMENT']}/{HISTORY_FILE_NAME}"
+        try:
+            s3_response = self.s3_client.get_object(key)
+        except Exception as e:
+            logger.info("Crawl history not found", key=key, error=str(e))
+            return CrawlHistory()
+        return CrawlHistory.from_json(json.loads(s3_response.body.read()))
+
+    @stage("upload")
+    def update_crawl_history(self) -> None:
+        history = self.load_history()
+        self.history.latency = self.progress.average_latency
+        history.update(self.history)
+
+        self.s3_client.upload_json(
+            folder_name=self.config["ENVIRONMENT"],
+            file_name=HISTORY_FILE_NAME,
+            data=history.to_json(),
+        )
+
+    def plan(self, refresh: bool = False) -> CrawlPlan:
+        """
+        통계 페이지를 받지 않고 요청 수와 소요 시간을 계산합니다.
+        지난 기록에 없는 목록만 로그인해서 받아옵니다.
+
+        """
+        history = self.load_history()
+        logged_in = False
+
+        def fetch_names(key: typing.Tuple[str, ...]) -> typing.List[str]:
+            nonlocal logged_in
+            names = history.taxonomy.get(taxonomy_key(key))
+            if names is not None and not refresh:
+                return names
+            if not logged_in:
+                self.login()
+                logged_in = True
+            return self.fetch_names(key)
+
+        try:
+            return make_plan(self.config, fetch_names, history)
+        finally:
+            if logged_in:
+                self.info_care_client.logout()
+            self.info_care_client.close()
+
+    def upload_profile(self) -> None:
+        if not self.profiler.enabled:
+            return
+
+        folder_name = f"{self.run_folder_name}/profile"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_names = self.profiler.dump(
+                temp_dir, self.crawling_start_time
+            )
+            for file_name in file_names:
+                self.s3_client.upload_any_file(
+                    folder_name=folder_name,
+                    file_name=file_name,
+                    file_path=os.path.join(temp_dir, file_name),
+                    mime_type="application/octet-stream",
+                    mode="rb",
+                )
+
+        self.s3_client.upload_json(
+            folder_name=folder_name,
+            file_name=f"{self.crawling_start_time}-summary.json",
+            data=self.profiler.summary(),
+        )
@@ -0,0 +1,230 @@
+"""
+plan
+====
+
+설정된 지역, 용도 정규식으로 크롤링할 때 보낼 요청 수와 소요 시간을
+통계 페이지를 받지 않고 미리 계산합니다.
+
+지난 크롤링에서 받은 목록과 페이지별 낙찰 건수, 평균 응답 시간은
+``{ENVIRONMENT}/crawler-history.json`` 에 남겨 두고 계산에 사용합니다.
+
+"""
+import collections
+import re
+import typing
+
+import attr
+
+HISTORY_FILE_NAME = "crawler-history.json"
+
+#: 기록이 없을 때 사용하는 요청 한 번의 응답 시간 (초)
+DEFAULT_LATENCY = 1.0
+
+#: 로그인 페이지, 로그인, 로그아웃
+SESSION_REQUESTS = 3
+
+#: 목록 종류별 이름 속성
+NAME_ATTRIBUTES = {
+    "sido": "sido_name",
+    "sigungu": "sigungu_name",
+    "dongli": "dongli_name",
+    "main_using_type": "main_using_type",
+    "sub_using_type": "sub_using_type",
+}
+
+
+def taxonomy_key(key: typing.Tuple[str, ...]) -> str:
+    return "/".join(key)
+
+
+@attr.s
+class CrawlHistory(object):
+    #: 목록 종류와 상위 지역/용도를 이은 키별 이름 목록
+    taxonomy: typing.Dict[str, typing.List[str]] = attr.ib(factory=dict)
+    #: "시도/시군구/읍면동/대분류/소분류" 별 1년간 낙찰 건수
+    bids_count: typing.Dict[str, int] = attr.ib(factory=dict)
+    #: 요청 한 번의 평균 응답 시간 (초)
+    latency: typing.Optional[float] = attr.ib(default=None)
+
+    @classmethod
+    def from_json(cls, data: typing.Dict[str, typing.Any]) -> "CrawlHistory":
+        return cls(
+            taxonomy=data.get("taxonomy", {}),
+            bids_count=data.get("bids_count", {}),
+            latency=data.get("latency"),
+        )
+
+    def to_json(self) -> typing.Dict[str, typing.Any]:
+        return attr.asdict(self)
+
+    def update(self, other: "CrawlHistory") -> None:
+        self.taxonomy.update(other.taxonomy)
+        self.bids_count.update(other.bids_count)
+        if other.latency is not None:
+            self.latency = other.latency
+
+    def hot_regions(self) -> typing.Set[typing.Tuple[str, ...]]:
+        """
+        지난 기록에서 낙찰 건수가 있던 읍/면/동과 그 상위 지역을
+        ``(시도,)``, ``(시도, 시군구)``, ``(시도, 시군구, 읍면동)`` 으로 돌려줍니다.
+
+        """
+        regions: typing.Set[typing.Tuple[str, ...]] = set()
+        for key, count in self.bids_count.items():
+            if count <= 0:
+                continue
+            region = tuple(key.split("/")[:3])
+            for depth in range(1, len(region) + 1):
+                regions.add(region[:depth])
+        return regions
+
+    @property
+    def bid_ratio(self) -> float:
+        # 낙찰 건수를 모르는 페이지는 지난 기록의 비율만큼 더보기를 요청합니다.
+        if not self.bids_count:
+            return 1.0
+        with_bids = sum(1 for x in self.bids_count.values() if x > 0)
+        return with_bids / len(self.bids_count)
+
+
+@attr.s
+class SidoPlan(object):
+    sido: str = attr.ib()
+    sigungu_count: int = attr.ib(default=0)
+    dongli_count: int = attr.ib(default=0)
+    #: 시군구, 읍면동, 용도 목록 요청 수
+    list_requests: int = attr.ib(default=0)
+    #: 통계 페이지 요청 수
+    statistics_requests: int = attr.ib(default=0)
+    #: 낙찰사례 더보기 요청 수 (기록이 없는 페이지는 기댓값)
+    bid_requests: float = attr.ib(default=0.0)
+
+    @property
+    def requests(self) -> float:
+        return (
+            self.list_requests + self.statistics_requests + self.bid_requests
+        )
+
+
+@attr.s
+class CrawlPlan(object):
+    sidos: typing.List[SidoPlan] = attr.ib()
+    #: 시도 목록, 용도 목록, 로그인처럼 시도와 관계없는 요청 수
+    common_requests: int = attr.ib()
+    #: 요청 한 번에 걸리는 시간 (응답 시간 + CLIENT_DELAY)
+    seconds_per_request: float = attr.ib()
+
+    @property
+    def requests(self) -> float:
+        return self.common_requests + sum(x.requests for x in self.sidos)
+
+    @property
+    def seconds(self) -> float:
+        return self.requests * self.seconds_per_request
+
+
+def make_plan(
+    config: typing.Dict[str, typing.Any],
+    fetch_names: typing.Callable[[typing.Tuple[str, ...]], typing.List[str]],
+    history: CrawlHistory,
+) -> CrawlPlan:
+    """
+    크롤러와 같은 순서로 목록을 따라가며 요청 수를 셉니다.
+    ``fetch_names`` 는 ``("sigungu", "서울")`` 같은 키로 이름 목록을 돌려줍니다.
+
+    """
+    cached = float(config.get("TAXONOMY_TTL") or 0) > 0
+    bid_ratio = history.bid_ratio
+
+    main_using_types = [
+        x for x in fetch_names(("main_using_type",))
+        if re.search(config["MAIN_USING_TYPE"], x)
+    ]
+    sub_using_types = {
+        main_using_type: [
+            x for x in fetch_names(("sub_using_type", main_using_type))
+            if re.search(config["SUB_USING_TYPE"], x)
+        ]
+        for main_using_type in main_using_types
+    }
+    # 목록을 캐싱하면 용도 목록은 한 번씩만 요청합니다.
+    usage_list_requests = 1 + len(main_using_types)
+
+    sidos = []
+    for sido in fetch_names(("sido",)):
+        if not re.search(config["SIDO"], sido):
+            continue
+        plan = SidoPlan(sido, list_requests=1)
+        for sigungu in fetch_names(("sigungu", sido)):
+            if not re.search(config["SIGUNGU"], sigungu):
+                continue
+            dongli_list = [
+                x for x in fetch_names(("dongli", sido, sigungu))
+                if re.search(config["DONGLI"], x)
+            ]
+            plan.sigungu_count += 1
+            plan.dongli_count += len(dongli_list)
+            plan.list_requests += 1
+            if not cached:
+                plan.list_requests += len(dongli_list) * usage_list_requests
+
+            expected_bids: typing.Dict[typing.Tuple[str, str], float] = (
+                collections.defaultdict(float)
+            )
+            for dongli in dongli_list:
+                for main_using_type, subs in sub_using_types.items():
+                    for sub_using_type in subs:
+                        plan.statistics_requests += 1
+                        bids_count = history.bids_count.get(taxonomy_key((
+                            sido, sigungu, dongli,
+                            main_using_type, sub_using_type,
+                        )))
+                        expected_bids[(main_using_type, sub_using_type)] += (
+                            bid_ratio if bids_count is None
+                            else float(bids_count > 0)
+                        )
+
+            if config.get("BID_FETCH_SCALE") == "sigungu":
+                # 용도마다 시군구 단위로 한 번만 요청합니다.
+                plan.bid_requests += sum(
+                    min(x, 1.0) for x in expected_bids.values()
+                )
+            else:
+                plan.bid_requests += sum(expected_bids.values())
+        sidos.append(plan)
+
+    common_requests = SESSION_REQUESTS + 1
+    if cached:
+        common_requests += usage_list_requests
+
+    latency = history.latency
+    if latency is None:
+        latency = DEFAULT_LATENCY
+
+    return CrawlPlan(
+        sidos=sidos,
+        common_requests=common_requests,
+        seconds_per_request=latency + float(config.get("CLIENT_DELAY") or 0),
+    )
+
+
+def render_plan(plan: CrawlPlan) -> str:
+    lines = [
+        f"{'sido':<8} {'sigungu':>8} {'dongli':>8} {'list':>8}"
+        f" {'stats':>8} {'bid':>8} {'requests':>9} {'hours':>7}",
+    ]
+    for sido in plan.sidos:
+        hours = sido.requests * plan.seconds_per_request / 3600
+        lines.append(
+            f"{sido.sido:<8} {sido.sigungu_count:>8} {sido.dongli_count:>8}"
+            f" {sido.list_requests:>8} {sido.statistics_requests:>8}"
+            f" {sido.bid_requests:>8.0f} {sido.requests:>9.0f} {hours:>7.2f}"
+        )
+    lines += [
+        "",
+        f"common requests: {plan.common_requests}",
+        f"seconds per request: {plan.seconds_per_request:.2f}",
+        f"total requests: {plan.requests:.0f}",
+        f"estimated hours: {plan.seconds / 3600:.2f}",
+    ]
+    return "\n".join(lines)
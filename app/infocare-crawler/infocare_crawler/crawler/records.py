@@ -0,0 +1,137 @@
+"""
+records
+=======
+
+업로드한 페이지를 ``crawler.infocare_schema`` 로 파싱한 결과를 실행마다
+하나의 JSON lines 파일(``{run}/records/records.jsonl``)로 남깁니다.
+store 는 이 파일이 있고 스키마 버전이 같으면 HTML 을 다시 파싱하지 않습니다.
+
+첫 줄은 헤더이고, 이후 줄은 페이지마다 하나씩입니다. ::
+
+    {"type": "header", "schema": 1, "time_stamp": "..."}
+    {"type": "statistics", "key": "data/.../..._statistics.html", "data": {}}
+    {"type": "bid", "key": "data/.../bid/..._bid.html", "data": [{}, ...]}
+
+"""
+import concurrent.futures
+import datetime
+import decimal
+import json
+import os
+import tempfile
+import typing
+
+import attr
+import structlog
+from crawler.infocare_schema import (
+    InfocareStatisticResponse,
+    InfocareBidResponse,
+)
+
+logger = structlog.get_logger(__name__)
+
+#: 레코드 형식이나 담는 값이 바뀌면 올립니다. store 의 버전과 같아야 합니다.
+SCHEMA_VERSION = 1
+
+RECORDS_FILE_NAME = "records.jsonl"
+
+#: 레코드에 담지 않는 속성
+_EXCLUDED_ATTRIBUTES = {"raw_data"}
+
+
+def encode_value(value: typing.Any) -> typing.Any:
+    """
+    파싱 결과를 JSON 으로 바꿉니다. 날짜와 Decimal 은 타입을 함께 남깁니다.
+
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(x) for x in value]
+    if isinstance(value, dict):
+        return {str(k): encode_value(v) for k, v in value.items()}
+    if attr.has(type(value)):
+        fields = attr.asdict(value, recurse=False)
+    elif hasattr(value, "__dict__"):
+        fields = vars(value)
+    else:
+        raise TypeError(f"cannot encode {type(value).__name__}")
+    return {
+        k: encode_value(v) for k, v in fields.items()
+        if not k.startswith("_") and k not in _EXCLUDED_ATTRIBUTES
+    }
+
+
+def build_record(data_type: str, data: bytes, encoding: str) -> typing.Any:
+    # 프로세스 풀에서 실행되므로 모듈 최상위에 둡니다.
+    text = data.decode(encoding)
+    if data_type == "bid":
+        return encode_value(
+            InfocareBidResponse.from_html(text).infocare_bid_list
+        )
+    return encode_value(InfocareStatisticResponse.from_html(text))
+
+
+class RecordWriter(object):
+    """
+    페이지를 파서 풀에서 레코드로 바꾸고, 요청한 순서대로 임시 파일에 씁니다.
+
+    """
+
+    def __init__(
+        self, executor: concurrent.futures.Executor, time_stamp: str
+    ) -> None:
+        self.executor = executor
+        self.pending: typing.List[
+            typing.Tuple[str, str, "concurrent.futures.Future[typing.Any]"]
+        ] = []
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, RECORDS_FILE_NAME)
+        self.file = open(self.file_path, "w", encoding="utf-8")
+        self.count = 0
+        self._write_line(
+            {"type": "header", "schema": SCHEMA_VERSION,
+             "time_stamp": time_stamp}
+        )
+
+    def submit(
+        self, data_type: str, key: str, data: bytes, encoding: str
+    ) -> None:
+        future = self.executor.submit(build_record, data_type, data, encoding)
+        self.pending.append((data_type, key, future))
+        self._write_done()
+
+    def _write_done(self) -> None:
+        while self.pending and self.pending[0][2].done():
+            data_type, key, future = self.pending.pop(0)
+            try:
+                record = future.result()
+            except Exception as e:
+                # 레코드가 없는 페이지는 store 에서 HTML 로 적재합니다.
+                logger.error("Exception while building record", key=key,
+                             exc_info=e)
+                continue
+            self._write_line({"type": data_type, "key": key, "data": record})
+            self.count += 1
+
+    def _write_line(self, line: typing.Dict[str, typing.Any]) -> None:
+        self.file.write(json.dumps(line, ensure_ascii=False))
+        self.file.write("\n")
+
+    def finish(self) -> str:
+        # 남은 레코드를 모두 기다려 쓴 뒤 파일 경로를 돌려줍니다.
+        concurrent.futures.wait([future for _, _, future in self.pending])
+        self._write_done()
+        self.file.close()
+        return self.file_path
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+        self.temp_dir.cleanup()
@@ -0,0 +1,17 @@
+"""
+runs
+====
+
+끝까지 마친 크롤링 실행마다 ``{ENVIRONMENT}/crawler-runs/{time_stamp}.json``
+을 하나씩 올립니다. store 는 날짜 폴더를 차례로 조회하지 않고 이 폴더의
+목록으로 최근 실행을 찾습니다.
+
+    {"prefix": "production/2020/09/01/1598918400.0/",
+     "time_stamp": "1598918400.0", "run_by": "SCHEDULER",
+     "finish_time_stamp": "...", "total_statistics": {...}}
+
+실행마다 다른 객체에 쓰므로 여러 crawler 가 함께 끝나도 서로의 실행을
+덮어쓰지 않습니다.
+
+"""
+RUN_FOLDER_NAME = "crawler-runs"
@@ -0,0 +1,77 @@
+"""
+metrics
+=======
+
+크롤링 진행 상황을 모아 ``run_scheduler`` 의 cloudwatch 작업에서
+1분마다 전송할 값으로 만듭니다.
+
+"""
+import time
+import typing
+
+import attr
+
+
+@attr.s
+class CrawlerProgress(object):
+    #: 목록을 받아와 크롤링하기로 한 읍/면/동 수
+    tasks_queued: int = attr.ib(default=0)
+    #: 크롤링을 마친 읍/면/동 수
+    tasks_completed: int = attr.ib(default=0)
+    #: 받아온 페이지 수
+    pages: int = attr.ib(default=0)
+    #: 받아온 페이지 크기
+    bytes: int = attr.ib(default=0)
+    #: 재시도를 포함한 요청 횟수
+    attempts: int = attr.ib(default=0)
+    #: 요청에 걸린 시간의 합 (초)
+    request_seconds: float = attr.ib(default=0.0)
+    #: 인포케어가 응답하지 않아 멈춰 있는지
+    paused: bool = attr.ib(default=False)
+
+    _last_time: float = attr.ib(
+        factory=time.monotonic, init=False, repr=False
+    )
+    _last_counts: typing.Tuple[int, int, int, int] = attr.ib(
+        default=(0, 0, 0, 0), init=False, repr=False
+    )
+
+    def start_run(self) -> None:
+        # 이전 실행에서 끝내지 못한 작업은 대기열에서 뺍니다.
+        self.tasks_queued = self.tasks_completed
+
+    @property
+    def average_latency(self) -> typing.Optional[float]:
+        if not self.attempts:
+            return None
+        return self.request_seconds / self.attempts
+
+    def collect(self) -> typing.Dict[str, float]:
+        """
+        지난 호출 이후의 분당 처리량과 남은 작업을 돌려줍니다.
+
+        """
+        now = time.monotonic()
+        counts = (self.tasks_completed, self.pages, self.bytes, self.attempts)
+        minutes = max((now - self._last_time) / 60, 1e-9)
+        tasks, pages, bytes_, attempts = (
+            current - last for current, last in zip(counts, self._last_counts)
+        )
+        self._last_time, self._last_counts = now, counts
+
+        queue_depth = max(self.tasks_queued - self.tasks_completed, 0)
+        metrics = {
+            "crawler_tasks_completed": float(self.tasks_completed),
+            "crawler_pages_per_minute": pages / minutes,
+            "crawler_bytes_per_minute": bytes_ / minutes,
+            # 페이지를 받지 못한 요청(재시도, 실패)의 비율
+            "crawler_retry_rate": (
+                (attempts - pages) / attempts if attempts else 0.0
+            ),
+            "crawler_queue_depth": float(queue_depth),
+            "crawler_paused": float(self.paused),
+        }
+        # 지금까지 목록을 받은 읍/면/동을 이번 분의 속도로 마칠 때까지의 시간
+        if tasks > 0:
+            metrics["crawler_eta_seconds"] = queue_depth / tasks * minutes * 60
+        return metrics
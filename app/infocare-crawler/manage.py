@@ -1,28 +1,43 @@
 import code
+import signal
 import typing
 import os
 import attr
 import click
-import psutil
 import infocare_crawler.config
 import structlog
-from tanker.utils.logging import setup_logging
-from dotenv import load_dotenv, find_dotenv
-from infocare_crawler.crawler import InfoCareCrawler
-from crawler.aws_client import CloudWatchClient
-from apscheduler.schedulers.background import BackgroundScheduler
-import sentry_sdk
-from sentry_sdk.integrations.logging import LoggingIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+from infocare_crawler.metrics import CrawlerProgress
+from crawler.cloudwatch_metrics import put_metrics
+from crawler.profiling import PROFILE_MODES, Profiler, \
+    create_profiler
+
+if typing.TYPE_CHECKING:
+    import psutil
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from crawler.aws_client import CloudWatchClient
 
 logger = structlog.get_logger(__name__)
 
-try:
-    if not os.path.exists("./.env"):
-        raise ValueError
-    load_dotenv(find_dotenv(".env"), override=False, encoding="utf-8")
-except (IOError, ValueError):
-    load_dotenv(find_dotenv(".env.sample"), override=False)
+#: Sentry span 으로 남기는 단계. 시도, 시군구마다 열리는 단계만 넣어
+#: transaction 하나의 span 이 1000 개를 넘지 않게 합니다.
+TRACING_SPAN_STAGES = (
+    "login",
+    "crawl_sido_region",
+    "crawl_sigungu_region",
+    "crawl_dongli_region",
+    "crawl_sigungu_bids",
+)
+
+
+def _load_dotenv() -> None:
+    from dotenv import load_dotenv, find_dotenv
+
+    try:
+        if not os.path.exists("./.env"):
+            raise ValueError
+        load_dotenv(find_dotenv(".env"), override=False, encoding="utf-8")
+    except (IOError, ValueError):
+        load_dotenv(find_dotenv(".env.sample"), override=False)
 
 
 @attr.s
@@ -30,12 +45,21 @@ class Context(object):
     config: typing.Dict[str, typing.Any] = attr.ib()
 
 
-def init_runner(context: Context, run_by: str) -> typing.Callable[[], None]:
+def init_app(context: Context) -> None:
+    # 무거운 모듈은 실제로 크롤링을 돌리는 명령에서만 불러옵니다.
+    import sentry_sdk
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+    from tanker.utils.logging import setup_logging
+
     setup_logging(context.config["DEBUG"])
 
     sentry_sdk.init(
         dsn=context.config.get("SENTRY_DSN"),
         environment=context.config["ENVIRONMENT"],
+        traces_sample_rate=float(
+            context.config.get("TRACES_SAMPLE_RATE") or 0
+        ),
         integrations=[
             SqlalchemyIntegration(),
             # Disable default-integrated log integration
@@ -43,9 +67,37 @@ def init_runner(context: Context, run_by: str) -> typing.Callable[[], None]:
         ],
     )
 
+
+def create_run_profiler(
+    context: Context, profile: typing.Optional[str], profile_every: int
+) -> Profiler:
+    profiler = create_profiler(profile, profile_every)
+    if float(context.config.get("TRACES_SAMPLE_RATE") or 0) > 0:
+        from crawler.tracing import TracingProfiler
+
+        profiler = TracingProfiler(profiler, TRACING_SPAN_STAGES)
+    return profiler
+
+
+def init_runner(
+    context: Context,
+    run_by: str,
+    profile: typing.Optional[str] = None,
+    profile_every: int = 1,
+    progress: typing.Optional[CrawlerProgress] = None,
+) -> typing.Callable[[], None]:
+    from infocare_crawler.crawler import InfoCareCrawler
+
+    init_app(context)
+
     def runner() -> None:
-        crawler = InfoCareCrawler(context.config)
-        crawler.run(run_by)
+        profiler = create_run_profiler(context, profile, profile_every)
+        crawler = InfoCareCrawler(context.config, profiler, progress)
+        try:
+            with profiler.profile():
+                crawler.run(run_by)
+        finally:
+            crawler.upload_profile()
     return runner
 
 
@@ -53,6 +105,7 @@ def init_runner(context: Context, run_by: str) -> typing.Callable[[], None]:
 @click.pass_context
 def cli(ctx: typing.Any) -> None:
     ctx.obj = {}
+    _load_dotenv()
     config = infocare_crawler.config.load()
 
     ctx.obj["context"] = Context(config=config,)
@@ -91,27 +144,129 @@ def shell(ctx: typing.Any, no_ipython: typing.Any) -> None:
 
 
 @cli.command()
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile the run and upload the result next to crawler-log.",
+)
+@click.option(
+    "--profile-every",
+    default=1,
+    show_default=True,
+    help="Profile only every Nth dong to keep the overhead low.",
+)
 @click.pass_context
-def run(ctx: typing.Any) -> None:
+def run(
+    ctx: typing.Any, profile: typing.Optional[str], profile_every: int
+) -> None:
     context: Context = ctx.obj["context"]
 
-    runner = init_runner(context, "DEVELOPER")
+    runner = init_runner(context, "DEVELOPER", profile, profile_every)
 
     runner()
 
 
-# scheduled tasks로 돌릴 때 사용하는 함수이고, cloudwatch 로그를 찍습니다.
 @cli.command()
+@click.option(
+    "--interval",
+    default=None,
+    type=float,
+    help="Seconds between crawl cycles. [default: DAEMON_INTERVAL]",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile the daemon and upload the result when it stops.",
+)
+@click.option(
+    "--profile-every",
+    default=1,
+    show_default=True,
+    help="Profile only every Nth dong to keep the overhead low.",
+)
 @click.pass_context
-def run_scheduler(ctx: typing.Any) -> None:
+def daemon(
+    ctx: typing.Any,
+    interval: typing.Optional[float],
+    profile: typing.Optional[str],
+    profile_every: int,
+) -> None:
+    """
+    Keep one logged-in session and crawl repeatedly until SIGTERM.
+
+    The profile covers every cycle and is uploaded next to the
+    crawler-log of the last cycle.
+
+    """
+    from infocare_crawler.crawler import InfoCareCrawler
+
+    context: Context = ctx.obj["context"]
+
+    init_app(context)
+
+    progress = CrawlerProgress()
+    profiler = create_run_profiler(context, profile, profile_every)
+    crawler = InfoCareCrawler(context.config, profiler, progress)
+
+    def stop(signum: int, frame: typing.Any) -> None:
+        logger.info("Stopping crawler daemon", signal=signum)
+        crawler.stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if interval is None:
+        interval = float(context.config["DAEMON_INTERVAL"])
+
+    scheduler = start_cloudwatch_scheduler(context, progress)
+    try:
+        with profiler.profile():
+            crawler.run_daemon("DAEMON", interval)
+    finally:
+        try:
+            crawler.upload_profile()
+        finally:
+            scheduler.shutdown(wait=False)
+
+
+@cli.command()
+@click.option(
+    "--refresh",
+    default=False,
+    is_flag=True,
+    help="Fetch region and using type lists instead of using the history.",
+)
+@click.pass_context
+def plan(ctx: typing.Any, refresh: bool) -> None:
+    """
+    Estimate requests and hours of a run without fetching statistics pages.
+
+    """
+    from infocare_crawler.crawler import InfoCareCrawler
+    from infocare_crawler.crawler.plan import render_plan
+
     context: Context = ctx.obj["context"]
 
+    crawler = InfoCareCrawler(context.config)
+
+    click.echo(render_plan(crawler.plan(refresh)))
+
+
+def start_cloudwatch_scheduler(
+    context: Context, progress: CrawlerProgress
+) -> "BackgroundScheduler":
+    import psutil
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from crawler.aws_client import CloudWatchClient
+
     cloudwatch = CloudWatchClient(context.config)
 
     scheduler = BackgroundScheduler()
     scheduler.add_job(
         _run_cloudwatch_log,
-        args=[cloudwatch],
+        args=[cloudwatch, psutil.Process(), progress],
         id="cloudwatch_log",
         name="cloudwatch_log",
         trigger="cron",
@@ -120,30 +275,41 @@ def run_scheduler(ctx: typing.Any) -> None:
 
     scheduler.start()
 
-    runner = init_runner(context, "SCHEDULER")
+    return scheduler
+
+
+# scheduled tasks로 돌릴 때 사용하는 함수이고, cloudwatch 로그를 찍습니다.
+@cli.command()
+@click.pass_context
+def run_scheduler(ctx: typing.Any) -> None:
+    context: Context = ctx.obj["context"]
+
+    progress = CrawlerProgress()
+    scheduler = start_cloudwatch_scheduler(context, progress)
+
+    runner = init_runner(context, "SCHEDULER", progress=progress)
 
     runner()
 
     scheduler.remove_job("cloudwatch_log")
 
 
-def _run_cloudwatch_log(client: CloudWatchClient) -> None:
+def _run_cloudwatch_log(
+    client: "CloudWatchClient",
+    process: "psutil.Process",
+    progress: CrawlerProgress,
+) -> None:
     try:
-        client.put_metric(
-            "InfocareCrawler",
-            client.get_metric_data(
-                "InfocareCrawlerHardWareUsage",
-                "crawler_cpu",
-                psutil.cpu_percent()),
-        )
-        client.put_metric(
-            "InfocareCrawler",
-            client.get_metric_data(
-                "InfocareCrawlerHardWareUsage",
-                "crawler_ram",
-                psutil.virtual_memory().percent
-            ),
-        )
+        # 호스트 전체가 아닌 크롤러 프로세스의 사용량을 보냅니다.
+        metrics = {
+            "crawler_cpu": process.cpu_percent(),
+            "crawler_ram": process.memory_percent(),
+            "crawler_rss_bytes": process.memory_info().rss,
+        }
+        put_metrics(client, "InfocareCrawler", {
+            "InfocareCrawlerHardWareUsage": metrics,
+            "InfocareCrawlerProgress": progress.collect(),
+        })
     except Exception as e:
         logger.error("Exception while cloudwatch scheduler", exc_info=e)
 
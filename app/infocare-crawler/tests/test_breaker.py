@@ -0,0 +1,50 @@
+import pytest
+
+from infocare_crawler.client import breaker
+from infocare_crawler.client.breaker import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_disabled():
+    circuit = CircuitBreaker(threshold=0, probe_interval=10)
+
+    assert not any(circuit.record(False) for _ in range(100))
+    assert not circuit.tripped
+
+
+def test_trips_after_consecutive_failures(clock):
+    circuit = CircuitBreaker(threshold=3, probe_interval=10)
+
+    assert not circuit.record(False)
+    assert not circuit.record(False)
+    assert not circuit.record(True)
+    assert not circuit.record(False)
+    assert not circuit.record(False)
+    assert circuit.record(False)
+    assert circuit.tripped
+    assert circuit.tripped_at == 1000.0
+
+    # 멈춘 뒤의 실패는 멈춘 시각을 바꾸지 않습니다.
+    clock[0] += 5
+    assert circuit.record(False)
+    assert circuit.tripped_at == 1000.0
+
+
+def test_stays_tripped_until_reset(clock):
+    circuit = CircuitBreaker(threshold=1, probe_interval=10)
+    assert circuit.record(False)
+
+    assert not circuit.record(True)
+    assert circuit.tripped
+
+    clock[0] += 42
+    assert circuit.reset() == 42
+    assert not circuit.tripped
+    assert circuit.failures == 0
+    assert circuit.reset() == 0
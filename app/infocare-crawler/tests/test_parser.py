@@ -0,0 +1,90 @@
+import pytest
+
+from infocare_crawler.client.data import ENCODING, InfocareBidRow
+from infocare_crawler.client.exc import InfocareClientParseError
+from infocare_crawler.client.parser import address_regions, \
+    normalize_dong_name, split_bid_page
+
+
+def bid_page(*rows, headers=("사건번호", "소재지", "낙찰일")) -> bytes:
+    header = "".join(f"<th>{x}</th>" for x in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{x}</td>" for x in row) + "</tr>"
+        for row in rows
+    )
+    return (
+        f"<html><body><table class='tbl_list'><tr>{header}</tr>{body}"
+        f"</table></body></html>"
+    ).encode(ENCODING)
+
+
+def test_address_regions_stops_at_lot_number():
+    assert address_regions("서울 강남구 신사동 663-65 15동 120호") == [
+        "서울", "강남구", "신사동",
+    ]
+    assert address_regions("경기 화성시 봉담읍 (수영리) 산12") == [
+        "경기", "화성시", "봉담읍", "수영리",
+    ]
+
+
+def test_normalize_dong_name():
+    assert normalize_dong_name("개포동(개포1동)") == "개포동"
+    assert normalize_dong_name(" 대치동 ") == "대치동"
+
+
+def test_split_bid_page():
+    data = bid_page(
+        ("2020타경1", "서울 강남구 개포동 1-1", "2020.01.01"),
+        ("2020타경2", "서울 강남구 대치동 2-1 3동 101호", "2020.01.02"),
+        ("2020타경3", "서울 강남구 개포동 3-1", "2020.01.03"),
+    )
+
+    split = split_bid_page(data, dongs=["개포동(개포1동)", "대치동", "일원동"])
+
+    assert split.rows == {
+        "개포동(개포1동)": [
+            InfocareBidRow("2020타경1", "서울 강남구 개포동 1-1"),
+            InfocareBidRow("2020타경3", "서울 강남구 개포동 3-1"),
+        ],
+        "대치동": [
+            InfocareBidRow("2020타경2", "서울 강남구 대치동 2-1 3동 101호"),
+        ],
+        "일원동": [],
+    }
+    assert split.unassigned == []
+
+
+def test_split_bid_page_leaves_ambiguous_rows_unassigned():
+    data = bid_page(
+        ("2020타경1", "서울 강남구 역삼동 1-1", "2020.01.01"),
+        ("2020타경2", "서울 강남구 개포동 대치동 2-1", "2020.01.02"),
+        ("2020타경3",),
+    )
+
+    split = split_bid_page(data, dongs=["개포동", "대치동"])
+
+    assert split.rows == {"개포동": [], "대치동": []}
+    assert [x.case_number for x in split.unassigned] == [
+        "2020타경1", "2020타경2", "",
+    ]
+
+
+def test_split_bid_page_does_not_count_building_as_dong():
+    data = bid_page(("2020타경1", "서울 강남구 신사동 663-65 15동 120호", ""))
+
+    split = split_bid_page(data, dongs=["신사동", "15동"])
+
+    assert [x.case_number for x in split.rows["신사동"]] == ["2020타경1"]
+    assert split.rows["15동"] == []
+
+
+def test_split_bid_page_without_table():
+    with pytest.raises(InfocareClientParseError):
+        split_bid_page("<html><body></body></html>".encode(ENCODING), [])
+
+
+def test_split_bid_page_without_address_column():
+    data = bid_page(("2020타경1", "2020.01.01"), headers=("사건번호", "낙찰일"))
+
+    with pytest.raises(InfocareClientParseError):
+        split_bid_page(data, dongs=["개포동"])
@@ -0,0 +1,106 @@
+from infocare_crawler.crawler.plan import CrawlHistory, DEFAULT_LATENCY, \
+    make_plan
+
+NAMES = {
+    ("main_using_type",): ["집합건물", "주택"],
+    ("sub_using_type", "집합건물"): ["아파트", "오피스텔"],
+    ("sido",): ["서울", "경기"],
+    ("sigungu", "서울"): ["강남구", "서초구"],
+    ("dongli", "서울", "강남구"): ["개포동", "대치동"],
+    ("dongli", "서울", "서초구"): ["반포동"],
+}
+
+CONFIG = {
+    "MAIN_USING_TYPE": "집합건물",
+    "SUB_USING_TYPE": ".*",
+    "SIDO": "서울",
+    "SIGUNGU": ".*",
+    "DONGLI": ".*",
+}
+
+
+def fetch_names(key):
+    return NAMES[key]
+
+
+def test_history_json():
+    history = CrawlHistory(
+        taxonomy={"sido": ["서울"]},
+        bids_count={"서울/강남구/개포동/집합건물/아파트": 3},
+        latency=1.5,
+    )
+
+    assert CrawlHistory.from_json(history.to_json()) == history
+    assert CrawlHistory.from_json({}) == CrawlHistory()
+
+
+def test_history_update():
+    history = CrawlHistory(bids_count={"a": 1, "b": 2}, latency=1.5)
+
+    history.update(CrawlHistory(bids_count={"b": 0, "c": 3}))
+    assert history.bids_count == {"a": 1, "b": 0, "c": 3}
+    assert history.latency == 1.5
+
+    history.update(CrawlHistory(latency=0.5))
+    assert history.latency == 0.5
+
+
+def test_history_hot_regions_and_bid_ratio():
+    history = CrawlHistory(bids_count={
+        "서울/강남구/개포동/집합건물/아파트": 3,
+        "서울/강남구/대치동/집합건물/아파트": 0,
+        "서울/서초구/반포동/집합건물/아파트": 0,
+        "서울/서초구/반포동/집합건물/오피스텔": 0,
+    })
+
+    assert history.hot_regions() == {
+        ("서울",), ("서울", "강남구"), ("서울", "강남구", "개포동"),
+    }
+    assert history.bid_ratio == 0.25
+    assert CrawlHistory().bid_ratio == 1.0
+
+
+def test_make_plan_without_history():
+    plan = make_plan(CONFIG, fetch_names, CrawlHistory())
+
+    assert [x.sido for x in plan.sidos] == ["서울"]
+    sido = plan.sidos[0]
+    assert sido.sigungu_count == 2
+    assert sido.dongli_count == 3
+    # 시군구 목록 1, 시군구마다 읍면동 목록 1, 읍면동마다 용도 목록 2
+    assert sido.list_requests == 1 + 2 + 3 * 2
+    assert sido.statistics_requests == 3 * 2
+    assert sido.bid_requests == 3 * 2
+    assert plan.common_requests == 4
+    assert plan.seconds_per_request == DEFAULT_LATENCY
+    assert plan.requests == 4 + 9 + 6 + 6
+
+
+def test_make_plan_with_history():
+    history = CrawlHistory(
+        bids_count={
+            "서울/강남구/개포동/집합건물/아파트": 3,
+            "서울/강남구/대치동/집합건물/아파트": 0,
+        },
+        latency=2.0,
+    )
+    config = dict(CONFIG, CLIENT_DELAY="0.5", TAXONOMY_TTL="3600")
+
+    plan = make_plan(config, fetch_names, history)
+
+    sido = plan.sidos[0]
+    # 목록을 캐싱하면 읍면동마다 용도 목록을 요청하지 않습니다.
+    assert sido.list_requests == 1 + 2
+    assert plan.common_requests == 4 + 2
+    # 기록이 있는 페이지는 건수로, 없는 페이지는 기록의 비율(0.5)로 셉니다.
+    assert sido.bid_requests == 1 + 0 + 0.5 * 4
+    assert plan.seconds_per_request == 2.5
+
+
+def test_make_plan_sigungu_bids():
+    config = dict(CONFIG, BID_FETCH_SCALE="sigungu")
+
+    plan = make_plan(config, fetch_names, CrawlHistory())
+
+    # 시군구마다 용도별로 한 번씩 요청합니다.
+    assert plan.sidos[0].bid_requests == 2 * 2
@@ -0,0 +1,114 @@
+import pytest
+
+from infocare_crawler.client import proxy
+from infocare_crawler.client.proxy import ProxyHealth, ProxyPool
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(proxy.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_score():
+    assert ProxyHealth("a").score == 0
+    assert ProxyHealth("a", latency=2.0).score == 2.0
+    assert ProxyHealth("a", latency=2.0, error_rate=0.5).score == 6.0
+
+
+def test_requires_hosts():
+    with pytest.raises(ValueError):
+        ProxyPool([])
+
+
+def test_choose_prefers_untried_then_lowest_score(clock):
+    pool = ProxyPool(["a", "b", "c"])
+    assert pool.choose() == "a"
+
+    pool.record("a", 1.0, True)
+    assert pool.choose() == "b"
+
+    pool.record("b", 2.0, True)
+    pool.record("c", 0.5, False)
+    assert pool.choose() == "c"
+
+    # 실패가 섞인 프록시는 응답 시간보다 점수가 높아집니다.
+    pool.record("c", 0.8, True)
+    assert pool.choose() == "a"
+
+
+def test_moving_average(clock):
+    pool = ProxyPool(["a"], alpha=0.5)
+
+    pool.record("a", 1.0, True)
+    pool.record("a", 3.0, True)
+    pool.record("a", 9.0, False)
+
+    health = pool.proxies[0]
+    assert health.latency == 2.0
+    assert health.error_rate == 0.5
+    assert health.requests == 3
+
+
+def test_ejects_failing_proxy_after_min_requests(clock):
+    pool = ProxyPool(
+        ["a", "b"], alpha=0.5, min_requests=3, max_error_rate=0.5,
+        cooldown=300,
+    )
+
+    pool.record("a", 0, False)
+    pool.record("a", 0, False)
+    assert pool.is_admitted("a")
+
+    pool.record("a", 0, False)
+    assert not pool.is_admitted("a")
+    assert pool.choose() == "b"
+
+    # 제외된 동안의 기록은 무시합니다.
+    pool.record("a", 0, True)
+    assert pool.proxies[0].requests == 3
+
+    clock[0] += 300
+    assert pool.is_admitted("a")
+    pool.record("a", 0.1, True)
+    assert pool.proxies[0] == ProxyHealth("a", latency=0.1, requests=1)
+
+
+def test_never_ejects_last_proxy(clock):
+    pool = ProxyPool(
+        ["a", "b"], alpha=1.0, min_requests=1, max_error_rate=0.5,
+    )
+
+    pool.record("a", 0, False)
+    assert not pool.is_admitted("a")
+
+    for _ in range(10):
+        pool.record("b", 0, False)
+    assert pool.is_admitted("b")
+
+
+def test_ejects_slow_proxy(clock):
+    pool = ProxyPool(["a", "b"], min_requests=1, max_latency_ratio=3.0)
+
+    pool.record("b", 1.0, True)
+    pool.record("a", 2.5, True)
+    assert pool.is_admitted("a")
+
+    pool.record("a", 20.0, True)
+    assert not pool.is_admitted("a")
+
+
+def test_ejects_proxy_over_max_latency(clock):
+    pool = ProxyPool(["a", "b"], min_requests=1, max_latency=2.0)
+
+    pool.record("a", 3.0, True)
+    assert not pool.is_admitted("a")
+
+
+def test_choose_when_all_ejected(clock):
+    pool = ProxyPool(["a", "b"])
+    pool.proxies[0].ejected_until = clock[0] + 20
+    pool.proxies[1].ejected_until = clock[0] + 10
+
+    assert pool.choose() == "b"
@@ -0,0 +1,46 @@
+"""
+import_time
+===========
+
+``python -X importtime manage.py`` 의 결과를 모아 CLI 시작 시간을 측정합니다.
+
+무거운 모듈(sentry, apscheduler, bs4 ...)은 실제로 필요한 명령에서만 불러와야
+합니다. 해당 모듈이 ``--help`` 에서 불러와지거나, 전체 import 시간이 기준치를
+넘으면 실패합니다.
+
+    $ python benchmarks/import_time.py
+    $ python benchmarks/import_time.py --threshold-ms 250 --repeat 10
+
+"""
+import os
+
+from crawler.import_time import create_command
+
+#: ``manage.py --help`` 의 import 시간 기준치 (ms)
+THRESHOLD_MS = 300.0
+
+#: ``manage.py --help`` 에서 불러오면 안 되는 모듈
+DEFERRED_MODULES = (
+    "apscheduler",
+    "boto3",
+    "botocore",
+    "bs4",
+    "crawler.aws_client",
+    "dotenv",
+    "infocare_store.db",
+    "infocare_store.store",
+    "loan_model",
+    "lxml",
+    "psutil",
+    "psycopg2",
+    "sentry_sdk",
+    "sqlalchemy",
+)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+main = create_command(APP_ROOT, DEFERRED_MODULES, THRESHOLD_MS)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 config
 ======
 
+환경 변수에는 ``STORE_`` 를 붙여 설정합니다. (예: ``STORE_USE_RECORDS``)
+
 """
 import typing
 
@@ -35,6 +37,33 @@ SCHEMA = {
     'SLACK_CHANNEL': fields.StringField(optional=True),
     #: Sentry DSN
     'SENTRY_DSN': fields.StringField(optional=True),
+    #: Share of runs sent to Sentry performance tracing (0 ~ 1)
+    'TRACES_SAMPLE_RATE': fields.StringField(optional=True, default='0'),
+    #: Threads that download S3 objects ahead of the store (0: no prefetch)
+    'S3_PREFETCH_WORKERS': fields.StringField(optional=True, default='0'),
+    #: Total size of prefetched objects kept in memory (bytes, 64MB)
+    'S3_PREFETCH_MAX_BYTES': fields.StringField(
+        optional=True, default='67108864'
+    ),
+    #: Processes that parse prefetched pages
+    #: (0: parse in the prefetch threads)
+    'PARSE_WORKERS': fields.StringField(optional=True, default='0'),
+    #: Store statistics and bids with INSERT ... ON CONFLICT
+    #: (needs the indexes in infocare_store/migrations)
+    'BULK_UPSERT': fields.BooleanField(optional=True, default=False),
+    #: Statistics rows per INSERT with BULK_UPSERT (0: one row at a time)
+    'STATISTICS_BATCH_SIZE': fields.StringField(optional=True, default='0'),
+    #: COPY statistics and bids into staging tables and merge them at the
+    #: end of the run (for loading the whole country into an empty DB)
+    'COPY_LOAD': fields.BooleanField(optional=True, default=False),
+    #: Statistics pages stored in one session and commit
+    #: (0: commit every page)
+    'STORE_BATCH_SIZE': fields.StringField(optional=True, default='0'),
+    #: Read the records.jsonl left by the crawler instead of the HTML
+    'USE_RECORDS': fields.BooleanField(optional=True, default=False),
+    #: Record stored S3 objects and skip them when a run is repeated
+    #: (needs the table in infocare_store/migrations)
+    'USE_LEDGER': fields.BooleanField(optional=True, default=False),
     # Store log id
     'CRAWLER_LOG_ID': fields.StringField(optional=True, default=None),
     # 시, 도 지역
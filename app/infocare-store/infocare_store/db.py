@@ -1,9 +1,17 @@
+import glob
+import os
 import sqlalchemy as sa
+import structlog
 import typing
 
 from sqlalchemy import orm
 from loan_model.models.base import Model as LoanModel
 
+logger = structlog.get_logger(__name__)
+
+#: loan_model 테이블에 store 가 필요로 하는 인덱스, 테이블을 만드는 SQL
+MIGRATION_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
 
 def create_session_factory(
     config: typing.Dict[str, typing.Any]
@@ -17,3 +25,49 @@ def create_session_factory(
 def init_loan_db_schema(session: orm.Session):
     LoanModel.metadata.drop_all(session.bind)
     LoanModel.metadata.create_all(session.bind)
+
+
+def apply_migrations(engine: sa.engine.Engine) -> None:
+    """
+    ``migrations`` 의 SQL 을 파일 이름 순서대로 실행합니다. 스키마를 새로
+    만드는 로컬 DB 에서만 사용하고, 운영 DB 에는 loan_model 마이그레이션으로
+    반영합니다.
+
+    """
+    # CREATE INDEX CONCURRENTLY 는 트랜잭션 안에서 실행할 수 없으므로
+    # 한 문장씩 자동 커밋으로 실행합니다.
+    with engine.connect() as connection:
+        connection = connection.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        for path in sorted(glob.glob(os.path.join(MIGRATION_DIR, "*.sql"))):
+            with open(path, encoding="utf-8") as f:
+                lines = [
+                    line for line in f
+                    if not line.lstrip().startswith("--")
+                ]
+            for statement in "".join(lines).split(";"):
+                if statement.strip():
+                    connection.execute(statement)
+            logger.info("Apply Migration", migration=os.path.basename(path))
+
+
+def find_missing_indexes(
+    engine: sa.engine.Engine, names: typing.Sequence[str]
+) -> typing.List[str]:
+    """
+    없거나 만들다 실패해서 INVALID 로 남은 인덱스 이름을 돌려줍니다.
+
+    """
+    statement = sa.text(
+        "SELECT c.relname FROM pg_index i"
+        " JOIN pg_class c ON c.oid = i.indexrelid"
+        " WHERE c.relname IN :names AND i.indisvalid"
+    ).bindparams(sa.bindparam("names", expanding=True))
+    with engine.connect() as connection:
+        valid = {
+            name for name, in connection.execute(
+                statement, {"names": list(names)}
+            )
+        }
+    return [name for name in names if name not in valid]
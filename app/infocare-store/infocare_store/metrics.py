@@ -0,0 +1,40 @@
+"""
+metrics
+=======
+
+적재 진행 상황을 모아 ``run_scheduler`` 의 cloudwatch 작업에서
+1분마다 전송할 값으로 만듭니다.
+
+"""
+import time
+import typing
+
+import attr
+
+
+@attr.s
+class StoreProgress(object):
+    #: 읽어서 적재를 마친 S3 파일 수
+    objects_processed: int = attr.ib(default=0)
+    #: 저장하거나 갱신한 row 수
+    rows_upserted: int = attr.ib(default=0)
+
+    _last_time: float = attr.ib(
+        factory=time.monotonic, init=False, repr=False
+    )
+    _last_rows_upserted: int = attr.ib(default=0, init=False, repr=False)
+
+    def collect(self) -> typing.Dict[str, float]:
+        """
+        지난 호출 이후의 분당 처리량을 돌려줍니다.
+
+        """
+        now = time.monotonic()
+        minutes = max((now - self._last_time) / 60, 1e-9)
+        rows = self.rows_upserted - self._last_rows_upserted
+        self._last_time, self._last_rows_upserted = now, self.rows_upserted
+
+        return {
+            "store_objects_processed": float(self.objects_processed),
+            "store_rows_upserted_per_minute": rows / minutes,
+        }
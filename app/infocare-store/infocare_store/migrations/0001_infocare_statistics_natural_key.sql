@@ -0,0 +1,24 @@
+-- BULK_UPSERT, COPY_LOAD 에서 통계를 INSERT ... ON CONFLICT 로 저장할 때
+-- 충돌을 찾는 자연 키 유일 인덱스입니다. (infocare_store.store.bulk)
+-- InfocareStatistics.create_or_update 와 같은 행을 찾도록 지역 id 는
+-- NULL 대신 0 으로 비교합니다.
+--
+-- loan_model 마이그레이션으로 운영 DB 에 반영합니다. 테이블을 잠그지
+-- 않도록 CONCURRENTLY 로 만들며, 트랜잭션 밖에서 실행해야 합니다.
+-- 키가 겹치는 행이 있으면 만들 수 없으므로 먼저 중복을 정리합니다.
+-- 실패해서 INVALID 로 남은 인덱스는 지우고 다시 실행합니다.
+--
+-- 되돌리기:
+--   DROP INDEX CONCURRENTLY IF EXISTS uq_infocare_statistics_natural_key;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS
+    uq_infocare_statistics_natural_key
+ON infocare_statistics (
+    start_date,
+    end_date,
+    main_usage_type,
+    sub_usage_type,
+    coalesce(infocare_sido_id, 0),
+    coalesce(infocare_gugun_id, 0),
+    coalesce(infocare_dong_id, 0)
+);
@@ -0,0 +1,20 @@
+-- 낙찰사례 페이지를 저장할 때 같은 동, 같은 용도의 만료되지 않은 사례를
+-- 찾아 만료시키는 UPDATE 에서 사용하는 인덱스입니다.
+-- (InfocareStore.store_bid_expired_check, StagingLoader.merge)
+-- 없어도 만료는 계산하지만 동마다 infocare_bid 를 훑습니다.
+--
+-- loan_model 마이그레이션으로 운영 DB 에 반영합니다. 테이블을 잠그지
+-- 않도록 CONCURRENTLY 로 만들며, 트랜잭션 밖에서 실행해야 합니다.
+-- 실패해서 INVALID 로 남은 인덱스는 지우고 다시 실행합니다.
+--
+-- 되돌리기:
+--   DROP INDEX CONCURRENTLY IF EXISTS ix_infocare_bid_expiry;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS
+    ix_infocare_bid_expiry
+ON infocare_bid (
+    infocare_dong_id,
+    main_usage_type,
+    sub_usage_type,
+    expired_date
+);
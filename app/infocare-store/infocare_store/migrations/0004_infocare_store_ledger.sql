@@ -0,0 +1,18 @@
+-- USE_LEDGER 에서 적재를 마친 S3 객체를 기록하는 테이블입니다.
+-- (infocare_store.store.ledger)
+--
+-- loan_model 마이그레이션으로 운영 DB 에 반영합니다.
+--
+-- 되돌리기:
+--   DROP TABLE IF EXISTS infocare_store_ledger;
+
+CREATE TABLE IF NOT EXISTS infocare_store_ledger (
+    key VARCHAR PRIMARY KEY,
+    etag VARCHAR NOT NULL DEFAULT '',
+    crawler_log_id VARCHAR NOT NULL,
+    outcome VARCHAR NOT NULL,
+    processed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_infocare_store_ledger_crawler_log_id
+ON infocare_store_ledger (crawler_log_id);
@@ -0,0 +1,316 @@
+"""
+bulk
+====
+
+통계, 낙찰사례를 한 행씩 조회하고 저장하는 대신 모아 두었다가
+PostgreSQL 의 ``INSERT ... ON CONFLICT DO UPDATE`` 한 번으로 저장합니다.
+
+``loan_model`` 의 ``create_or_update`` 와 같은 행을 찾도록 자연 키에
+유일 인덱스가 있어야 합니다. 인덱스는 ``infocare_store/migrations`` 의 SQL 로
+만들며, store 는 시작할 때 인덱스가 있는지만 확인합니다.
+(:data:`NATURAL_KEY_INDEXES`)
+모델의 컬럼 이름은 이 모듈에서만 사용하며, 모델에 없는 이름이 있으면
+이 모듈을 불러올 때 :class:`.exc.InfocareStoreModelMismatch` 가 납니다.
+
+"""
+import datetime
+import typing
+
+import attr
+import sqlalchemy as sa
+import structlog
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
+from loan_model.models.infocare.infocare_bid import InfocareBid
+from loan_model.models.infocare.infocare_statistics import InfocareStatistics
+
+from .exc import InfocareStoreModelMismatch
+
+logger = structlog.get_logger(__name__)
+
+
+def model_columns(table: sa.Table, *names: str) -> typing.Tuple[str, ...]:
+    # loan_model 의 컬럼 이름이 바뀌면 잘못된 SQL 을 만들기 전에 실패합니다.
+    missing = [name for name in names if name not in table.c]
+    if missing:
+        raise InfocareStoreModelMismatch(
+            f"{table.name} has no column {', '.join(missing)}"
+        )
+    return names
+
+
+#: ``InfocareStatistics.create_or_update`` 의 인자 순서와 같은 값 컬럼
+STATISTICS_VALUE_COLUMNS = model_columns(
+    InfocareStatistics.__table__,
+    "year_avg_price_rate",
+    "year_avg_bid_rate",
+    "year_bid_count",
+    "six_month_avg_price_rate",
+    "six_month_avg_bid_rate",
+    "six_month_bid_count",
+    "three_month_avg_price_rate",
+    "three_month_avg_bid_rate",
+    "three_month_bid_count",
+)
+
+#: 통계 한 행을 찾는 컬럼 (지역 id 는 셋 중 하나만 있습니다.)
+STATISTICS_KEY_COLUMNS = model_columns(
+    InfocareStatistics.__table__,
+    "start_date",
+    "end_date",
+    "main_usage_type",
+    "sub_usage_type",
+    "infocare_sido_id",
+    "infocare_gugun_id",
+    "infocare_dong_id",
+)
+
+_REGION_ID_COLUMNS = {
+    "infocare_sido_id", "infocare_gugun_id", "infocare_dong_id",
+}
+
+
+def statistics_natural_key(
+    table: typing.Optional[typing.Any] = None
+) -> typing.List[typing.Any]:
+    # NULL 끼리는 충돌하지 않으므로 지역 id 는 0 으로 바꿔 비교합니다.
+    # ON CONFLICT 대상이 인덱스 식과 같도록 0 은 파라미터가 아닌 리터럴로
+    # 넣습니다.
+    if table is None:
+        table = InfocareStatistics.__table__
+    return [
+        sa.func.coalesce(table.c[name], sa.literal_column("0"))
+        if name in _REGION_ID_COLUMNS else table.c[name]
+        for name in STATISTICS_KEY_COLUMNS
+    ]
+
+
+#: 낙찰사례 한 행을 찾는 컬럼
+BID_KEY_COLUMNS = model_columns(
+    InfocareBid.__table__,
+    "case_number",
+    "bid_date",
+    "address",
+    "main_usage_type",
+    "sub_usage_type",
+)
+
+#: 같은 낙찰사례를 다시 받았을 때 바꾸는 컬럼
+BID_VALUE_COLUMNS = model_columns(
+    InfocareBid.__table__,
+    "estimated_price",
+    "lowest_price",
+    "success_price",
+    "success_bid_rate",
+    "infocare_dong_id",
+)
+
+#: 한 문장으로 저장하려면 있어야 하는 자연 키 유일 인덱스
+#: (migrations/0001_infocare_statistics_natural_key.sql,
+#: migrations/0002_infocare_bid_natural_key.sql)
+NATURAL_KEY_INDEXES = [
+    "uq_infocare_statistics_natural_key",
+    "uq_infocare_bid_natural_key",
+]
+
+#: 동, 용도별로 만료되지 않은 낙찰사례를 찾는 인덱스
+#: (migrations/0003_infocare_bid_expiry.sql)
+EXPIRY_INDEX = "ix_infocare_bid_expiry"
+
+
+def statistics_row(
+    data: typing.Any,
+    main_usage_type: str,
+    *,
+    db_sido_id: typing.Optional[int] = None,
+    db_gugun_id: typing.Optional[int] = None,
+    db_dong_id: typing.Optional[int] = None,
+) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """
+    통계 페이지에서 지역 id 에 해당하는 단위의 값을 행으로 만듭니다.
+    낙찰 건수가 없으면 저장하지 않으므로 None 을 돌려줍니다.
+
+    """
+    if db_sido_id:
+        region = "sido"
+    elif db_gugun_id:
+        region = "gugun"
+    elif db_dong_id:
+        region = "dongli"
+    else:
+        return None
+    if getattr(data, f"{region}_year_bid_count") == 0:
+        return None
+
+    row = dict(zip(STATISTICS_KEY_COLUMNS, (
+        data.start_date,
+        data.end_date,
+        main_usage_type,
+        data.sub_usage_type,
+        db_sido_id,
+        db_gugun_id,
+        db_dong_id,
+    )))
+    for name in STATISTICS_VALUE_COLUMNS:
+        row[name] = getattr(data, f"{region}_{name}")
+    return row
+
+
+def on_statistics_conflict(
+    statement: postgresql.Insert
+) -> postgresql.Insert:
+    return statement.on_conflict_do_update(
+        index_elements=statistics_natural_key(),
+        set_={
+            name: statement.excluded[name]
+            for name in STATISTICS_VALUE_COLUMNS
+        },
+    )
+
+
+class StatisticsWriter(object):
+    """
+    통계 행을 ``batch_size`` 개씩 모아 저장합니다. 같은 키의 행은 마지막 값만
+    저장합니다. 커밋은 세션을 넘겨 준 쪽에서 합니다.
+
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        self.batch_size = batch_size
+        self.rows: typing.Dict[
+            typing.Tuple[typing.Any, ...], typing.Dict[str, typing.Any]
+        ] = {}
+
+    def add(
+        self, session: orm.Session, row: typing.Dict[str, typing.Any]
+    ) -> int:
+        """
+        행을 추가하고, 모인 행을 저장했으면 저장한 행 수를 돌려줍니다.
+
+        """
+        key = tuple(row[name] for name in STATISTICS_KEY_COLUMNS)
+        self.rows[key] = row
+        if len(self.rows) >= self.batch_size:
+            return self.flush(session)
+        return 0
+
+    def flush(self, session: orm.Session) -> int:
+        if not self.rows:
+            return 0
+
+        session.execute(on_statistics_conflict(
+            postgresql.insert(InfocareStatistics.__table__)
+            .values(list(self.rows.values()))
+        ))
+
+        count = len(self.rows)
+        self.rows.clear()
+        logger.info("Store Statistics", rows=count)
+        return count
+
+    def discard(self) -> None:
+        # 작업 단위를 롤백하면 모아 둔 행도 버립니다.
+        self.rows.clear()
+
+
+@attr.s
+class BidCounts(object):
+    inserted: int = attr.ib(default=0)
+    updated: int = attr.ib(default=0)
+    #: 이미 같은 값으로 저장되어 있던 행
+    unchanged: int = attr.ib(default=0)
+
+
+def bid_row(
+    bid: typing.Any,
+    main_usage_type: str,
+    sub_usage_type: str,
+    db_dong_id: int,
+) -> typing.Dict[str, typing.Any]:
+    return {
+        "case_number": bid.case_number,
+        "bid_date": bid.bid_date.date(),
+        "address": bid.address,
+        "main_usage_type": main_usage_type,
+        "sub_usage_type": sub_usage_type,
+        "estimated_price": bid.estimated_price,
+        "lowest_price": bid.lowest_price,
+        "success_price": bid.success_price,
+        "success_bid_rate": bid.success_bid_rate,
+        "infocare_dong_id": db_dong_id,
+    }
+
+
+def on_bid_conflict(statement: postgresql.Insert) -> postgresql.Insert:
+    # 같은 낙찰사례가 있으면 값이 바뀐 경우에만 갱신합니다.
+    table = InfocareBid.__table__
+    return statement.on_conflict_do_update(
+        index_elements=[table.c[name] for name in BID_KEY_COLUMNS],
+        set_={name: statement.excluded[name] for name in BID_VALUE_COLUMNS},
+        where=sa.tuple_(
+            *[table.c[name] for name in BID_VALUE_COLUMNS]
+        ).op("IS DISTINCT FROM")(sa.tuple_(
+            *[statement.excluded[name] for name in BID_VALUE_COLUMNS]
+        )),
+    )
+
+
+def expire_bids(
+    db_dong_id: int,
+    main_usage_type: str,
+    sub_usage_type: str,
+    keys: typing.Collection[typing.Tuple[datetime.date, str, str]],
+    expired_date: datetime.datetime,
+) -> sa.sql.Update:
+    """
+    같은 동, 같은 용도의 만료되지 않은 낙찰사례 중 이번에 받은
+    (낙찰일, 사건번호, 소재지) 에 없는 사례를 만료시키는 문장을 만듭니다.
+
+    """
+    table = InfocareBid.__table__
+    conditions = [
+        table.c.infocare_dong_id == db_dong_id,
+        table.c.main_usage_type == main_usage_type,
+        table.c.sub_usage_type == sub_usage_type,
+        table.c.expired_date.is_(None),
+    ]
+    if keys:
+        conditions.append(
+            sa.tuple_(
+                table.c.bid_date, table.c.case_number, table.c.address,
+            ).notin_(list(keys))
+        )
+    return (
+        table.update()
+        .where(sa.and_(*conditions))
+        .values(expired_date=expired_date)
+    )
+
+
+def upsert_bids(
+    session: orm.Session, rows: typing.Iterable[typing.Dict[str, typing.Any]]
+) -> BidCounts:
+    """
+    낙찰사례 페이지의 행을 한 문장으로 저장합니다. 값이 바뀐 행만 갱신하고,
+    ``xmax = 0`` 으로 새로 넣은 행과 갱신한 행을 구분합니다.
+
+    """
+    # 한 문장에서 같은 행을 두 번 갱신할 수 없으므로 키로 중복을 없앱니다.
+    unique_rows = {
+        tuple(row[name] for name in BID_KEY_COLUMNS): row for row in rows
+    }
+    if not unique_rows:
+        return BidCounts()
+
+    statement = on_bid_conflict(
+        postgresql.insert(InfocareBid.__table__)
+        .values(list(unique_rows.values()))
+    ).returning(sa.literal_column("xmax = 0").label("inserted"))
+
+    inserted = [row.inserted for row in session.execute(statement)]
+    counts = BidCounts(
+        inserted=sum(1 for x in inserted if x),
+        updated=sum(1 for x in inserted if not x),
+    )
+    counts.unchanged = len(unique_rows) - len(inserted)
+    return counts
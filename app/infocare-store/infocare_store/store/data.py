@@ -34,12 +34,15 @@ class CrawlerLogResponse(object):
     run_by: str = attr.ib()
     finish_time_stamp: float = attr.ib()
     total_statistics: CrawlerStatistics = attr.ib()
+    #: 페이지를 저장한 인코딩. 예전 crawler-log 에는 없습니다.
+    page_encoding: typing.Optional[str] = attr.ib(default=None)
 
     class CrawlerLogResponseData(typing.Dict):
         time_stamp: str
         run_by: str
         finish_time_stamp: str
         total_statistics: CrawlerStatistics.CrawlerStatisticsData
+        page_encoding: str
 
     @classmethod
     def from_json(cls, data: CrawlerLogResponseData) -> "CrawlerLogResponse":
@@ -50,4 +53,48 @@ class CrawlerLogResponse(object):
             total_statistics=CrawlerStatistics.from_json(
                 data["total_statistics"]
             ),
+            page_encoding=data.get("page_encoding"),
         )
+
+
+@attr.s(frozen=True)
+class S3Object(object):
+    key: str = attr.ib()
+    #: 목록 응답의 Size
+    size: int = attr.ib(default=0)
+    #: 목록 응답의 ETag
+    etag: str = attr.ib(default="")
+
+
+@attr.s(frozen=True)
+class StatisticsFile(object):
+    #: 통계 페이지
+    statistics: S3Object = attr.ib()
+    #: 같은 폴더의 낙찰사례 페이지
+    bids: typing.List[S3Object] = attr.ib(factory=list)
+
+    @property
+    def objects(self) -> typing.List[S3Object]:
+        return [self.statistics] + self.bids
+
+
+@attr.s
+class PrefixTree(object):
+    """
+    구분자 없이 받은 S3 키 목록을 폴더 구조로 나타냅니다.
+
+    """
+
+    #: 바로 아래 폴더
+    folders: typing.Dict[str, "PrefixTree"] = attr.ib(factory=dict)
+    #: 바로 아래 객체
+    objects: typing.List[S3Object] = attr.ib(factory=list)
+
+    def add(self, path: str, s3_object: S3Object) -> None:
+        *folder_names, name = path.split("/")
+        if not name:  # 폴더 표시용 객체
+            return
+        folder = self
+        for folder_name in folder_names:
+            folder = folder.folders.setdefault(folder_name, PrefixTree())
+        folder.objects.append(s3_object)
@@ -12,3 +12,15 @@ class InfocareStoreCrawlerLogNotFound(InfocareStoreError):
 
 class InfocareStoreRegionNotFound(InfocareStoreError):
     pass
+
+
+class InfocareStoreModelMismatch(InfocareStoreError):
+    pass
+
+
+class InfocareStoreSchemaNotReady(InfocareStoreError):
+    pass
+
+
+class InfocareStoreBidSplitMismatch(InfocareStoreError):
+    pass
@@ -0,0 +1,97 @@
+"""
+ledger
+======
+
+store 가 적재를 마친 S3 객체를 ``infocare_store_ledger`` 에 기록합니다.
+
+기록은 그 객체의 데이터와 같은 트랜잭션에서 저장하므로, 실패한 뒤 다시
+실행하면 ETag 가 같은 객체는 건너뛰고 실패한 곳부터 이어서 적재합니다.
+DB 에 어느 crawler 실행이 반영되었는지도 이 테이블로 확인합니다.
+
+테이블은 ``infocare_store/migrations/0004_infocare_store_ledger.sql`` 로
+만들며, store 는 시작할 때 테이블이 있는지만 확인합니다.
+
+"""
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
+
+from .data import S3Object
+
+#: 데이터를 저장한 객체
+STORED = "stored"
+#: 페이지별로 다시 저장해도 실패한 객체
+FAILED = "failed"
+
+metadata = sa.MetaData()
+
+ledger_table = sa.Table(
+    "infocare_store_ledger",
+    metadata,
+    sa.Column("key", sa.Unicode, primary_key=True),
+    sa.Column("etag", sa.Unicode, nullable=False, default=""),
+    #: crawler-log 의 실행 시각 (실행 폴더 이름)
+    sa.Column("crawler_log_id", sa.Unicode, nullable=False, index=True),
+    sa.Column("outcome", sa.Unicode, nullable=False),
+    sa.Column(
+        "processed_at",
+        sa.DateTime(timezone=True),
+        nullable=False,
+        server_default=sa.func.now(),
+    ),
+)
+
+
+def has_ledger(session: orm.Session) -> bool:
+    return session.bind.has_table(ledger_table.name)
+
+
+def load_stored(
+    session: orm.Session, crawler_log_id: str
+) -> typing.Dict[str, str]:
+    """
+    실행에서 저장을 마친 객체의 ETag 를 S3 경로별로 돌려줍니다.
+
+    """
+    rows = session.execute(
+        sa.select([ledger_table.c.key, ledger_table.c.etag]).where(
+            sa.and_(
+                ledger_table.c.crawler_log_id == crawler_log_id,
+                ledger_table.c.outcome == STORED,
+            )
+        )
+    )
+    return {key: etag for key, etag in rows}
+
+
+def record(
+    session: orm.Session,
+    objects: typing.Iterable[S3Object],
+    crawler_log_id: str,
+    outcome: str,
+) -> None:
+    rows = {
+        x.key: {
+            "key": x.key,
+            "etag": x.etag,
+            "crawler_log_id": crawler_log_id,
+            "outcome": outcome,
+        }
+        for x in objects
+    }
+    if not rows:
+        return
+
+    statement = postgresql.insert(ledger_table).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=[ledger_table.c.key],
+        set_={
+            "etag": statement.excluded.etag,
+            "crawler_log_id": statement.excluded.crawler_log_id,
+            "outcome": statement.excluded.outcome,
+            "processed_at": sa.func.now(),
+        },
+    )
+    session.execute(statement)
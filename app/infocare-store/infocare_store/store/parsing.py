@@ -0,0 +1,74 @@
+"""
+parsing
+=======
+
+통계, 낙찰사례 HTML 을 :mod:`.records` 의 레코드로 파싱합니다.
+
+:class:`PageParser` 는 미리 받는 스레드에서 받은 HTML 을 프로세스 풀에서
+파싱해, DB 에 저장하는 store 스레드와 파싱이 여러 코어에서 함께 돌게 합니다.
+프로세스 사이에는 HTML 문자열과 레코드만 주고받습니다.
+
+"""
+import concurrent.futures
+import json
+import typing
+
+import attr
+from crawler.infocare_schema import (
+    InfocareStatisticResponse,
+    InfocareBidResponse,
+)
+
+from .records import StatisticsRecord, BidRecord, BidSplitRecord
+
+T = typing.TypeVar("T")
+
+
+def _to_record(cls: typing.Type[T], data: typing.Any) -> T:
+    return cls(**{  # type: ignore
+        field.name: getattr(data, field.name)
+        for field in attr.fields(cls)
+    })
+
+
+def parse_statistics(html: str) -> StatisticsRecord:
+    return _to_record(
+        StatisticsRecord, InfocareStatisticResponse.from_html(html)
+    )
+
+
+def parse_bid_list(html: str) -> typing.List[BidRecord]:
+    return [
+        _to_record(BidRecord, bid)
+        for bid in InfocareBidResponse.from_html(html).infocare_bid_list
+    ]
+
+
+def parse_bid_split(text: str) -> BidSplitRecord:
+    return BidSplitRecord.from_json(json.loads(text))
+
+
+class PageParser(object):
+    def __init__(self, workers: int) -> None:
+        self.executor: typing.Optional[
+            concurrent.futures.ProcessPoolExecutor
+        ] = None
+        if workers > 0:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers
+            )
+
+    def parse(self, parse: typing.Callable[[str], T], html: str) -> T:
+        """
+        프로세스 풀에서 파싱하고 끝날 때까지 기다립니다.
+        풀이 없으면 호출한 스레드에서 파싱합니다.
+
+        """
+        if self.executor is None:
+            return parse(html)
+        return self.executor.submit(parse, html).result()
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,100 @@
+"""
+prefetch
+========
+
+통계 파일을 파싱하고 DB 에 저장하는 동안 다음 파일들을 미리 받아 둡니다.
+
+:class:`Prefetcher` 는 목록 순서대로 파일 묶음(통계 페이지와 낙찰사례 페이지)을
+넘겨 주면서, 아직 처리하지 않은 묶음의 S3 객체를 스레드 풀에서 받습니다.
+받아 두는 객체 크기의 합은 ``max_bytes`` 를 넘지 않습니다.
+
+"""
+import collections
+import concurrent.futures
+import typing
+
+from .data import S3Object
+
+G = typing.TypeVar("G")
+
+
+class Prefetcher(object):
+    def __init__(
+        self,
+        fetch: typing.Callable[[str], str],
+        workers: int,
+        max_bytes: int,
+    ) -> None:
+        self.fetch = fetch
+        self.max_bytes = max_bytes
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(workers, 1),
+            thread_name_prefix="s3-prefetch",
+        )
+        self.futures: typing.Dict[str, "concurrent.futures.Future[str]"] = {}
+        #: 받았거나 받는 중인 객체 크기의 합
+        self.buffered_bytes = 0
+
+    def close(self) -> None:
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        self.executor.shutdown()
+
+    def iterate(
+        self,
+        groups: typing.Iterable[G],
+        objects: typing.Callable[[G], typing.Sequence[S3Object]],
+    ) -> typing.Iterator[G]:
+        """
+        ``groups`` 를 순서대로 돌려주면서 뒤따르는 묶음의 객체를 미리 받습니다.
+        돌려준 묶음의 객체는 다음 묶음으로 넘어갈 때 버립니다.
+
+        """
+        pending: typing.Deque[
+            typing.Tuple[G, typing.Sequence[S3Object]]
+        ] = collections.deque()
+        groups = iter(groups)
+        exhausted = False
+
+        while True:
+            # 처리 중인 묶음이 없으면 크기와 관계없이 하나는 받습니다.
+            while not exhausted and (
+                not pending or self.buffered_bytes < self.max_bytes
+            ):
+                group = next(groups, None)
+                if group is None:
+                    exhausted = True
+                    break
+                group_objects = objects(group)
+                for s3_object in group_objects:
+                    self._submit(s3_object)
+                pending.append((group, group_objects))
+
+            if not pending:
+                return
+            group, group_objects = pending.popleft()
+            try:
+                yield group
+            finally:
+                for s3_object in group_objects:
+                    self._release(s3_object)
+
+    def get(
+        self, key: str
+    ) -> typing.Optional["concurrent.futures.Future[str]"]:
+        return self.futures.get(key)
+
+    def _submit(self, s3_object: S3Object) -> None:
+        if s3_object.key in self.futures:
+            return
+        self.futures[s3_object.key] = self.executor.submit(
+            self.fetch, s3_object.key
+        )
+        self.buffered_bytes += s3_object.size
+
+    def _release(self, s3_object: S3Object) -> None:
+        future = self.futures.pop(s3_object.key, None)
+        if future is not None:
+            future.cancel()
+            self.buffered_bytes -= s3_object.size
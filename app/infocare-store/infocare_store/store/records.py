@@ -0,0 +1,201 @@
+"""
+records
+=======
+
+crawler 가 실행마다 남기는 ``records/records.jsonl`` 을 읽습니다.
+스키마 버전이 같으면 통계, 낙찰사례 페이지를 HTML 대신 이 레코드로 적재하고,
+버전이 다르거나 레코드가 없는 페이지는 HTML 을 파싱합니다.
+
+"""
+import datetime
+import decimal
+import json
+import re
+import typing
+
+import attr
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+#: crawler 의 ``infocare_crawler.crawler.records.SCHEMA_VERSION`` 과 같아야 합니다.
+SCHEMA_VERSION = 1
+
+RECORDS_FILE_NAME = "records.jsonl"
+
+#: 낙찰사례 폴더에서 시군구 단위 페이지를 나눈 기록의 확장자
+BID_SPLIT_SUFFIX = ".json"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def decode_value(value: typing.Any) -> typing.Any:
+    if isinstance(value, list):
+        return [decode_value(x) for x in value]
+    if not isinstance(value, dict):
+        return value
+    if "$datetime" in value:
+        return datetime.datetime.fromisoformat(value["$datetime"])
+    if "$date" in value:
+        return datetime.date.fromisoformat(value["$date"])
+    if "$decimal" in value:
+        return decimal.Decimal(value["$decimal"])
+    return {k: decode_value(v) for k, v in value.items()}
+
+
+T = typing.TypeVar("T")
+
+
+def _from_json(cls: typing.Type[T], data: typing.Dict[str, typing.Any]) -> T:
+    # 필요한 속성이 없으면 KeyError 로 스키마가 다른 것을 알립니다.
+    return cls(**{  # type: ignore
+        field.name: decode_value(data[field.name])
+        for field in attr.fields(cls)
+    })
+
+
+@attr.s(frozen=True)
+class StatisticsRecord(object):
+    """
+    ``InfocareStatisticResponse`` 에서 store 가 사용하는 속성
+
+    """
+
+    sido_name: str = attr.ib()
+    gugun_name: str = attr.ib()
+    dong_name: str = attr.ib()
+    first_gugun_name: str = attr.ib()
+    first_dong_name: str = attr.ib()
+    start_date: typing.Any = attr.ib()
+    end_date: typing.Any = attr.ib()
+    main_usage_type: str = attr.ib()
+    sub_usage_type: str = attr.ib()
+    sido_year_avg_price_rate: typing.Any = attr.ib()
+    sido_year_avg_bid_rate: typing.Any = attr.ib()
+    sido_year_bid_count: typing.Any = attr.ib()
+    sido_six_month_avg_price_rate: typing.Any = attr.ib()
+    sido_six_month_avg_bid_rate: typing.Any = attr.ib()
+    sido_six_month_bid_count: typing.Any = attr.ib()
+    sido_three_month_avg_price_rate: typing.Any = attr.ib()
+    sido_three_month_avg_bid_rate: typing.Any = attr.ib()
+    sido_three_month_bid_count: typing.Any = attr.ib()
+    gugun_year_avg_price_rate: typing.Any = attr.ib()
+    gugun_year_avg_bid_rate: typing.Any = attr.ib()
+    gugun_year_bid_count: typing.Any = attr.ib()
+    gugun_six_month_avg_price_rate: typing.Any = attr.ib()
+    gugun_six_month_avg_bid_rate: typing.Any = attr.ib()
+    gugun_six_month_bid_count: typing.Any = attr.ib()
+    gugun_three_month_avg_price_rate: typing.Any = attr.ib()
+    gugun_three_month_avg_bid_rate: typing.Any = attr.ib()
+    gugun_three_month_bid_count: typing.Any = attr.ib()
+    dongli_year_avg_price_rate: typing.Any = attr.ib()
+    dongli_year_avg_bid_rate: typing.Any = attr.ib()
+    dongli_year_bid_count: typing.Any = attr.ib()
+    dongli_six_month_avg_price_rate: typing.Any = attr.ib()
+    dongli_six_month_avg_bid_rate: typing.Any = attr.ib()
+    dongli_six_month_bid_count: typing.Any = attr.ib()
+    dongli_three_month_avg_price_rate: typing.Any = attr.ib()
+    dongli_three_month_avg_bid_rate: typing.Any = attr.ib()
+    dongli_three_month_bid_count: typing.Any = attr.ib()
+
+    @classmethod
+    def from_json(
+        cls, data: typing.Dict[str, typing.Any]
+    ) -> "StatisticsRecord":
+        return _from_json(cls, data)
+
+
+@attr.s(frozen=True)
+class BidRecord(object):
+    """
+    ``InfocareBidResponse.infocare_bid_list`` 의 낙찰사례에서
+    store 가 사용하는 속성
+
+    """
+
+    case_number: str = attr.ib()
+    address: str = attr.ib()
+    bid_date: datetime.datetime = attr.ib()
+    estimated_price: typing.Any = attr.ib()
+    lowest_price: typing.Any = attr.ib()
+    success_price: typing.Any = attr.ib()
+    success_bid_rate: typing.Any = attr.ib()
+
+    @classmethod
+    def from_json(cls, data: typing.Dict[str, typing.Any]) -> "BidRecord":
+        return _from_json(cls, data)
+
+
+@attr.s(frozen=True)
+class BidSplitRecord(object):
+    """
+    crawler 가 시군구 단위로 받은 낙찰사례 페이지에서 한 읍/면/동의 행을
+    사건번호와 소재지로 남긴 기록
+
+    """
+
+    #: 실행 폴더 아래의 시군구 낙찰사례 페이지 경로
+    source: str = attr.ib()
+    #: (사건번호, 소재지)
+    rows: typing.List[typing.Tuple[str, str]] = attr.ib()
+
+    @classmethod
+    def from_json(cls, data: typing.Dict[str, typing.Any]) -> "BidSplitRecord":
+        return cls(
+            source=data["source"],
+            rows=[(x["case_number"], x["address"]) for x in data["rows"]],
+        )
+
+
+def bid_split_key(case_number: str, address: str) -> typing.Tuple[str, str]:
+    # crawler 와 스키마의 파서가 공백을 다르게 다듬어도 같은 행으로 봅니다.
+    return _WHITESPACE.sub("", case_number), _WHITESPACE.sub("", address)
+
+
+@attr.s
+class RunRecords(object):
+    #: 실행 폴더 아래의 S3 경로별 통계
+    statistics: typing.Dict[str, StatisticsRecord] = attr.ib(factory=dict)
+    #: 실행 폴더 아래의 S3 경로별 낙찰사례
+    bids: typing.Dict[str, typing.List[BidRecord]] = attr.ib(factory=dict)
+
+    @classmethod
+    def from_lines(
+        cls, lines: typing.Iterable[str]
+    ) -> typing.Optional["RunRecords"]:
+        records = cls()
+        lines = iter(lines)
+        try:
+            header = json.loads(next(lines, "{}"))
+            schema = header.get("schema")
+        except (AttributeError, ValueError) as e:
+            logger.info(
+                "Cannot read records header, storing from html", error=str(e)
+            )
+            return None
+        if schema != SCHEMA_VERSION:
+            logger.info(
+                "Records schema mismatch, storing from html", schema=schema,
+            )
+            return None
+
+        for line in lines:
+            if not line.strip():
+                continue
+            key = None
+            try:
+                record = json.loads(line)
+                key = record["key"]
+                if record["type"] == "statistics":
+                    records.statistics[key] = (
+                        StatisticsRecord.from_json(record["data"])
+                    )
+                elif record["type"] == "bid":
+                    records.bids[key] = [
+                        BidRecord.from_json(x) for x in record["data"]
+                    ]
+            except (KeyError, TypeError, ValueError) as e:
+                # 이 페이지는 HTML 로 적재합니다.
+                logger.info("Cannot read record", key=key, error=str(e))
+
+        return records
@@ -0,0 +1,148 @@
+"""
+regions
+=======
+
+페이지마다 시도, 시군구, 동읍면을 ``create_or_update`` 로 조회하지 않도록
+적재를 시작할 때 저장된 지역을 모두 읽어 두고 이름 경로로 id 를 찾습니다.
+
+없는 지역은 작업 단위의 통계 페이지를 모두 읽은 뒤 시도, 시군구, 동읍면
+단계마다 INSERT 한 번으로 만듭니다. 작업 단위가 롤백되면 그 동안 만든
+지역의 id 는 잊습니다.
+
+"""
+import typing
+
+from sqlalchemy import orm
+from loan_model.models.infocare.infocare_dong import InfocareDong
+from loan_model.models.infocare.infocare_gugun import InfocareGugun
+from loan_model.models.infocare.infocare_sido import InfocareSido
+
+from .exc import InfocareStoreRegionNotFound
+
+#: (시도,), (시도, 시군구), (시도, 시군구, 동읍면)
+RegionPath = typing.Tuple[str, ...]
+
+#: 단계마다 지역 모델과 상위 지역 id 컬럼
+REGION_LEVELS: typing.Sequence[
+    typing.Tuple[typing.Any, typing.Optional[str]]
+] = (
+    (InfocareSido, None),
+    (InfocareGugun, "infocare_sido_id"),
+    (InfocareDong, "infocare_gugun_id"),
+)
+
+
+class RegionRegistry(object):
+    def __init__(self) -> None:
+        self.ids: typing.Dict[RegionPath, int] = {}
+        #: 커밋하지 않은 작업 단위에서 만든 지역
+        self.created: typing.List[RegionPath] = []
+
+    def load(self, session: orm.Session) -> int:
+        """
+        저장된 지역을 모두 읽고 읽은 지역 수를 돌려줍니다.
+
+        """
+        self.ids.clear()
+        self.created.clear()
+
+        sido_paths: typing.Dict[int, RegionPath] = {}
+        for sido_id, name in (
+            session.query(InfocareSido.id, InfocareSido.name)
+            .order_by(InfocareSido.id)
+        ):
+            sido_paths[sido_id] = (name,)
+            self.ids.setdefault((name,), sido_id)
+
+        gugun_paths: typing.Dict[int, RegionPath] = {}
+        for gugun_id, name, sido_id in (
+            session.query(
+                InfocareGugun.id,
+                InfocareGugun.name,
+                InfocareGugun.infocare_sido_id,
+            )
+            .order_by(InfocareGugun.id)
+        ):
+            if sido_id not in sido_paths:
+                continue
+            path = sido_paths[sido_id] + (name,)
+            gugun_paths[gugun_id] = path
+            self.ids.setdefault(path, gugun_id)
+
+        for dong_id, name, gugun_id in (
+            session.query(
+                InfocareDong.id,
+                InfocareDong.name,
+                InfocareDong.infocare_gugun_id,
+            )
+            .order_by(InfocareDong.id)
+        ):
+            if gugun_id not in gugun_paths:
+                continue
+            self.ids.setdefault(gugun_paths[gugun_id] + (name,), dong_id)
+
+        return len(self.ids)
+
+    def create_missing(
+        self, session: orm.Session, paths: typing.Iterable[RegionPath]
+    ) -> int:
+        """
+        ``paths`` 중 없는 시도, 시군구, 동읍면을 단계마다 INSERT 한 번으로
+        만들고 만든 지역 수를 돌려줍니다.
+
+        """
+        paths = list(paths)
+        count = 0
+        for depth, (model, parent_column) in enumerate(REGION_LEVELS, 1):
+            missing = sorted(
+                {path[:depth] for path in paths} - self.ids.keys()
+            )
+            if not missing:
+                continue
+            table = model.__table__
+            # 여러 행의 RETURNING 순서는 보장되지 않으므로
+            # (상위 지역 id, 이름) 으로 경로를 찾습니다.
+            keys = {
+                (self.ids.get(path[:-1]), path[-1]): path for path in missing
+            }
+            columns = [table.c.id, table.c.name]
+            if parent_column is None:
+                rows = [{"name": name} for _, name in keys]
+            else:
+                rows = [
+                    {"name": name, parent_column: parent_id}
+                    for parent_id, name in keys
+                ]
+                columns.append(table.c[parent_column])
+            for region_id, name, *parent in session.execute(
+                table.insert().values(rows).returning(*columns)
+            ):
+                path = keys[(parent[0] if parent else None, name)]
+                self.ids[path] = region_id
+                self.created.append(path)
+            count += len(missing)
+        return count
+
+    def resolve(
+        self, sido_name: str, gugun_name: str, dong_name: str
+    ) -> typing.Tuple[int, int, int]:
+        """
+        시도, 시군구, 동읍면 id 를 돌려줍니다. 지역은 먼저
+        :meth:`create_missing` 으로 만들어 두어야 합니다.
+
+        """
+        path = (sido_name, gugun_name, dong_name)
+        try:
+            return self.ids[path[:1]], self.ids[path[:2]], self.ids[path]
+        except KeyError:
+            raise InfocareStoreRegionNotFound(
+                f"not found region {' '.join(path)}"
+            )
+
+    def commit(self) -> None:
+        self.created.clear()
+
+    def rollback(self) -> None:
+        for path in self.created:
+            self.ids.pop(path, None)
+        self.created.clear()
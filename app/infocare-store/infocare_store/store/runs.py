@@ -0,0 +1,43 @@
+"""
+runs
+====
+
+crawler 가 끝까지 마친 실행마다 올리는 ``{ENVIRONMENT}/crawler-runs/`` 의
+``{time_stamp}.json`` 을 읽습니다. 실행이 없으면 store 는 날짜 폴더를 차례로
+조회합니다.
+
+"""
+import typing
+
+import attr
+
+from .data import CrawlerLogResponse
+
+#: crawler 의 ``infocare_crawler.crawler.runs.RUN_FOLDER_NAME`` 과 같습니다.
+RUN_FOLDER_NAME = "crawler-runs"
+
+
+@attr.s(frozen=True)
+class CrawlerRun(object):
+    #: 실행 폴더 (``{ENVIRONMENT}/{year}/{month}/{day}/{time_stamp}/``)
+    prefix: str = attr.ib()
+    log: CrawlerLogResponse = attr.ib()
+
+    @classmethod
+    def from_json(cls, data: typing.Dict[str, typing.Any]) -> "CrawlerRun":
+        return cls(
+            prefix=data["prefix"],
+            log=CrawlerLogResponse.from_json(
+                typing.cast(CrawlerLogResponse.CrawlerLogResponseData, data)
+            ),
+        )
+
+
+def run_time_stamp(file_name: str) -> typing.Optional[float]:
+    # ``{time_stamp}.json`` 이 아닌 객체는 실행으로 보지 않습니다.
+    if not file_name.endswith(".json"):
+        return None
+    try:
+        return float(file_name[:-len(".json")])
+    except ValueError:
+        return None
@@ -0,0 +1,234 @@
+"""
+staging
+=======
+
+전국 단위로 처음 적재하거나 다시 적재할 때는 통계, 낙찰사례를 페이지마다
+upsert 하지 않고 ``COPY FROM STDIN`` 으로 UNLOGGED 스테이징 테이블에 넣은 뒤,
+실행이 끝나면 집합 단위 SQL 로 한 번에 합칩니다.
+
+- 스테이징 테이블 이름은 모델의 ``__table__`` 이름에 ``_staging`` 을 붙입니다.
+  만료를 계산할 범위는 ``infocare_bid_expiry_staging`` 에 넣습니다.
+- 같은 키의 행은 나중에 넣은 행(``seq``)으로 합칩니다.
+- 낙찰사례 만료도 합치는 트랜잭션에서 (동, 용도) 별로 계산합니다.
+
+"""
+import datetime
+import io
+import itertools
+import typing
+
+import attr
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
+from loan_model.models.infocare.infocare_bid import InfocareBid
+from loan_model.models.infocare.infocare_statistics import InfocareStatistics
+
+from .bulk import STATISTICS_KEY_COLUMNS, STATISTICS_VALUE_COLUMNS, \
+    BID_KEY_COLUMNS, BID_VALUE_COLUMNS, model_columns, \
+    statistics_natural_key, on_statistics_conflict, on_bid_conflict
+
+STATISTICS_COLUMNS = STATISTICS_KEY_COLUMNS + STATISTICS_VALUE_COLUMNS
+BID_COLUMNS = BID_KEY_COLUMNS + BID_VALUE_COLUMNS
+#: 낙찰사례 페이지를 받은 (동, 용도). 이 범위에서 받지 않은 사례를 만료시킵니다.
+SCOPE_COLUMNS = model_columns(
+    InfocareBid.__table__,
+    "infocare_dong_id", "main_usage_type", "sub_usage_type",
+)
+
+
+def copy_value(value: typing.Any) -> str:
+    # COPY 의 text 형식으로 바꿉니다.
+    if value is None:
+        return "\\N"
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class StagingTable(object):
+    def __init__(
+        self,
+        source: sa.Table,
+        columns: typing.Sequence[str],
+        suffix: str = "staging",
+    ) -> None:
+        self.source = source
+        self.columns = tuple(columns)
+        self.table = sa.table(
+            f"{source.name}_{suffix}",
+            sa.column("seq"),
+            *[sa.column(name) for name in self.columns],
+        )
+        #: 다음 COPY 로 보낼 행
+        self.buffer = io.StringIO()
+        self.buffered = 0
+
+    def create(self, session: orm.Session) -> None:
+        # 대상 테이블의 컬럼 타입을 그대로 쓰고, 제약 조건은 만들지 않습니다.
+        quote = session.bind.dialect.identifier_preparer.quote
+        columns = ", ".join(quote(name) for name in self.columns)
+        self.drop(session)
+        session.execute(
+            f"CREATE UNLOGGED TABLE {quote(self.table.name)} AS"
+            f" SELECT 0::bigint AS seq, {columns}"
+            f" FROM {quote(self.source.name)} WITH NO DATA"
+        )
+
+    def drop(self, session: orm.Session) -> None:
+        # 대상 테이블의 enum 타입을 사용하므로 스키마를 바꾸기 전에 지웁니다.
+        quote = session.bind.dialect.identifier_preparer.quote
+        session.execute(f"DROP TABLE IF EXISTS {quote(self.table.name)}")
+
+    def add(self, seq: int, row: typing.Dict[str, typing.Any]) -> None:
+        values = [str(seq)] + [copy_value(row[name]) for name in self.columns]
+        self.buffer.write("\t".join(values) + "\n")
+        self.buffered += 1
+
+    def flush(self, session: orm.Session) -> int:
+        if not self.buffered:
+            return 0
+
+        quote = session.bind.dialect.identifier_preparer.quote
+        columns = ", ".join(quote(name) for name in ("seq",) + self.columns)
+        self.buffer.seek(0)
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {quote(self.table.name)} ({columns}) FROM STDIN",
+                self.buffer,
+            )
+        finally:
+            cursor.close()
+
+        count = self.buffered
+        self.discard()
+        return count
+
+    def discard(self) -> None:
+        self.buffer = io.StringIO()
+        self.buffered = 0
+
+
+@attr.s
+class MergeCounts(object):
+    #: 새로 넣거나 갱신한 통계 행
+    statistics: int = attr.ib(default=0)
+    #: 새로 넣거나 값이 바뀐 낙찰사례 행
+    bids: int = attr.ib(default=0)
+    #: 만료시킨 낙찰사례 행
+    expired: int = attr.ib(default=0)
+
+
+class StagingLoader(object):
+    def __init__(self) -> None:
+        self.seq = itertools.count()
+        self.statistics = StagingTable(
+            InfocareStatistics.__table__, STATISTICS_COLUMNS
+        )
+        self.bids = StagingTable(InfocareBid.__table__, BID_COLUMNS)
+        self.scopes = StagingTable(
+            InfocareBid.__table__, SCOPE_COLUMNS, "expiry_staging"
+        )
+
+    @property
+    def tables(self) -> typing.List[StagingTable]:
+        return [self.statistics, self.bids, self.scopes]
+
+    def create(self, session: orm.Session) -> None:
+        for table in self.tables:
+            table.create(session)
+
+    def add_statistics(self, row: typing.Dict[str, typing.Any]) -> None:
+        self.statistics.add(next(self.seq), row)
+
+    def add_bids(
+        self, rows: typing.Iterable[typing.Dict[str, typing.Any]]
+    ) -> None:
+        for row in rows:
+            self.bids.add(next(self.seq), row)
+
+    def add_scope(
+        self, db_dong_id: int, main_usage_type: str, sub_usage_type: str
+    ) -> None:
+        self.scopes.add(next(self.seq), dict(zip(SCOPE_COLUMNS, (
+            db_dong_id, main_usage_type, sub_usage_type,
+        ))))
+
+    def drop(self, session: orm.Session) -> None:
+        for table in self.tables:
+            table.drop(session)
+
+    def flush(self, session: orm.Session) -> int:
+        """
+        모아 둔 행을 COPY 로 보내고 보낸 행 수를 돌려줍니다.
+        커밋은 세션을 넘겨 준 쪽에서 합니다.
+
+        """
+        return sum(table.flush(session) for table in self.tables)
+
+    def discard(self) -> None:
+        for table in self.tables:
+            table.discard()
+
+    def merge(
+        self, session: orm.Session, expired_date: datetime.datetime
+    ) -> MergeCounts:
+        """
+        스테이징 테이블을 대상 테이블에 합치고 지웁니다.
+        자연 키 유일 인덱스(:data:`.bulk.NATURAL_KEY_INDEXES`)가 있어야 합니다.
+
+        """
+        counts = MergeCounts()
+        bid = InfocareBid.__table__
+        scope = self.scopes.table
+        staged_bid = self.bids.table
+
+        # 받은 범위에서 이번에 받지 않은 낙찰사례를 만료시킵니다.
+        counts.expired = session.execute(
+            bid.update()
+            .where(sa.and_(
+                bid.c.expired_date.is_(None),
+                sa.exists().where(sa.and_(*[
+                    scope.c[name] == bid.c[name] for name in SCOPE_COLUMNS
+                ])),
+                ~sa.exists().where(sa.and_(*[
+                    staged_bid.c[name] == bid.c[name]
+                    for name in BID_KEY_COLUMNS + ("infocare_dong_id",)
+                ])),
+            ))
+            .values(expired_date=expired_date)
+        ).rowcount
+
+        bid_key = [staged_bid.c[name] for name in BID_KEY_COLUMNS]
+        counts.bids = session.execute(on_bid_conflict(
+            postgresql.insert(bid).from_select(
+                list(BID_COLUMNS),
+                sa.select([staged_bid.c[name] for name in BID_COLUMNS])
+                .distinct(*bid_key)
+                .order_by(*bid_key, staged_bid.c.seq.desc()),
+            )
+        )).rowcount
+
+        staged_statistics = self.statistics.table
+        statistics_key = statistics_natural_key(staged_statistics)
+        counts.statistics = session.execute(on_statistics_conflict(
+            postgresql.insert(InfocareStatistics.__table__).from_select(
+                list(STATISTICS_COLUMNS),
+                sa.select([
+                    staged_statistics.c[name] for name in STATISTICS_COLUMNS
+                ])
+                .distinct(*statistics_key)
+                .order_by(*statistics_key, staged_statistics.c.seq.desc()),
+            )
+        )).rowcount
+
+        self.drop(session)
+        return counts
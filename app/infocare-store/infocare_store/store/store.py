@@ -1,34 +1,67 @@
+import collections
+import contextlib
 import datetime
+import json
+import os
 import re
+import tempfile
 import typing
 
 import pytz
+import sqlalchemy as sa
 import structlog
+from sqlalchemy import orm
 from crawler.aws_client import S3Client
-from crawler.infocare_schema import (
-    InfocareStatisticResponse,
-    InfocareBidResponse,
-    MAIN_USAGE_TYPE,
-)
-from infocare_store.db import create_session_factory, init_loan_db_schema
+from crawler.infocare_schema import MAIN_USAGE_TYPE
+from crawler.profiling import Profiler, stage
+from infocare_store.db import create_session_factory, init_loan_db_schema, \
+    apply_migrations, find_missing_indexes
+from infocare_store.metrics import StoreProgress
 from loan_model.models.infocare.infocare_bid import InfocareBid
-from loan_model.models.infocare.infocare_dong import InfocareDong
-from loan_model.models.infocare.infocare_gugun import InfocareGugun
-from loan_model.models.infocare.infocare_sido import InfocareSido
 from loan_model.models.infocare.infocare_statistics import InfocareStatistics
 from tanker.slack import SlackClient
 from tanker.utils.datetime import tzfromtimestamp
-from tanker.utils.datetime import tznow
+from tanker.utils.datetime import tznow, timestamp
 
-from .exc import InfocareStoreS3NotFound, InfocareStoreRegionNotFound
+from .bulk import EXPIRY_INDEX, NATURAL_KEY_INDEXES, StatisticsWriter, \
+    statistics_row, bid_row, upsert_bids, expire_bids
+from .data import CrawlerLogResponse, S3Object, StatisticsFile, PrefixTree
+from . import ledger
+from .exc import InfocareStoreS3NotFound, InfocareStoreRegionNotFound, \
+    InfocareStoreCrawlerLogNotFound, InfocareStoreSchemaNotReady, \
+    InfocareStoreBidSplitMismatch
+from .parsing import PageParser, parse_statistics, parse_bid_list, \
+    parse_bid_split
+from .regions import RegionRegistry
+from .records import RECORDS_FILE_NAME, BID_SPLIT_SUFFIX, RunRecords, \
+    StatisticsRecord, BidRecord, bid_split_key
+from .prefetch import Prefetcher
+from .staging import StagingLoader
+from .runs import RUN_FOLDER_NAME, CrawlerRun, run_time_stamp
 
 logger = structlog.get_logger(__name__)
 
+#: HTML 을 파싱한 결과나 crawler 가 남긴 레코드
+Statistics = StatisticsRecord
+BidList = typing.Sequence[BidRecord]
+
+T = typing.TypeVar("T")
+
+#: 읍/면/동 기록이 함께 읽는 시군구 낙찰사례 페이지를 들고 있는 수
+BID_SOURCE_CACHE_SIZE = 8
+
 
 class InfocareStore(object):
-    def __init__(self, config: typing.Dict[str, typing.Any]) -> None:
+    def __init__(
+        self,
+        config: typing.Dict[str, typing.Any],
+        profiler: typing.Optional[Profiler] = None,
+        progress: typing.Optional[StoreProgress] = None,
+    ) -> None:
         super().__init__()
         self.config = config
+        self.profiler = profiler or Profiler()
+        self.progress = progress or StoreProgress()
         self.session_factory = create_session_factory(config)
         self.s3_client = S3Client(config)
         self.slack_client = SlackClient(
@@ -40,44 +73,343 @@ class InfocareStore(object):
         self.region_level_1 = self.config["REGION_REGEX_LEVEL_1"]
         self.region_level_2 = self.config["REGION_REGEX_LEVEL_2"]
         self.region_level_3 = self.config["REGION_REGEX_LEVEL_3"]
-        self.competed_sido_ids: typing.Dict[str, int] = dict()
-        self.completed_gugun_ids: typing.Dict[str, int] = dict()
+        self.regions = RegionRegistry()
+        self.log_id_prefix: typing.Optional[str] = None
+        #: 적재하는 실행의 crawler-log 에 남은 페이지 인코딩
+        self.page_encoding: typing.Optional[str] = None
+        self.records: typing.Optional[RunRecords] = None
+        self.prefetcher: typing.Optional[Prefetcher] = None
+        self.parser: typing.Optional[PageParser] = None
+        #: 미리 받을 페이지의 S3 경로별 파싱 함수
+        self.page_parsers: typing.Dict[
+            str, typing.Callable[[str], typing.Any]
+        ] = {}
+        #: 최근에 읽은 시군구 낙찰사례 페이지
+        self.bid_sources: "collections.OrderedDict[str, BidList]" = (
+            collections.OrderedDict()
+        )
+        self.use_ledger = False
+        self.crawler_log_id: typing.Optional[str] = None
+        #: 이 실행에서 이미 저장한 객체의 S3 경로별 ETag
+        self.stored_objects: typing.Dict[str, str] = {}
+        # 자연 키 인덱스를 만든 경우에만 한 문장으로 저장합니다.
+        self.bulk_upsert = False
+        self.statistics_writer: typing.Optional[StatisticsWriter] = None
+        # COPY_LOAD 이면 스테이징 테이블에 넣고 실행이 끝나면 합칩니다.
+        self.staging: typing.Optional[StagingLoader] = None
+        # 작업 단위(통계 페이지 묶음)가 함께 사용하는 세션
+        self.session: typing.Optional[orm.Session] = None
 
     def run(self, run_by: str) -> None:
         if self.config["ENVIRONMENT"] == "local":
             session = self.session_factory()
             try:
+                StagingLoader().drop(session)
+                session.commit()
                 init_loan_db_schema(session)
+                ledger.ledger_table.drop(session.bind, checkfirst=True)
             except Exception:
                 raise
             finally:
                 session.close()
+            # 운영 DB 에는 loan_model 마이그레이션으로 반영하는 인덱스입니다.
+            apply_migrations(self.engine)
+
+        self.init_bulk_writers()
+        self.init_staging()
+        self.init_ledger()
+        self.load_regions()
 
         self.slack_client.send_info_slack(
             f"Store 시작합니다. ({self.config['ENVIRONMENT']}, {run_by})"
         )
         crawler_log_id = self.config["CRAWLER_LOG_ID"]
 
-        if crawler_log_id:
-            self.fetch_received_log_folder()  # 수동 log id 폴더 저장
-        else:
-            self.fetch_latest_log_folder()  # 최신 log id 폴더 저장
+        with self.profiler.transaction("infocare-store"):
+            self.profiler.tag("run_by", run_by)
+            if crawler_log_id:
+                self.fetch_received_log_folder()  # 수동 log id 폴더 저장
+            else:
+                self.fetch_latest_log_folder()  # 최신 log id 폴더 저장
 
         self.slack_client.send_info_slack(
             f"Store 종료합니다. ({self.config['ENVIRONMENT']}, {run_by})"
         )
 
+    @property
+    def engine(self) -> sa.engine.Engine:
+        return self.session_factory.kw["bind"]
+
+    def init_bulk_writers(self) -> None:
+        # 인덱스가 없어도 만료는 계산할 수 있으므로 경고만 남깁니다.
+        if find_missing_indexes(self.engine, [EXPIRY_INDEX]):
+            logger.warning(
+                "Expiring bids without an index",
+                index=EXPIRY_INDEX,
+                migration="0003_infocare_bid_expiry.sql",
+            )
+
+        if not self.config.get("BULK_UPSERT", False):
+            return
+
+        self.check_indexes("BULK_UPSERT", NATURAL_KEY_INDEXES)
+
+        self.bulk_upsert = True
+        # 0 이면 통계는 한 행씩 저장합니다.
+        batch_size = int(self.config.get("STATISTICS_BATCH_SIZE") or 0)
+        if batch_size > 0:
+            self.statistics_writer = StatisticsWriter(batch_size)
+
+    def check_indexes(
+        self, setting: str, names: typing.Sequence[str]
+    ) -> None:
+        # 공유하는 loan_model 테이블에 인덱스를 만들지 않고, 없으면 바로
+        # 실패합니다.
+        missing = find_missing_indexes(self.engine, names)
+        if missing:
+            raise InfocareStoreSchemaNotReady(
+                f"{setting} needs the indexes {', '.join(missing)}."
+                " Apply infocare_store/migrations to the loan_model database"
+                f" or turn {setting} off."
+            )
+
+    def init_staging(self) -> None:
+        if not self.config.get("COPY_LOAD", False):
+            return
+        # 스테이징 테이블을 합칠 때 자연 키 인덱스가 필요합니다.
+        self.check_indexes("COPY_LOAD", NATURAL_KEY_INDEXES)
+        staging = StagingLoader()
+        with self.use_session() as session:
+            staging.create(session)
+        self.staging = staging
+
+    @stage("merge_staging")
+    def merge_staging(self) -> None:
+        if self.staging is None:
+            return
+        with self.use_session() as session:
+            counts = self.staging.merge(session, self.storing_date)
+        self.progress.rows_upserted += counts.statistics + counts.bids
+        logger.info(
+            "Merge Staging",
+            statistics=counts.statistics,
+            bids=counts.bids,
+            expired=counts.expired,
+        )
+
+    def init_ledger(self) -> None:
+        # 스테이징 테이블은 합치기 전에 실패하면 다시 채워야 하므로
+        # COPY_LOAD 에서는 건너뛰지 않습니다.
+        if not self.config.get("USE_LEDGER", False):
+            return
+        if self.staging is not None:
+            return
+        with self.use_session() as session:
+            if not ledger.has_ledger(session):
+                raise InfocareStoreSchemaNotReady(
+                    f"USE_LEDGER needs the table {ledger.ledger_table.name}."
+                    " Apply infocare_store/migrations to the loan_model"
+                    " database or turn USE_LEDGER off."
+                )
+        self.use_ledger = True
+
+    def load_ledger(self, log_id_prefix: str) -> None:
+        self.crawler_log_id = self.get_crawler_log_id(log_id_prefix)
+        self.stored_objects = {}
+        if not self.use_ledger:
+            return
+        with self.use_session() as session:
+            self.stored_objects = ledger.load_stored(
+                session, self.crawler_log_id
+            )
+        if self.stored_objects:
+            logger.info(
+                "Resume from ledger",
+                crawler_log_id=self.crawler_log_id,
+                stored=len(self.stored_objects),
+            )
+
+    def is_stored(self, statistics_file: StatisticsFile) -> bool:
+        return all(
+            self.stored_objects.get(x.key) == x.etag
+            for x in statistics_file.objects
+        )
+
+    def skip_stored(
+        self, statistics_files: typing.Iterable[StatisticsFile]
+    ) -> typing.Iterator[StatisticsFile]:
+        skipped = 0
+        for statistics_file in statistics_files:
+            if self.is_stored(statistics_file):
+                skipped += 1
+                continue
+            yield statistics_file
+        if skipped:
+            logger.info("Skip stored statistics", files=skipped)
+
+    def record_ledger(
+        self, s3_objects: typing.List[S3Object], outcome: str
+    ) -> None:
+        if not self.use_ledger:
+            return
+        assert self.crawler_log_id is not None
+        with self.use_session() as session:
+            ledger.record(session, s3_objects, self.crawler_log_id, outcome)
+
+    @stage("load_regions")
+    def load_regions(self) -> None:
+        with self.use_session() as session:
+            count = self.regions.load(session)
+        logger.info("Load Regions", regions=count)
+
+    def flush_bulk_writers(self, session: orm.Session) -> None:
+        if self.staging is not None:
+            with self.profiler.stage("copy_staging"):
+                self.staging.flush(session)
+        if self.statistics_writer is not None:
+            with self.profiler.stage("store_statistics_data"):
+                self.progress.rows_upserted += (
+                    self.statistics_writer.flush(session)
+                )
+
+    @contextlib.contextmanager
+    def use_session(self) -> typing.Iterator[orm.Session]:
+        # 작업 단위 안에서는 그 세션을 쓰고 커밋은 작업 단위가 끝날 때 합니다.
+        if self.session is not None:
+            yield self.session
+            return
+
+        session = self.session_factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def begin_unit_of_work(self) -> None:
+        self.session = self.session_factory()
+
+    def commit_unit_of_work(self) -> None:
+        session = self.session
+        assert session is not None
+        try:
+            self.flush_bulk_writers(session)
+            with self.profiler.stage("commit"):
+                session.commit()
+            self.regions.commit()
+        finally:
+            self.session = None
+            session.close()
+
+    def rollback_unit_of_work(self) -> None:
+        session, self.session = self.session, None
+        if session is not None:
+            session.rollback()
+            session.close()
+        if self.statistics_writer is not None:
+            self.statistics_writer.discard()
+        if self.staging is not None:
+            self.staging.discard()
+        # 커밋되지 않은 지역 id 는 버립니다.
+        self.regions.rollback()
+
+    def get_objects(
+        self, prefix: str, **kwargs: typing.Any
+    ) -> typing.Iterator[typing.Any]:
+        responses = iter(self.s3_client.get_objects(prefix, **kwargs))
+        while True:
+            with self.profiler.stage("s3_list"):
+                response = next(responses, None)
+            if response is None:
+                return
+            yield response
+
+    def get_page(self, key: str, parse: typing.Callable[[str], T]) -> T:
+        future = self.prefetcher.get(key) if self.prefetcher else None
+        if future is not None:
+            # 미리 받는 스레드에서 받아 파싱까지 마친 페이지
+            with self.profiler.stage("s3_get"):
+                page = typing.cast(T, future.result())
+        else:
+            with self.profiler.stage("s3_get"):
+                data = self.download_object(key)
+            with self.profiler.stage("parse"):
+                page = parse(data)
+        self.progress.objects_processed += 1
+        return page
+
+    def fetch_page(self, key: str) -> typing.Any:
+        # 미리 받는 스레드에서 받은 페이지를 파싱 프로세스에 넘깁니다.
+        data = self.download_object(key)
+        assert self.parser is not None
+        return self.parser.parse(self.page_parsers[key], data)
+
+    def download_object(self, key: str) -> str:
+        # 미리 받는 스레드에서도 호출하므로 프로파일러를 사용하지 않습니다.
+        # crawler 가 받은 그대로 저장한 페이지를 crawler-log 에 남은
+        # 인코딩으로 한 번만 디코딩합니다.
+        assert self.page_encoding is not None
+        s3_response = self.s3_client.get_object(key)
+        return typing.cast(
+            str, s3_response.body.read().decode(self.page_encoding)
+        )
+
     def fetch_latest_log_folder(self) -> None:
+        crawler_run = self.load_latest_run()
+        if crawler_run is not None:
+            # 끝까지 마친 실행 중 가장 최근 실행을 저장합니다.
+            log_id_prefix = crawler_run.prefix
+            self.page_encoding = self.get_page_encoding(crawler_run)
+        else:
+            log_id_prefix = self.find_latest_log_folder()
+            self.page_encoding = self.load_page_encoding(log_id_prefix)
+        self.log_id_prefix = log_id_prefix
+        self.tag_crawler_log(log_id_prefix)
+        self.fetch_sido_region_folder(log_id_prefix)
+
+    def find_latest_log_folder(self) -> str:
+        # 실행 목록이 없던 예전 crawler 의 실행은 날짜 폴더를 차례로 찾습니다.
         env_prefix = f"{self.config['ENVIRONMENT']}/"
         year_prefix = self.fetch_latest_date_folder(env_prefix)
         month_prefix = self.fetch_latest_date_folder(year_prefix)
         day_prefix = self.fetch_latest_date_folder(month_prefix)
-        log_id_prefix = self.fetch_latest_date_folder(day_prefix)
-        self.fetch_sido_region_folder(log_id_prefix)
+        return self.fetch_latest_date_folder(day_prefix)
+
+    @property
+    def run_folder_prefix(self) -> str:
+        return f"{self.config['ENVIRONMENT']}/{RUN_FOLDER_NAME}/"
+
+    def load_latest_run(self) -> typing.Optional[CrawlerRun]:
+        # 실행 폴더의 목록에서 시작 시각이 가장 늦은 실행을 읽습니다.
+        prefix = self.run_folder_prefix
+        latest: typing.Optional[typing.Tuple[float, str]] = None
+        for response in self.get_objects(prefix):
+            for content in response.contents or []:
+                time_stamp = run_time_stamp(content["Key"][len(prefix):])
+                if time_stamp is None:
+                    continue
+                if latest is None or time_stamp > latest[0]:
+                    latest = (time_stamp, content["Key"])
+        if latest is None:
+            logger.info("Crawler runs not found", prefix=prefix)
+            return None
+        return self.load_run(latest[1])
+
+    def load_run(self, key: str) -> typing.Optional[CrawlerRun]:
+        try:
+            with self.profiler.stage("s3_get"):
+                data = self.s3_client.get_object(key).body.read()
+        except Exception as e:
+            logger.info("Crawler run not found", key=key, error=str(e))
+            return None
+        return CrawlerRun.from_json(json.loads(data))
 
     def fetch_latest_date_folder(self, base_prefix: str) -> str:
         date_list: typing.List[str] = list()
-        for response in self.s3_client.get_objects(base_prefix, Delimiter="/"):
+        for response in self.get_objects(base_prefix, Delimiter="/"):
             prefixes = response.common_prefixes
             if not prefixes:
                 raise InfocareStoreS3NotFound("not found date list")
@@ -88,112 +420,353 @@ class InfocareStore(object):
                     .replace("/", "")
                     .strip()
                 )
+                try:
+                    float(date)
+                except ValueError:
+                    # crawler-runs/ 처럼 날짜나 시각이 아닌 폴더는 건너뜁니다.
+                    continue
                 date_list.append(date)
             date_list.sort()
+        if not date_list:
+            raise InfocareStoreS3NotFound("not found date list")
         base_prefix += date_list[-1] + "/"
 
         return base_prefix
 
     def fetch_received_log_folder(self) -> None:
         crawler_log_id = self.config["CRAWLER_LOG_ID"]
-        crawler_date = tzfromtimestamp(float(crawler_log_id))
-        log_id_prefix = (
-            f"{self.config['ENVIRONMENT']}/"
-            f"{crawler_date.year}/"
-            f"{crawler_date.month}/"
-            f"{crawler_date.day}/"
-            f"{crawler_log_id}/"
+        crawler_run = self.load_run(
+            f"{self.run_folder_prefix}{crawler_log_id}.json"
         )
+        if crawler_run is not None:
+            log_id_prefix = crawler_run.prefix
+            self.page_encoding = self.get_page_encoding(crawler_run)
+        else:
+            crawler_date = tzfromtimestamp(float(crawler_log_id))
+            log_id_prefix = (
+                f"{self.config['ENVIRONMENT']}/"
+                f"{crawler_date.year}/"
+                f"{crawler_date.month}/"
+                f"{crawler_date.day}/"
+                f"{crawler_log_id}/"
+            )
+            self.page_encoding = self.load_page_encoding(log_id_prefix)
+        self.log_id_prefix = log_id_prefix
+        self.tag_crawler_log(log_id_prefix)
         self.fetch_sido_region_folder(log_id_prefix)
 
-    def fetch_sido_region_folder(self, log_id_prefix: str) -> None:
-        data_prefix = log_id_prefix + "data/"
-        sido_check: bool = False
-        for response in self.s3_client.get_objects(data_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise InfocareStoreS3NotFound("not found sido region list")
-            for sido_prefix in prefixes:
-                sido_name = (
-                    sido_prefix["Prefix"]
-                    .replace(data_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                if re.search(self.region_level_1, sido_name):
-                    sido_check = True
-                    self.fetch_gugun_region_folder(sido_prefix["Prefix"])
+    @staticmethod
+    def get_page_encoding(crawler_run: CrawlerRun) -> str:
+        if crawler_run.log.page_encoding is None:
+            raise InfocareStoreCrawlerLogNotFound(
+                f"not found page encoding of {crawler_run.prefix}"
+            )
+        return crawler_run.log.page_encoding
+
+    def load_page_encoding(self, log_id_prefix: str) -> str:
+        # 실행 목록에 없는 실행은 crawler-log 를 직접 읽습니다.
+        crawler_log_id = self.get_crawler_log_id(log_id_prefix)
+        key = f"{log_id_prefix}crawler-log/{crawler_log_id}.json"
+        try:
+            with self.profiler.stage("s3_get"):
+                data = self.s3_client.get_object(key).body.read()
+        except Exception as e:
+            raise InfocareStoreCrawlerLogNotFound(
+                f"not found crawler log {key}"
+            ) from e
+        crawler_log = CrawlerLogResponse.from_json(json.loads(data))
+        # 인코딩을 남기지 않던 crawler 는 utf-8 로 다시 인코딩해 저장했습니다.
+        return crawler_log.page_encoding or "utf-8"
+
+    @staticmethod
+    def get_crawler_log_id(log_id_prefix: str) -> str:
+        # 실행 폴더 이름은 crawler-log 의 실행 시각입니다.
+        return log_id_prefix.rstrip("/").rsplit("/", 1)[-1]
 
-        if not sido_check:
-            raise InfocareStoreRegionNotFound(
-                f"not found sido({self.region_level_1})"
+    def tag_crawler_log(self, log_id_prefix: str) -> None:
+        # crawler 의 트레이스와 같은 키로 이어볼 수 있도록
+        # 적재하는 crawler-log 의 실행 시각을 남깁니다.
+        self.profiler.tag(
+            "crawling_start_time", self.get_crawler_log_id(log_id_prefix)
+        )
+
+    def load_records(self, log_id_prefix: str) -> None:
+        # crawler 가 파싱해 둔 레코드가 있으면 HTML 을 다시 파싱하지 않습니다.
+        self.records = None
+        if not self.config.get("USE_RECORDS", False):
+            return
+        key = f"{log_id_prefix}records/{RECORDS_FILE_NAME}"
+        try:
+            with self.profiler.stage("s3_get"):
+                data = self.s3_client.get_object(key).body.read()
+        except Exception as e:
+            logger.info("Records not found, storing from html", key=key,
+                        error=str(e))
+            return
+        with self.profiler.stage("parse"):
+            self.records = RunRecords.from_lines(
+                data.decode("utf-8").splitlines()
+            )
+        if self.records is not None:
+            logger.info(
+                "Storing from records",
+                statistics=len(self.records.statistics),
+                bids=len(self.records.bids),
             )
 
-    def fetch_gugun_region_folder(self, sido_prefix: str) -> None:
-        gugun_check: bool = False
-        for response in self.s3_client.get_objects(sido_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise InfocareStoreS3NotFound("not found gugun region list")
-            for gugun_prefix in prefixes:
-                gugun_name = (
-                    gugun_prefix["Prefix"]
-                    .replace(sido_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                if re.search(self.region_level_2, gugun_name):
-                    gugun_check = True
-                    self.fetch_dong_region_folder(gugun_prefix["Prefix"])
+    def record_key(self, key: str) -> str:
+        # 레코드의 키는 실행 폴더 아래의 경로입니다.
+        prefix = self.log_id_prefix or ""
+        return key[len(prefix):] if key.startswith(prefix) else key
+
+    def get_statistics(self, key: str) -> Statistics:
+        if self.records is not None:
+            record = self.records.statistics.get(self.record_key(key))
+            if record is not None:
+                self.progress.objects_processed += 1
+                return record
+        return self.get_page(key, parse_statistics)
 
-        if not gugun_check:
-            raise InfocareStoreRegionNotFound(
-                f"not found gugun({self.region_level_2})"
+    def get_bid_list(self, key: str) -> BidList:
+        if key.endswith(BID_SPLIT_SUFFIX):
+            return self.get_split_bid_list(key)
+        if self.records is not None:
+            record = self.records.bids.get(self.record_key(key))
+            if record is not None:
+                self.progress.objects_processed += 1
+                return record
+        return self.get_page(key, parse_bid_list)
+
+    def get_split_bid_list(self, key: str) -> BidList:
+        """
+        시군구 단위 낙찰사례 페이지에서 crawler 가 이 읍/면/동으로 나눈 행을
+        사건번호와 소재지로 찾아 돌려줍니다. 기록한 행이 페이지에 없으면
+        다른 낙찰사례를 만료시키지 않도록 실패합니다.
+
+        """
+        split = self.get_page(key, parse_bid_split)
+        source = self.bid_sources.get(split.source)
+        if source is None:
+            source = self.get_bid_list(
+                (self.log_id_prefix or "") + split.source
             )
+            self.bid_sources[split.source] = source
+            if len(self.bid_sources) > BID_SOURCE_CACHE_SIZE:
+                self.bid_sources.popitem(last=False)
+        else:
+            self.bid_sources.move_to_end(split.source)
 
-    def fetch_dong_region_folder(self, gugun_prefix: str) -> None:
-        dong_check: bool = False
-        for response in self.s3_client.get_objects(
-            gugun_prefix, Delimiter="/"
-        ):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise InfocareStoreS3NotFound("not found dong region list")
-            for dong_prefix in prefixes:
-                dong_name = (
-                    dong_prefix["Prefix"]
-                    .replace(gugun_prefix, "")
-                    .replace("/", "")
-                    .strip()
-                )
-                if re.search(self.region_level_3, dong_name):
-                    dong_check = True
-                    self.fetch_main_using_type_folder(dong_prefix["Prefix"])
+        rows = collections.Counter(
+            bid_split_key(case_number, address)
+            for case_number, address in split.rows
+        )
+        bid_list = [
+            bid for bid in source
+            if rows[bid_split_key(bid.case_number, bid.address)] > 0
+        ]
+        found = collections.Counter(
+            bid_split_key(bid.case_number, bid.address) for bid in bid_list
+        )
+        if found != rows:
+            raise InfocareStoreBidSplitMismatch(
+                f"bid rows of {key} not found in {split.source}"
+            )
+        return bid_list
 
-        if not dong_check:
-            raise InfocareStoreRegionNotFound(
-                f"not found dong({self.region_level_3})"
+    def fetch_sido_region_folder(self, log_id_prefix: str) -> None:
+        self.load_records(log_id_prefix)
+        self.load_ledger(log_id_prefix)
+        statistics_files: typing.Iterable[StatisticsFile] = self.skip_stored(
+            self.list_sido_region_folder(log_id_prefix)
+        )
+
+        workers = int(self.config.get("S3_PREFETCH_WORKERS") or 0)
+        if workers > 0:
+            # 앞의 파일을 저장하는 동안 다음 파일들을 미리 받아 파싱합니다.
+            self.parser = PageParser(
+                int(self.config.get("PARSE_WORKERS") or 0)
+            )
+            self.prefetcher = Prefetcher(
+                self.fetch_page,
+                workers,
+                int(self.config.get("S3_PREFETCH_MAX_BYTES") or 67108864),
             )
+            statistics_files = self.prefetcher.iterate(
+                statistics_files, self.prefetch_objects
+            )
+        try:
+            self.store_statistics_files(statistics_files)
+            self.merge_staging()
+        finally:
+            if self.prefetcher is not None:
+                self.prefetcher.close()
+                self.prefetcher = None
+            if self.parser is not None:
+                self.parser.close()
+                self.parser = None
+            self.page_parsers.clear()
+            self.bid_sources.clear()
 
-    def fetch_main_using_type_folder(self, dong_prefix: str) -> None:
-        for response in self.s3_client.get_objects(dong_prefix, Delimiter="/"):
-            prefixes = response.common_prefixes
-            if not prefixes:
-                raise InfocareStoreS3NotFound("not found main using list")
-            for main_using_prefix in prefixes:
-                self.fetch_sub_using_type_folder(main_using_prefix["Prefix"])
+    def store_statistics_files(
+        self, statistics_files: typing.Iterable[StatisticsFile]
+    ) -> None:
+        """
+        통계 페이지를 ``STORE_BATCH_SIZE`` 개씩 한 세션, 한 번의 커밋으로
+        저장합니다. 묶음 저장에 실패하면 롤백하고 페이지마다 다시 저장합니다.
+
+        """
+        # 0 이면 통계 페이지마다 커밋합니다.
+        batch_size = max(int(self.config.get("STORE_BATCH_SIZE") or 0), 1)
+        batch: typing.List[StatisticsFile] = []
+        try:
+            for statistics_file in statistics_files:
+                batch.append(statistics_file)
+                if len(batch) >= batch_size:
+                    self.store_batch(batch)
+                    batch = []
+            if batch:
+                self.store_batch(batch)
+        finally:
+            if self.session is not None:
+                self.rollback_unit_of_work()
+
+    def store_batch(self, batch: typing.List[StatisticsFile]) -> None:
+        self.begin_unit_of_work()
+        try:
+            self.fetch_statistics_files(batch)
+            self.commit_unit_of_work()
+        except Exception as e:
+            self.rollback_unit_of_work()
+            self.retry_statistics_files(batch, e)
 
-    def fetch_sub_using_type_folder(self, main_using_prefix: str) -> None:
-        for response in self.s3_client.get_objects(
-            main_using_prefix, Delimiter="/"
+    def retry_statistics_files(
+        self, batch: typing.List[StatisticsFile], error: Exception
+    ) -> None:
+        logger.warning(
+            "Store batch failed, retrying page by page",
+            pages=len(batch),
+            exc_info=error,
+        )
+        for statistics_file in batch:
+            self.begin_unit_of_work()
+            try:
+                self.fetch_statistics_files([statistics_file])
+                self.commit_unit_of_work()
+            except Exception:
+                self.rollback_unit_of_work()
+                # 다음 실행은 이 페이지부터 다시 저장합니다.
+                # 낙찰사례 페이지는 다른 통계 페이지와 함께 쓰므로
+                # 통계 페이지만 실패로 기록합니다.
+                self.record_ledger([statistics_file.statistics], ledger.FAILED)
+                raise
+
+    def fetch_statistics_files(
+        self, batch: typing.List[StatisticsFile]
+    ) -> None:
+        # 작업 단위의 통계 페이지를 먼저 읽어 없는 지역을 한 번에 만듭니다.
+        statistics = [self.get_statistics(x.statistics.key) for x in batch]
+        self.store_regions(statistics)
+        for statistics_file, data in zip(batch, statistics):
+            self.fetch_statistics_file(statistics_file, data)
+
+    def fetch_statistics_file(
+        self, statistics_file: StatisticsFile, statistics: Statistics
+    ) -> None:
+        # 통계 파일 하나를 프로파일링 작업 단위로 봅니다.
+        with self.profiler.task():
+            self.store_statistics_file(statistics_file, statistics)
+            # 데이터와 같은 트랜잭션에서 기록합니다.
+            self.record_ledger(statistics_file.objects, ledger.STORED)
+
+    def prefetch_objects(
+        self, statistics_file: StatisticsFile
+    ) -> typing.List[S3Object]:
+        self.page_parsers[statistics_file.statistics.key] = parse_statistics
+        for bid in statistics_file.bids:
+            self.page_parsers[bid.key] = (
+                parse_bid_split if bid.key.endswith(BID_SPLIT_SUFFIX)
+                else parse_bid_list
+            )
+
+        # 레코드로 적재하는 페이지는 받지 않습니다.
+        records = self.records
+        if records is None:
+            return statistics_file.objects
+        return [
+            x for x in statistics_file.objects
+            if self.record_key(x.key) not in records.statistics
+            and self.record_key(x.key) not in records.bids
+        ]
+
+    def list_data_folder(self, log_id_prefix: str) -> PrefixTree:
+        # 실행 폴더의 data/ 아래를 구분자 없이 한 번에 받아 폴더 구조로 만듭니다.
+        data_prefix = log_id_prefix + "data/"
+        data_folder = PrefixTree()
+        for response in self.get_objects(data_prefix):
+            for content in response.contents or []:
+                data_folder.add(
+                    content["Key"][len(data_prefix):],
+                    S3Object(
+                        content["Key"],
+                        int(content.get("Size", 0)),
+                        content.get("ETag", ""),
+                    ),
+                )
+        return data_folder
+
+    @staticmethod
+    def match_region_folders(
+        folder: PrefixTree, pattern: str, region: str
+    ) -> typing.List[PrefixTree]:
+        if not folder.folders:
+            raise InfocareStoreS3NotFound(f"not found {region} region list")
+        matched = [
+            region_folder
+            for name, region_folder in folder.folders.items()
+            if re.search(pattern, name.strip())
+        ]
+        if not matched:
+            raise InfocareStoreRegionNotFound(f"not found {region}({pattern})")
+        return matched
+
+    def list_sido_region_folder(
+        self, log_id_prefix: str
+    ) -> typing.Iterator[StatisticsFile]:
+        data_folder = self.list_data_folder(log_id_prefix)
+        for sido_folder in self.match_region_folders(
+            data_folder, self.region_level_1, "sido"
         ):
-            prefixes = response.common_prefixes
-            if not prefixes:
+            for gugun_folder in self.match_region_folders(
+                sido_folder, self.region_level_2, "gugun"
+            ):
+                for dong_folder in self.match_region_folders(
+                    gugun_folder, self.region_level_3, "dong"
+                ):
+                    yield from self.list_using_type_folder(dong_folder)
+
+    def list_using_type_folder(
+        self, dong_folder: PrefixTree
+    ) -> typing.Iterator[StatisticsFile]:
+        if not dong_folder.folders:
+            raise InfocareStoreS3NotFound("not found main using list")
+        for main_using_folder in dong_folder.folders.values():
+            if not main_using_folder.folders:
                 raise InfocareStoreS3NotFound("not found sub using list")
-            for sub_using_prefix in prefixes:
-                self.fetch_statistics_folder(sub_using_prefix["Prefix"])
+            for sub_using_folder in main_using_folder.folders.values():
+                if not sub_using_folder.objects:
+                    raise InfocareStoreS3NotFound("not found statistics data")
+                # 통계 폴더 아래의 폴더는 낙찰사례 폴더입니다.
+                bids: typing.List[S3Object] = []
+                for bid_folder in sub_using_folder.folders.values():
+                    if not bid_folder.objects:
+                        raise InfocareStoreS3NotFound("not found bid data")
+                    bids += bid_folder.objects
+                for statistics in sub_using_folder.objects:
+                    yield StatisticsFile(statistics, bids)
 
-    def fetch_statistics_folder(self, sub_using_prefix: str) -> None:
+    def store_statistics_file(
+        self, statistics_file: StatisticsFile, statistics: Statistics
+    ) -> None:
         """
         인포케어 통계 html 파일에는 선택된 시도, 시군구, 동읍면에 대한 통계가 드롭다운형식으로
         저장되어있음. 해당 드롭다운의 인덱스를 활용하여 중복데이터 저장을 방지합니다.
@@ -211,157 +784,100 @@ class InfocareStore(object):
 
         위의 2가지 케이스에 해당하지 않으면 동읍면 통계만 저장합니다.
         """
+        db_sido_id, db_gugun_id, db_dong_id = self.regions.resolve(
+            statistics.sido_name, statistics.gugun_name, statistics.dong_name
+        )
 
-        for response in self.s3_client.get_objects(
-            sub_using_prefix, Delimiter="/"
+        # 시,도 통계 저장
+        if (
+            statistics.first_gugun_name == statistics.gugun_name
+            and statistics.first_dong_name == statistics.dong_name
         ):
-            contents = response.contents
-            prefixes = response.common_prefixes
-            if not contents:
-                raise InfocareStoreS3NotFound("not found statistics data")
-            for content in contents:
-                file_prefix = content["Key"]
-                s3_response = self.s3_client.get_object(file_prefix)
-                statistics_data = s3_response.body.read().decode("utf-8")
-                statistics = InfocareStatisticResponse.from_html(
-                    statistics_data
-                )
+            self.store_statistics_data(
+                statistics,
+                db_sido_id=db_sido_id,
+            )
+        # 시,군,구 통계 저장
+        if statistics.first_dong_name == statistics.dong_name:
+            self.store_statistics_data(
+                statistics,
+                db_gugun_id=db_gugun_id,
+            )
+        # 읍,면,동 통계 저장
+        self.store_statistics_data(
+            statistics,
+            db_dong_id=db_dong_id,
+        )
 
-                # 시,도 통계 저장
-                if (
-                    statistics.first_gugun_name == statistics.gugun_name
-                    and statistics.first_dong_name == statistics.dong_name
-                ):
-                    db_sido_id = self.store_sido_region(statistics.sido_name)
-                    self.store_statistics_data(
-                        statistics,
-                        db_sido_id=db_sido_id,
-                    )
-                    # sido id 캐싱
-                    self.competed_sido_ids.update(
-                        {statistics.sido_name: db_sido_id}
-                    )
-                # 시,군,구 통계 저장
-                if statistics.first_dong_name == statistics.dong_name:
-                    sido_name = statistics.sido_name
-                    db_sido_id = self.competed_sido_ids[sido_name]
-                    db_gugun_id = self.store_gugun_region(
-                        statistics.gugun_name, db_sido_id
-                    )
-                    self.store_statistics_data(
-                        statistics,
-                        db_gugun_id=db_gugun_id,
-                    )
-                    # gugun id 캐싱
-                    self.completed_gugun_ids.update(
-                        {statistics.gugun_name: db_gugun_id}
-                    )
-                # 읍,면,동 통계 저장
-                gugun_name = statistics.gugun_name
-                db_gugun_id = self.completed_gugun_ids[gugun_name]
-                db_dong_id = self.store_dong_region(
-                    statistics.dong_name, db_gugun_id
-                )
-                self.store_statistics_data(
-                    statistics,
-                    db_dong_id=db_dong_id,
-                )
+        if statistics_file.bids:  # 낙찰사례 페이지 저장
+            for bid in statistics_file.bids:
+                self.fetch_bid_file(bid.key, statistics, db_dong_id)
+        else:  # 해당 동에 대한 낙찰사례가 없는경우 전에 있던 낙찰사례를 만료시킴
+            self.store_bid_expired_check(
+                statistics_data=statistics,
+                db_dong_id=db_dong_id,
+                bid_list=[],
+            )
 
-                if prefixes:  # 낙찰사례 페이지 저장
-                    for bid_prefix in prefixes:
-                        self.fetch_bid_folder(
-                            bid_prefix["Prefix"], statistics, db_dong_id
-                        )
-                else:  # 해당 동에 대한 낙찰사례가 없는경우 전에 있던 낙찰사례를 만료시킴
-                    self.store_bid_expired_check(
-                        statistics_data=statistics,
-                        db_dong_id=db_dong_id,
-                        bid_list=[],
-                    )
-
-    def fetch_bid_folder(
+    def fetch_bid_file(
         self,
-        bid_prefix: str,
-        statistics_data: InfocareStatisticResponse,
+        key: str,
+        statistics_data: Statistics,
         db_dong_id: int,
     ) -> None:  # 낙찰사례 페이지일 경우,
-        for response in self.s3_client.get_objects(bid_prefix, Delimiter="/"):
-            contents = response.contents
-            if not contents:
-                raise InfocareStoreS3NotFound("not found bid data")
-            for content in contents:
-                file_prefix = content["Key"]
-                s3_response = self.s3_client.get_object(file_prefix)
-                bid_data = s3_response.body.read().decode("utf-8")
-                bid_response = InfocareBidResponse.from_html(bid_data)
-                bid_list = bid_response.infocare_bid_list
-                self.store_bid_expired_check(
-                    bid_list=bid_list,
-                    statistics_data=statistics_data,
-                    db_dong_id=db_dong_id,
-                )  # 해당 동에 대한 낙찰사례를 순회하며 만료시킴
-                self.store_bid_data(bid_list, statistics_data, db_dong_id)
-
-    def store_sido_region(self, sido_name: str) -> int:
-        session = self.session_factory()
-        try:
-            db_sido = InfocareSido.create_or_update(session, sido_name)
-            db_sido_id = db_sido.id
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
-
-        return db_sido_id
+        bid_list = self.get_bid_list(key)
+        self.store_bid_expired_check(
+            bid_list=bid_list,
+            statistics_data=statistics_data,
+            db_dong_id=db_dong_id,
+        )  # 해당 동에 대한 낙찰사례를 순회하며 만료시킴
+        self.store_bid_data(bid_list, statistics_data, db_dong_id)
 
-    def store_gugun_region(self, gugun_name: str, db_sido_id: int) -> int:
-        session = self.session_factory()
-        try:
-            db_gugun = InfocareGugun.create_or_update(
-                session, gugun_name, db_sido_id
+    @stage("store_regions")
+    def store_regions(self, statistics: typing.List[Statistics]) -> None:
+        # 저장된 지역은 메모리에서 찾고 없는 지역만 만듭니다.
+        with self.use_session() as session:
+            count = self.regions.create_missing(
+                session,
+                [(x.sido_name, x.gugun_name, x.dong_name) for x in statistics],
             )
-            db_gugun_id = db_gugun.id
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
-
-        return db_gugun_id
-
-    def store_dong_region(self, dong_name: str, db_gugun_id: int) -> int:
-        session = self.session_factory()
-        try:
-            db_dong = InfocareDong.create_or_update(
-                session, dong_name, db_gugun_id
-            )
-            db_dong_id = db_dong.id
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
-
-        return db_dong_id
+        if count:
+            logger.info("Create Regions", regions=count)
 
+    @stage("store_statistics_data")
     def store_statistics_data(
         self,
-        data: InfocareStatisticResponse,
+        data: Statistics,
         *,
         db_sido_id: typing.Optional[int] = None,
         db_gugun_id: typing.Optional[int] = None,
         db_dong_id: typing.Optional[int] = None,
     ) -> None:
-        session = self.session_factory()
+        if self.staging is not None or self.statistics_writer is not None:
+            row = statistics_row(
+                data,
+                MAIN_USAGE_TYPE[data.main_usage_type],
+                db_sido_id=db_sido_id,
+                db_gugun_id=db_gugun_id,
+                db_dong_id=db_dong_id,
+            )
+            if row is None:
+                return
+            if self.staging is not None:
+                self.staging.add_statistics(row)
+                return
+            assert self.statistics_writer is not None
+            with self.use_session() as session:
+                self.progress.rows_upserted += (
+                    self.statistics_writer.add(session, row)
+                )
+            return
+
         # Store sido statistics
         if db_sido_id:
             if data.sido_year_bid_count == 0:
                 return
-            try:
+            with self.use_session() as session:
                 InfocareStatistics.create_or_update(
                     session,
                     data.start_date,
@@ -381,19 +897,14 @@ class InfocareStore(object):
                     db_gugun_id,
                     db_dong_id,
                 )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
+            self.progress.rows_upserted += 1
             logger.info("Store Sido Statistics", sido=data.sido_name)
 
         # Store gugun statistics
         elif db_gugun_id:
             if data.gugun_year_bid_count == 0:
                 return
-            try:
+            with self.use_session() as session:
                 InfocareStatistics.create_or_update(
                     session,
                     data.start_date,
@@ -413,12 +924,7 @@ class InfocareStore(object):
                     db_gugun_id,
                     db_dong_id,
                 )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
+            self.progress.rows_upserted += 1
             logger.info(
                 "Store Gugun Statistics",
                 sido=data.sido_name,
@@ -429,7 +935,7 @@ class InfocareStore(object):
         elif db_dong_id:
             if data.dongli_year_bid_count == 0:
                 return
-            try:
+            with self.use_session() as session:
                 InfocareStatistics.create_or_update(
                     session,
                     data.start_date,
@@ -449,12 +955,7 @@ class InfocareStore(object):
                     db_gugun_id,
                     db_dong_id,
                 )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
+            self.progress.rows_upserted += 1
             logger.info(
                 "Store Dong Statistics",
                 sido=data.sido_name,
@@ -462,15 +963,31 @@ class InfocareStore(object):
                 dong=data.dong_name,
             )
 
+    @stage("store_bid_data")
     def store_bid_data(
         self,
-        bid_list: typing.List[InfocareBid],
-        statistics_data: InfocareStatisticResponse,
+        bid_list: BidList,
+        statistics_data: Statistics,
         db_dong_id: int,
     ) -> None:
+        if self.staging is not None:
+            main_usage_type = MAIN_USAGE_TYPE[statistics_data.main_usage_type]
+            self.staging.add_bids(
+                bid_row(
+                    bid,
+                    main_usage_type,
+                    statistics_data.sub_usage_type,
+                    db_dong_id,
+                )
+                for bid in bid_list
+            )
+            return
+        if self.bulk_upsert:
+            self.upsert_bid_data(bid_list, statistics_data, db_dong_id)
+            return
+
         for bid in bid_list:
-            session = self.session_factory()
-            try:
+            with self.use_session() as session:
                 InfocareBid.create_or_update(
                     session,
                     bid.case_number,
@@ -484,55 +1001,93 @@ class InfocareStore(object):
                     bid.success_bid_rate,
                     db_dong_id,
                 )
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
-            finally:
-                session.close()
+            self.progress.rows_upserted += 1
             logger.info("Store Bid Statistics", bid=bid.address)
 
+    def upsert_bid_data(
+        self,
+        bid_list: BidList,
+        statistics_data: Statistics,
+        db_dong_id: int,
+    ) -> None:
+        main_usage_type = MAIN_USAGE_TYPE[statistics_data.main_usage_type]
+        with self.use_session() as session:
+            counts = upsert_bids(session, [
+                bid_row(
+                    bid,
+                    main_usage_type,
+                    statistics_data.sub_usage_type,
+                    db_dong_id,
+                )
+                for bid in bid_list
+            ])
+
+        self.progress.rows_upserted += counts.inserted + counts.updated
+        logger.info(
+            "Store Bid Statistics",
+            dong=statistics_data.dong_name,
+            inserted=counts.inserted,
+            updated=counts.updated,
+            unchanged=counts.unchanged,
+        )
+
+    @stage("store_bid_expired_check")
     def store_bid_expired_check(
         self,
         *,
-        statistics_data: InfocareStatisticResponse,
+        statistics_data: Statistics,
         db_dong_id: int,
-        bid_list: typing.List[InfocareBid],
+        bid_list: BidList,
     ) -> None:
-        session = self.session_factory()
+        # 같은 동, 같은 용도의 만료되지 않은 낙찰사례 중
+        # 이번에 받은 목록에 없는 사례를 한 문장으로 만료시킵니다.
+        main_usage_type = MAIN_USAGE_TYPE[statistics_data.main_usage_type]
+        if self.staging is not None:
+            # 스테이징 테이블을 합칠 때 한 번에 만료시킵니다.
+            self.staging.add_scope(
+                db_dong_id, main_usage_type, statistics_data.sub_usage_type
+            )
+            return
 
-        try:
-            db_bid_list = (
-                session.query(InfocareBid)
-                .filter(
-                    InfocareBid.infocare_dong_id == db_dong_id,
-                    InfocareBid.expired_date.is_(None),
-                )
-                .all()
+        statement = expire_bids(
+            db_dong_id,
+            main_usage_type,
+            statistics_data.sub_usage_type,
+            [
+                (bid.bid_date.date(), bid.case_number, bid.address)
+                for bid in bid_list
+            ],
+            self.storing_date,
+        )
+        with self.use_session() as session:
+            expired_count = session.execute(statement).rowcount
+
+        if expired_count:
+            logger.info(
+                "Expire Bid Statistics",
+                dong=statistics_data.dong_name,
+                expired=expired_count,
             )
 
-            for db_bid in db_bid_list:
-                expired_check = True
-                if bid_list:
-                    for bid in bid_list:
-                        if (
-                            db_bid.bid_date == bid.bid_date.date()
-                            and db_bid.case_number == bid.case_number
-                            and db_bid.address == bid.address
-                            and db_bid.main_usage_type.name
-                            == MAIN_USAGE_TYPE[statistics_data.main_usage_type]
-                            and db_bid.sub_usage_type
-                            == statistics_data.sub_usage_type
-                        ):
-                            expired_check = False
-
-                if expired_check:  # db에 저장된 해당 데이터가 만료되었으면
-                    InfocareBid.update_expired_date(
-                        session, db_bid, self.storing_date
-                    )
-                    session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+    def upload_profile(self) -> None:
+        if not self.profiler.enabled or self.log_id_prefix is None:
+            return
+
+        folder_name = f"{self.log_id_prefix}store-profile"
+        name = str(timestamp(self.storing_date))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for file_name in self.profiler.dump(temp_dir, name):
+                self.s3_client.upload_any_file(
+                    folder_name=folder_name,
+                    file_name=file_name,
+                    file_path=os.path.join(temp_dir, file_name),
+                    mime_type="application/octet-stream",
+                    mode="rb",
+                )
+
+        self.s3_client.upload_json(
+            folder_name=folder_name,
+            file_name=f"{name}-summary.json",
+            data=self.profiler.summary(),
+        )
@@ -4,27 +4,34 @@ import typing
 
 import attr
 import click
-import psutil
 import structlog
-from apscheduler.schedulers.background import BackgroundScheduler
-from crawler.aws_client import CloudWatchClient
-from dotenv import load_dotenv, find_dotenv
-from tanker.utils.logging import setup_logging
 import infocare_store.config
-from infocare_store.store import InfocareStore
-import sentry_sdk
-from sentry_sdk.integrations.logging import LoggingIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+from infocare_store.metrics import StoreProgress
+from crawler.cloudwatch_metrics import put_metrics
+from crawler.profiling import PROFILE_MODES, create_profiler
+
+if typing.TYPE_CHECKING:
+    import psutil
+    from crawler.aws_client import CloudWatchClient
 
 logger = structlog.get_logger(__name__)
 
+#: Sentry span 으로 남기는 단계. 페이지마다 열리는 단계는 넣지 않습니다.
+TRACING_SPAN_STAGES = (
+    "load_regions",
+    "merge_staging",
+)
+
 
-try:
-    if not os.path.exists("./.env"):
-        raise ValueError
-    load_dotenv(find_dotenv(".env"), override=False, encoding="utf-8")
-except (IOError, ValueError):
-    load_dotenv(find_dotenv(".env.sample"), override=False)
+def _load_dotenv() -> None:
+    from dotenv import load_dotenv, find_dotenv
+
+    try:
+        if not os.path.exists("./.env"):
+            raise ValueError
+        load_dotenv(find_dotenv(".env"), override=False, encoding="utf-8")
+    except (IOError, ValueError):
+        load_dotenv(find_dotenv(".env.sample"), override=False)
 
 
 @attr.s
@@ -32,12 +39,28 @@ class Context(object):
     config: typing.Dict[str, typing.Any] = attr.ib()
 
 
-def init_runner(context: Context, run_by: str) -> typing.Callable:
+def init_runner(
+    context: Context,
+    run_by: str,
+    profile: typing.Optional[str] = None,
+    profile_every: int = 1,
+    progress: typing.Optional[StoreProgress] = None,
+) -> typing.Callable:
+    # 무거운 모듈은 실제로 적재를 돌리는 명령에서만 불러옵니다.
+    import sentry_sdk
+    from sentry_sdk.integrations.logging import LoggingIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+    from tanker.utils.logging import setup_logging
+    from infocare_store.store import InfocareStore
+
     setup_logging(context.config["DEBUG"])
 
     sentry_sdk.init(
         dsn=context.config.get("SENTRY_DSN"),
         environment=context.config["ENVIRONMENT"],
+        traces_sample_rate=float(
+            context.config.get("TRACES_SAMPLE_RATE") or 0
+        ),
         integrations=[
             SqlalchemyIntegration(),
             # Disable default-integrated log integration
@@ -46,8 +69,17 @@ def init_runner(context: Context, run_by: str) -> typing.Callable:
     )
 
     def runner() -> None:
-        store = InfocareStore(context.config)
-        store.run(run_by)
+        profiler = create_profiler(profile, profile_every)
+        if float(context.config.get("TRACES_SAMPLE_RATE") or 0) > 0:
+            from crawler.tracing import TracingProfiler
+
+            profiler = TracingProfiler(profiler, TRACING_SPAN_STAGES)
+        store = InfocareStore(context.config, profiler, progress)
+        try:
+            with profiler.profile():
+                store.run(run_by)
+        finally:
+            store.upload_profile()
 
     return runner
 
@@ -56,6 +88,7 @@ def init_runner(context: Context, run_by: str) -> typing.Callable:
 @click.pass_context
 def cli(ctx: typing.Any) -> None:
     ctx.obj = {}
+    _load_dotenv()
     config = infocare_store.config.load()
 
     ctx.obj["context"] = Context(config=config,)
@@ -94,27 +127,71 @@ def shell(ctx: typing.Any, no_ipython: typing.Any) -> None:
 
 
 @cli.command()
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile the run and upload the result to the crawler run folder.",
+)
+@click.option(
+    "--profile-every",
+    default=1,
+    show_default=True,
+    help="Profile only every Nth statistics file to keep the overhead low.",
+)
 @click.pass_context
-def run(ctx: typing.Any) -> None:
+def run(
+    ctx: typing.Any, profile: typing.Optional[str], profile_every: int
+) -> None:
     context: Context = ctx.obj["context"]
 
-    runner = init_runner(context, "DEVELOPER")
+    runner = init_runner(context, "DEVELOPER", profile, profile_every)
 
     runner()
 
 
+@cli.command()
+@click.option("--limit", default=10, show_default=True)
+@click.pass_context
+def runs(ctx: typing.Any, limit: int) -> None:
+    """
+    List recent completed crawler runs from the run index.
+
+    """
+    from infocare_store.store import InfocareStore
+
+    context: Context = ctx.obj["context"]
+
+    store = InfocareStore(context.config)
+    for crawler_run in reversed(store.load_runs()[-limit:]):
+        log = crawler_run.log
+        minutes = (log.finish_time_stamp - log.time_stamp) / 60
+        click.echo(
+            f"{log.time_stamp:.0f} {log.run_by:<10} {minutes:>7.1f}m"
+            f" regions={log.total_statistics.region_count}"
+            f" statistics={log.total_statistics.statistics_count}"
+            f" bids={log.total_statistics.bids_count}"
+            f"  {crawler_run.prefix}"
+        )
+
+
 # scheduled tasks로 돌릴 때 사용하는 함수이고, cloudwatch 로그를 찍습니다.
 @cli.command()
 @click.pass_context
 def run_scheduler(ctx: typing.Any) -> None:
+    import psutil
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from crawler.aws_client import CloudWatchClient
+
     context: Context = ctx.obj["context"]
 
     cloudwatch = CloudWatchClient(context.config)
+    progress = StoreProgress()
 
     scheduler = BackgroundScheduler()
     scheduler.add_job(
         _run_cloudwatch_log,
-        args=[cloudwatch],
+        args=[cloudwatch, psutil.Process(), progress],
         id="cloudwatch_log",
         name="cloudwatch_log",
         trigger="cron",
@@ -123,31 +200,29 @@ def run_scheduler(ctx: typing.Any) -> None:
 
     scheduler.start()
 
-    runner = init_runner(context, "SCHEDULER")
+    runner = init_runner(context, "SCHEDULER", progress=progress)
 
     runner()
 
     scheduler.remove_job("cloudwatch_log")
 
 
-def _run_cloudwatch_log(client: CloudWatchClient) -> None:
+def _run_cloudwatch_log(
+    client: "CloudWatchClient",
+    process: "psutil.Process",
+    progress: StoreProgress,
+) -> None:
     try:
-        client.put_metric(
-            "InfocareStore",
-            client.get_metric_data(
-                "InfocareStoreHardwareUsage",
-                "store_cpu",
-                psutil.cpu_percent(),
-            ),
-        )
-        client.put_metric(
-            "InfocareStore",
-            client.get_metric_data(
-                "InfocareStoreHardwareUsage",
-                "store_ram",
-                psutil.virtual_memory().percent,
-            ),
-        )
+        # 호스트 전체가 아닌 store 프로세스의 사용량을 보냅니다.
+        metrics = {
+            "store_cpu": process.cpu_percent(),
+            "store_ram": process.memory_percent(),
+            "store_rss_bytes": process.memory_info().rss,
+        }
+        put_metrics(client, "InfocareStore", {
+            "InfocareStoreHardwareUsage": metrics,
+            "InfocareStoreProgress": progress.collect(),
+        })
     except Exception as e:
         logger.error("Exception while cloudwatch scheduler", exc_info=e)
 
@@ -0,0 +1,216 @@
+import datetime
+import os
+import re
+import types
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from infocare_store.store.bulk import BID_KEY_COLUMNS, BID_VALUE_COLUMNS, \
+    BidCounts, InfocareBid, InfocareStatistics, STATISTICS_KEY_COLUMNS, \
+    STATISTICS_VALUE_COLUMNS, StatisticsWriter, bid_row, expire_bids, \
+    on_bid_conflict, on_statistics_conflict, statistics_row, upsert_bids
+
+MIGRATION_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.pardir, "infocare_store", "migrations",
+)
+
+
+class FakeSession(object):
+    def __init__(self, result=()):
+        self.result = list(result)
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return self.result
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def index_columns(file_name: str) -> str:
+    # 마이그레이션의 CREATE UNIQUE INDEX ... ON table (...) 의 컬럼 목록
+    with open(os.path.join(MIGRATION_DIR, file_name), encoding="utf-8") as f:
+        sql = f.read()
+    columns = re.search(r"\bON \w+ \((.*?)\);", sql, re.S)[1]
+    return ", ".join(x.strip() for x in columns.split(",\n"))
+
+
+def make_statistics_row(sub_usage_type="아파트", dong_id=1, value=1.0):
+    row = dict.fromkeys(STATISTICS_KEY_COLUMNS)
+    row.update(
+        start_date=datetime.date(2019, 9, 1),
+        end_date=datetime.date(2020, 8, 31),
+        main_usage_type="집합건물",
+        sub_usage_type=sub_usage_type,
+        infocare_dong_id=dong_id,
+    )
+    row.update(dict.fromkeys(STATISTICS_VALUE_COLUMNS, value))
+    return row
+
+
+def make_bid_row(case_number="2020타경1", price=100):
+    return {
+        "case_number": case_number,
+        "bid_date": datetime.date(2020, 1, 1),
+        "address": "서울 강남구 개포동 1-1",
+        "main_usage_type": "집합건물",
+        "sub_usage_type": "아파트",
+        "estimated_price": price,
+        "lowest_price": price,
+        "success_price": price,
+        "success_bid_rate": 1.0,
+        "infocare_dong_id": 1,
+    }
+
+
+def test_statistics_row():
+    data = types.SimpleNamespace(
+        start_date=datetime.date(2019, 9, 1),
+        end_date=datetime.date(2020, 8, 31),
+        sub_usage_type="아파트",
+        sido_year_bid_count=0,
+        **{f"dongli_{name}": 3 for name in STATISTICS_VALUE_COLUMNS},
+    )
+
+    assert statistics_row(data, "집합건물") is None
+    assert statistics_row(data, "집합건물", db_sido_id=1) is None
+
+    row = statistics_row(data, "집합건물", db_dong_id=7)
+    assert row == make_statistics_row(dong_id=7, value=3)
+
+
+def test_statistics_writer_keeps_last_row_of_key():
+    session = FakeSession()
+    writer = StatisticsWriter(batch_size=2)
+
+    assert writer.add(session, make_statistics_row(value=1.0)) == 0
+    assert writer.add(session, make_statistics_row(value=2.0)) == 0
+    assert session.statements == []
+
+    assert writer.add(session, make_statistics_row("오피스텔")) == 2
+    assert len(session.statements) == 1
+    params = session.statements[0].compile(
+        dialect=postgresql.dialect()
+    ).params
+    assert params["year_avg_price_rate_m0"] == 2.0
+    assert params["sub_usage_type_m1"] == "오피스텔"
+    assert "sub_usage_type_m2" not in params
+
+    assert writer.flush(session) == 0
+    assert len(session.statements) == 1
+
+
+def test_statistics_writer_discard():
+    session = FakeSession()
+    writer = StatisticsWriter(batch_size=10)
+    writer.add(session, make_statistics_row())
+
+    writer.discard()
+
+    assert writer.flush(session) == 0
+    assert session.statements == []
+
+
+def test_statistics_conflict_matches_index():
+    sql = compile_sql(on_statistics_conflict(
+        postgresql.insert(InfocareStatistics.__table__)
+        .values([make_statistics_row()])
+    ))
+
+    columns = index_columns("0001_infocare_statistics_natural_key.sql")
+    assert f"ON CONFLICT ({columns})" in sql
+    assert "coalesce(infocare_sido_id, 0)" in sql
+    for name in STATISTICS_VALUE_COLUMNS:
+        assert f"{name} = excluded.{name}" in sql
+
+
+def test_bid_conflict_matches_index():
+    sql = compile_sql(on_bid_conflict(
+        postgresql.insert(InfocareBid.__table__).values([make_bid_row()])
+    ))
+
+    columns = index_columns("0002_infocare_bid_natural_key.sql")
+    assert f"ON CONFLICT ({columns})" in sql
+    assert ", ".join(BID_KEY_COLUMNS) in sql
+    # 값이 같은 행은 갱신하지 않습니다.
+    assert (
+        "WHERE ("
+        + ", ".join(f"infocare_bid.{x}" for x in BID_VALUE_COLUMNS)
+        + ") IS DISTINCT FROM ("
+        + ", ".join(f"excluded.{x}" for x in BID_VALUE_COLUMNS)
+        + ")"
+    ) in sql
+
+
+def test_bid_row():
+    bid = types.SimpleNamespace(
+        case_number="2020타경1",
+        bid_date=datetime.datetime(2020, 1, 1),
+        address="서울 강남구 개포동 1-1",
+        estimated_price=100,
+        lowest_price=100,
+        success_price=100,
+        success_bid_rate=1.0,
+    )
+
+    assert bid_row(bid, "집합건물", "아파트", 1) == make_bid_row()
+
+
+def test_upsert_bids():
+    session = FakeSession([
+        types.SimpleNamespace(inserted=True),
+        types.SimpleNamespace(inserted=False),
+    ])
+
+    counts = upsert_bids(session, [
+        make_bid_row("2020타경1", price=100),
+        make_bid_row("2020타경1", price=200),
+        make_bid_row("2020타경2"),
+        make_bid_row("2020타경3"),
+    ])
+
+    assert counts == BidCounts(inserted=1, updated=1, unchanged=1)
+    statement = session.statements[0].compile(dialect=postgresql.dialect())
+    assert str(statement).endswith("RETURNING xmax = 0 AS inserted")
+    assert statement.params["estimated_price_m0"] == 200
+    assert "case_number_m3" not in statement.params
+
+
+def test_upsert_bids_without_rows():
+    session = FakeSession()
+
+    assert upsert_bids(session, []) == BidCounts()
+    assert session.statements == []
+
+
+@pytest.mark.parametrize("keys", [
+    [(datetime.date(2020, 1, 1), "2020타경1", "서울 강남구 개포동 1-1")],
+    [],
+])
+def test_expire_bids(keys):
+    expired_date = datetime.datetime(2020, 9, 1)
+    statement = expire_bids(1, "집합건물", "아파트", keys, expired_date)
+    compiled = statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert sql.startswith("UPDATE infocare_bid SET expired_date=")
+    assert "infocare_bid.infocare_dong_id = " in sql
+    assert "infocare_bid.main_usage_type = " in sql
+    assert "infocare_bid.sub_usage_type = " in sql
+    assert "infocare_bid.expired_date IS NULL" in sql
+    assert compiled.params["expired_date"] == expired_date
+
+    not_in = (
+        "(infocare_bid.bid_date, infocare_bid.case_number,"
+        " infocare_bid.address) NOT IN "
+    )
+    if keys:
+        assert not_in in sql
+        assert set(keys[0]) <= set(compiled.params.values())
+    else:
+        # 받은 사례가 없으면 만료되지 않은 사례를 모두 만료시킵니다.
+        assert not_in not in sql
@@ -0,0 +1,35 @@
+from infocare_store.store.data import PrefixTree, S3Object
+
+
+def test_prefix_tree():
+    tree = PrefixTree()
+    objects = {
+        key: S3Object(key)
+        for key in [
+            "2020/09/01/1600000000.0/",
+            "2020/09/01/1600000000.0/crawler-log.json",
+            "2020/09/01/1600000000.0/서울/강남구/statistics.html",
+            "2020/09/01/1600000000.0/서울/강남구/bid/a_bid.html",
+            "2020/09/01/1600000000.0/서울/강남구/bid/b_bid.html",
+            "top.json",
+        ]
+    }
+    for key, s3_object in objects.items():
+        tree.add(key, s3_object)
+
+    assert tree.objects == [objects["top.json"]]
+    run = tree.folders["2020"].folders["09"].folders["01"].folders[
+        "1600000000.0"
+    ]
+    # 폴더 표시용 객체는 넣지 않습니다.
+    assert run.objects == [
+        objects["2020/09/01/1600000000.0/crawler-log.json"],
+    ]
+    sigungu = run.folders["서울"].folders["강남구"]
+    assert sigungu.objects == [
+        objects["2020/09/01/1600000000.0/서울/강남구/statistics.html"],
+    ]
+    assert [x.key for x in sigungu.folders["bid"].objects] == [
+        "2020/09/01/1600000000.0/서울/강남구/bid/a_bid.html",
+        "2020/09/01/1600000000.0/서울/강남구/bid/b_bid.html",
+    ]
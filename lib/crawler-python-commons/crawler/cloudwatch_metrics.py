@@ -0,0 +1,56 @@
+"""
+cloudwatch_metrics
+==================
+
+crawler, store 의 ``run_scheduler`` 가 1분마다 보내는 메트릭.
+
+1분 동안의 값을 CloudWatch ``PutMetricData`` 의 ``MetricData`` 목록으로 직접
+만들어 ``CloudWatchClient.put_metric`` 한 번으로 보냅니다. 값마다
+``Group`` 차원에 hardware usage, progress 같은 묶음 이름을 넣습니다.
+
+"""
+import datetime
+import typing
+
+if typing.TYPE_CHECKING:
+    from crawler.aws_client import CloudWatchClient
+
+#: 메트릭 묶음 이름을 넣는 차원
+DIMENSION_NAME = "Group"
+
+#: put_metric 한 번에 보내는 값의 최대 개수
+MAX_METRIC_DATA = 20
+
+
+def metric_data(
+    metrics: typing.Mapping[str, typing.Mapping[str, float]],
+    timestamp: datetime.datetime,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    # 같은 시각에 잰 값이므로 모두 같은 Timestamp 로 보냅니다.
+    return [
+        {
+            "MetricName": name,
+            "Dimensions": [{"Name": DIMENSION_NAME, "Value": group}],
+            "Timestamp": timestamp,
+            "Value": float(value),
+        }
+        for group, values in metrics.items()
+        for name, value in values.items()
+    ]
+
+
+def put_metrics(
+    client: "CloudWatchClient",
+    namespace: str,
+    metrics: typing.Mapping[str, typing.Mapping[str, float]],
+) -> None:
+    """
+    묶음 이름별 메트릭을 한 번에 보냅니다. 값이 ``MAX_METRIC_DATA`` 개를
+    넘을 때만 나눠서 보냅니다.
+
+    """
+    data = metric_data(
+        metrics, datetime.datetime.now(datetime.timezone.utc)
+    )
+    for start in range(0, len(data), MAX_METRIC_DATA):
+        client.put_metric(namespace, data[start:start + MAX_METRIC_DATA])
@@ -0,0 +1,124 @@
+"""
+import_time
+===========
+
+``python -X importtime manage.py`` 의 결과를 모아 CLI 시작 시간을 측정합니다.
+
+각 앱의 ``benchmarks/import_time.py`` 가 :func:`create_command` 에
+``manage.py`` 가 있는 폴더와 ``--help`` 에서 불러오면 안 되는 모듈을 넘깁니다.
+해당 모듈이 불러와지거나, 전체 import 시간이 기준치를 넘으면 실패합니다.
+
+"""
+import statistics
+import subprocess
+import sys
+import typing
+
+import click
+
+
+class ImportRecord(typing.NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> typing.List[ImportRecord]:
+    records = []
+    for line in output.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        _, columns = line.split(":", 1)
+        self_us, cumulative_us, name = columns.split("|")
+        if not self_us.strip().isdigit():
+            continue
+        # 모듈 이름 앞 공백은 1 + 2 * (import 깊이) 입니다.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append(ImportRecord(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=depth,
+        ))
+    return records
+
+
+def measure(
+        app_root: str, args: typing.Sequence[str]
+) -> typing.List[ImportRecord]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "manage.py", *args],
+        cwd=app_root,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def total_ms(records: typing.List[ImportRecord]) -> float:
+    # 최상위 import 의 누적 시간 합이 전체 import 시간입니다.
+    return sum(r.cumulative_us for r in records if r.depth == 0) / 1000
+
+
+def find_deferred(
+        records: typing.List[ImportRecord],
+        deferred_modules: typing.Sequence[str],
+) -> typing.List[str]:
+    return sorted({
+        r.module for r in records
+        for deferred in deferred_modules
+        if r.module == deferred or r.module.startswith(deferred + ".")
+    })
+
+
+def create_command(
+        app_root: str,
+        deferred_modules: typing.Sequence[str],
+        threshold_ms: float = 300.0,
+) -> click.Command:
+    @click.command()
+    @click.option("--threshold-ms", default=threshold_ms, show_default=True)
+    @click.option("--repeat", default=5, show_default=True)
+    @click.option("--top", default=15, show_default=True)
+    @click.argument("args", nargs=-1)
+    def main(
+            threshold_ms: float, repeat: int, top: int,
+            args: typing.Tuple[str, ...]
+    ) -> None:
+        args = args or ("--help",)
+        runs = [measure(app_root, args) for _ in range(repeat)]
+        totals = [total_ms(records) for records in runs]
+        median_ms = statistics.median(totals)
+        records = runs[
+            totals.index(min(totals, key=lambda t: abs(t - median_ms)))
+        ]
+
+        click.echo(f"manage.py {' '.join(args)}")
+        click.echo(
+            f"import time: median {median_ms:.1f}ms "
+            f"(min {min(totals):.1f}ms, max {max(totals):.1f}ms, "
+            f"threshold {threshold_ms:.1f}ms)"
+        )
+        click.echo(f"\n{'cumulative':>12} {'self':>10}  module")
+        for r in sorted(records, key=lambda r: -r.cumulative_us)[:top]:
+            click.echo(
+                f"{r.cumulative_us / 1000:>10.1f}ms"
+                f" {r.self_us / 1000:>8.1f}ms  {r.module}"
+            )
+
+        failed = False
+        deferred = find_deferred(records, deferred_modules)
+        if deferred:
+            failed = True
+            click.echo(f"\nFAIL: eagerly imported {', '.join(deferred)}")
+        if median_ms > threshold_ms:
+            failed = True
+            click.echo(f"\nFAIL: {median_ms:.1f}ms > {threshold_ms:.1f}ms")
+
+        sys.exit(1 if failed else 0)
+
+    return main
@@ -0,0 +1,320 @@
+"""
+profiling
+=========
+
+``manage.py run --profile=cprofile|sampling|tracemalloc`` 로 선택하는
+프로파일러입니다.
+
+``stage`` 는 단계별 소요 시간을 모으고, ``task`` 는 N 번째 작업마다
+프로파일링을 켜서 전체 실행의 오버헤드를 줄입니다.
+
+"""
+import abc
+import collections
+import contextlib
+import cProfile
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import typing
+
+import attr
+
+PROFILE_MODES = ("cprofile", "sampling", "tracemalloc")
+
+F = typing.TypeVar("F", bound=typing.Callable[..., typing.Any])
+
+
+@attr.s
+class StageSummary(object):
+    #: 호출 횟수
+    count: int = attr.ib(default=0)
+    #: 누적 소요 시간 (하위 단계 포함)
+    total_seconds: float = attr.ib(default=0.0)
+    #: 가장 오래 걸린 호출
+    max_seconds: float = attr.ib(default=0.0)
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+
+
+class Profiler(object):
+    """
+    아무것도 측정하지 않는 기본 프로파일러.
+
+    """
+
+    mode: typing.Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    @contextlib.contextmanager
+    def profile(self) -> typing.Iterator[None]:
+        yield
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> typing.Iterator[None]:
+        yield
+
+    def add_stage(self, name: str, elapsed: float) -> None:
+        pass
+
+    @contextlib.contextmanager
+    def task(self) -> typing.Iterator[None]:
+        yield
+
+    @contextlib.contextmanager
+    def transaction(self, name: str) -> typing.Iterator[None]:
+        yield
+
+    def tag(self, key: str, value: str) -> None:
+        pass
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        return {}
+
+    def dump(self, directory: str, name: str) -> typing.List[str]:
+        return []
+
+
+class TaskProfiler(Profiler, abc.ABC):
+    extension: str = ""
+
+    def __init__(self, every: int = 1) -> None:
+        super().__init__()
+        self.every = max(every, 1)
+        self.task_count = 0
+        self.sampled_task_count = 0
+        self.stages: typing.Dict[str, StageSummary] = (
+            collections.defaultdict(StageSummary)
+        )
+
+    @contextlib.contextmanager
+    def profile(self) -> typing.Iterator[None]:
+        # 모든 작업을 측정하는 경우엔 실행 전체를 프로파일링합니다.
+        if self.every > 1:
+            yield
+            return
+        self._start()
+        try:
+            yield
+        finally:
+            self._stop()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> typing.Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def add_stage(self, name: str, elapsed: float) -> None:
+        # 다른 스레드나 프로세스에서 잰 시간을 단계에 더합니다.
+        self.stages[name].add(elapsed)
+
+    @contextlib.contextmanager
+    def task(self) -> typing.Iterator[None]:
+        self.task_count += 1
+        sampled = (self.task_count - 1) % self.every == 0
+        if sampled:
+            self.sampled_task_count += 1
+        if not sampled or self.every == 1:
+            yield
+            return
+        self._start()
+        try:
+            yield
+        finally:
+            self._stop()
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "mode": self.mode,
+            "every": self.every,
+            "task_count": self.task_count,
+            "sampled_task_count": self.sampled_task_count,
+            "stages": {
+                name: attr.asdict(stage)
+                for name, stage in sorted(
+                    self.stages.items(), key=lambda x: -x[1].total_seconds
+                )
+            },
+        }
+
+    def dump(self, directory: str, name: str) -> typing.List[str]:
+        file_name = f"{name}.{self.extension}"
+        self._dump(os.path.join(directory, file_name))
+        return [file_name]
+
+    @abc.abstractmethod
+    def _start(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _stop(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def _dump(self, file_path: str) -> None:
+        pass
+
+
+class CProfileProfiler(TaskProfiler):
+    mode = "cprofile"
+    extension = "prof"
+
+    def __init__(self, every: int = 1) -> None:
+        super().__init__(every)
+        self.profiler = cProfile.Profile()
+
+    def _start(self) -> None:
+        self.profiler.enable()
+
+    def _stop(self) -> None:
+        self.profiler.disable()
+
+    def _dump(self, file_path: str) -> None:
+        self.profiler.dump_stats(file_path)
+
+
+class SamplingProfiler(TaskProfiler):
+    """
+    측정 중인 스레드의 스택을 주기적으로 모아
+    flamegraph 에서 읽을 수 있는 collapsed stack 형식으로 저장합니다.
+
+    """
+
+    mode = "sampling"
+    extension = "collapsed.txt"
+
+    def __init__(self, every: int = 1, interval: float = 0.005) -> None:
+        super().__init__(every)
+        self.interval = interval
+        self.samples: typing.Counter[str] = collections.Counter()
+        self._thread_id: typing.Optional[int] = None
+        self._active = threading.Event()
+        self._closed = threading.Event()
+        self._sampler: typing.Optional[threading.Thread] = None
+
+    def _start(self) -> None:
+        self._thread_id = threading.get_ident()
+        if self._sampler is None:
+            self._sampler = threading.Thread(
+                target=self._sample_loop, name="sampling-profiler",
+                daemon=True,
+            )
+            self._sampler.start()
+        self._active.set()
+
+    def _stop(self) -> None:
+        self._active.clear()
+
+    def _sample_loop(self) -> None:
+        while not self._closed.is_set():
+            if not self._active.wait(timeout=0.1):
+                continue
+            frame = sys._current_frames().get(self._thread_id or 0)
+            stack: typing.List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} "
+                    f"({os.path.basename(code.co_filename)}"
+                    f":{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def _dump(self, file_path: str) -> None:
+        self._closed.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        with open(file_path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class TracemallocProfiler(TaskProfiler):
+    """
+    작업이 끝난 시점에 남아 있는 메모리를 할당 위치별로 모읍니다.
+
+    """
+
+    mode = "tracemalloc"
+    extension = "tracemalloc.txt"
+
+    def __init__(self, every: int = 1, limit: int = 50) -> None:
+        super().__init__(every)
+        self.limit = limit
+        self.peak_bytes = 0
+        self.sizes: typing.Counter[str] = collections.Counter()
+        self.counts: typing.Counter[str] = collections.Counter()
+
+    def _start(self) -> None:
+        tracemalloc.start()
+
+    def _stop(self) -> None:
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak_bytes = max(self.peak_bytes, peak)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ))
+        tracemalloc.stop()
+        for stat in snapshot.statistics("lineno"):
+            frame = stat.traceback[0]
+            location = f"{frame.filename}:{frame.lineno}"
+            self.sizes[location] += stat.size
+            self.counts[location] += stat.count
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        summary = super().summary()
+        summary["peak_bytes"] = self.peak_bytes
+        return summary
+
+    def _dump(self, file_path: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(f"peak: {self.peak_bytes} B\n")
+            for location, size in self.sizes.most_common(self.limit):
+                f.write(
+                    f"{size:>12} B {self.counts[location]:>8}  {location}\n"
+                )
+
+
+def create_profiler(mode: typing.Optional[str], every: int = 1) -> Profiler:
+    if mode is None:
+        return Profiler()
+    profilers: typing.Dict[str, typing.Type[TaskProfiler]] = {
+        "cprofile": CProfileProfiler,
+        "sampling": SamplingProfiler,
+        "tracemalloc": TracemallocProfiler,
+    }
+    return profilers[mode](every)
+
+
+def stage(name: str) -> typing.Callable[[F], F]:
+    """
+    ``self.profiler`` 를 가진 객체의 메소드를 하나의 단계로 측정합니다.
+
+    """
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(
+                self: typing.Any, *args: typing.Any, **kwargs: typing.Any
+        ) -> typing.Any:
+            with self.profiler.stage(name):
+                return fn(self, *args, **kwargs)
+
+        return typing.cast(F, wrapper)
+
+    return decorator
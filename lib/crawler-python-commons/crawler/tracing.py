@@ -0,0 +1,76 @@
+"""
+tracing
+=======
+
+Sentry 성능 트레이싱. 실행 하나를 transaction 으로, 프로파일러의 단계 중
+``span_stages`` 에 있는 단계를 하위 span 으로 기록합니다.
+
+Sentry 는 transaction 하나에 span 을 1000 개까지만 남기므로 읍/면/동이나
+페이지마다 열리는 단계는 span 으로 만들지 않고 프로파일러의 시간으로만
+남깁니다.
+
+"""
+import contextlib
+import typing
+
+import sentry_sdk
+
+from crawler.profiling import Profiler
+
+
+class TracingProfiler(Profiler):
+    """
+    다른 프로파일러를 감싸서 ``span_stages`` 의 단계마다 Sentry span 을
+    엽니다.
+
+    """
+
+    def __init__(
+        self, profiler: Profiler, span_stages: typing.Collection[str]
+    ) -> None:
+        super().__init__()
+        self.profiler = profiler
+        #: span 을 여는 단계 (실행마다 몇 번만 열리는 단계)
+        self.span_stages = frozenset(span_stages)
+        self.mode = profiler.mode
+        self._transaction: typing.Optional[typing.Any] = None
+
+    def profile(self) -> typing.ContextManager[None]:
+        return self.profiler.profile()
+
+    def task(self) -> typing.ContextManager[None]:
+        return self.profiler.task()
+
+    @contextlib.contextmanager
+    def transaction(self, name: str) -> typing.Iterator[None]:
+        with sentry_sdk.start_span(op="run", transaction=name) as span:
+            self._transaction = span
+            try:
+                with self.profiler.transaction(name):
+                    yield
+            finally:
+                self._transaction = None
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> typing.Iterator[None]:
+        if name not in self.span_stages:
+            with self.profiler.stage(name):
+                yield
+            return
+        with sentry_sdk.start_span(op=name):
+            with self.profiler.stage(name):
+                yield
+
+    def add_stage(self, name: str, elapsed: float) -> None:
+        self.profiler.add_stage(name, elapsed)
+
+    def tag(self, key: str, value: str) -> None:
+        if self._transaction is not None:
+            self._transaction.set_tag(key, value)
+        self.profiler.tag(key, value)
+
+    def summary(self) -> typing.Dict[str, typing.Any]:
+        return self.profiler.summary()
+
+    def dump(self, directory: str, name: str) -> typing.List[str]:
+        return self.profiler.dump(directory, name)